@@ -0,0 +1,284 @@
+"""
+Historical account balances.
+
+- ``with_running_balance`` annotates a transaction queryset with the balance
+  after each row using a SQL window function, so a statement with running
+  balances is a single query.
+- ``balance_as_of`` answers "what did the account hold at the end of day X"
+  from the nearest ``AccountBalanceCheckpoint`` (one per closed month) plus
+  the transactions after it, so it never sums the full history.
+- ``build_balance_checkpoints`` writes the missing month-end checkpoints;
+  ``apply_checkpoint_deltas`` keeps existing ones in step when a transaction
+  in a checkpointed month is created, edited or deleted (called by the
+  transaction bookkeeping, see transactions/bookkeeping.py).
+
+Only transactions that move the account balance count: card purchases are
+left out, as in the balance signals (``running_balance`` can still list them,
+carrying the balance over unchanged). Archived months (transactions/archive.py)
+contribute through their stored ``balance_effect``; ``daily_balances`` decodes
+the archives its range touches to spread their rows over the right days.
+``running_balance`` is a window over hot rows only, so it starts no earlier
+than the account's archive horizon (the day after its last archived month).
+"""
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Sum, Value, When, Window
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Coalesce, TruncMonth
+
+from transactions.models import Transaction, TransactionArchive
+
+from .models import Account, AccountBalanceCheckpoint, add_months
+
+CHECKPOINT_BATCH_SIZE = 1000
+
+SIGNED_AMOUNT = Case(
+    When(transaction_type=Transaction.INCOME, then=F('amount')),
+    default=-F('amount'),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+# Same as SIGNED_AMOUNT, but card purchases (paid through the bill) count as zero.
+BALANCE_SIGNED_AMOUNT = Case(
+    When(credit_card__isnull=False, then=Value(Decimal('0.00'))),
+    When(transaction_type=Transaction.INCOME, then=F('amount')),
+    default=-F('amount'),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
+
+
+def month_end(value):
+    return value.replace(day=monthrange(value.year, value.month)[1])
+
+
+def last_closed_month_end(today=None):
+    return (today or date.today()).replace(day=1) - timedelta(days=1)
+
+
+def checkpoint_key(account_id, transaction_date):
+    """Bookkeeping key: a change dated in ``month`` shifts every checkpoint from that month on."""
+    return account_id, transaction_date.replace(day=1)
+
+
+def balance_transactions(account):
+    """Transactions of ``account`` that move its balance."""
+    return Transaction.objects.filter(account=account, credit_card__isnull=True)
+
+
+def _signed_total(queryset):
+    return queryset.aggregate(
+        total=Coalesce(
+            Sum(SIGNED_AMOUNT),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    )['total']
+
+
+def _archived_rows(account, date_from, date_to):
+    """Balance-moving archived rows of ``account`` dated in ``[date_from, date_to]``."""
+    from transactions.archive import decode_archive
+
+    archives = TransactionArchive.objects.filter(
+        account=account,
+        month__gte=date_from.replace(day=1),
+        month__lte=date_to,
+    )
+    for archive in archives:
+        for row in decode_archive(archive):
+            if date_from <= row['date'] <= date_to and row['credit_card_id'] is None:
+                yield row
+
+
+def archive_horizon(account):
+    """First day after the last archived month of ``account`` (None if nothing is archived)."""
+    last_month = TransactionArchive.objects.filter(account=account).aggregate(month=Max('month'))['month']
+    return month_end(last_month) + timedelta(days=1) if last_month else None
+
+
+def _archived_effect(account, after, until):
+    """Balance effect of archived rows dated in ``(after, until]``."""
+    from transactions.archive import decode_archive
+
+    archives = TransactionArchive.objects.filter(account=account, month__lte=until)
+    if after is not None:
+        archives = archives.filter(month__gt=after)
+
+    effect = Decimal('0.00')
+    for archive in archives:
+        if month_end(archive.month) <= until:
+            effect += archive.balance_effect
+            continue
+        # Partially covered month: only the rows up to ``until`` count.
+        for row in decode_archive(archive):
+            if row['date'] <= until and row['credit_card_id'] is None:
+                effect += row['amount'] if row['transaction_type'] == Transaction.INCOME else -row['amount']
+    return effect
+
+
+def balance_as_of(account, as_of):
+    """Balance of ``account`` at the end of ``as_of`` (a date)."""
+    checkpoint = account.balance_checkpoints.filter(date__lte=as_of).order_by('-date').first()
+    if checkpoint is None:
+        balance, after = account.initial_balance, None
+    else:
+        balance, after = checkpoint.balance, checkpoint.date
+
+    tail = balance_transactions(account).filter(date__lte=as_of)
+    if after is not None:
+        tail = tail.filter(date__gt=after)
+    return balance + _signed_total(tail) + _archived_effect(account, after, as_of)
+
+
+def with_running_balance(queryset, opening_balance):
+    """
+    Annotate ``signed_amount`` and ``running_balance`` (balance after each
+    row) in chronological order, starting from ``opening_balance``. Card
+    purchases keep their ``signed_amount`` but leave the balance unchanged.
+    """
+    return queryset.annotate(
+        signed_amount=SIGNED_AMOUNT,
+        running_balance=Value(opening_balance) + Window(
+            expression=Sum(BALANCE_SIGNED_AMOUNT),
+            order_by=[F('date').asc(), F('created_at').asc(), F('pk').asc()],
+            frame=RowRange(start=None, end=0),
+        ),
+    ).order_by('date', 'created_at', 'pk')
+
+
+def running_balance(account, date_from=None, date_to=None, include_card_purchases=False):
+    """
+    Transactions of ``account`` in the period, with running balances.
+
+    Only balance-moving rows are returned unless ``include_card_purchases``.
+    Archived rows are not in the hot table the window runs over, so
+    ``date_from`` is moved up to the archive horizon when it falls before it.
+    """
+    if include_card_purchases:
+        queryset = Transaction.objects.filter(account=account)
+    else:
+        queryset = balance_transactions(account)
+    if date_from is None:
+        first_date = queryset.order_by('date').values_list('date', flat=True).first()
+        date_from = first_date or date.today()
+    horizon = archive_horizon(account)
+    if horizon is not None and date_from < horizon:
+        date_from = horizon
+    queryset = queryset.filter(date__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(date__lte=date_to)
+    return with_running_balance(queryset, balance_as_of(account, date_from - timedelta(days=1)))
+
+
+def daily_balances(account, date_from, date_to):
+    """Closing balance for every day of ``[date_from, date_to]`` as ``[(date, balance)]``."""
+    balance = balance_as_of(account, date_from - timedelta(days=1))
+    changes = defaultdict(Decimal)
+    changes.update(
+        balance_transactions(account).filter(
+            date__gte=date_from,
+            date__lte=date_to,
+        ).order_by().values('date').annotate(
+            total=Sum(SIGNED_AMOUNT),
+        ).values_list('date', 'total')
+    )
+    for row in _archived_rows(account, date_from, date_to):
+        changes[row['date']] += row['amount'] if row['transaction_type'] == Transaction.INCOME else -row['amount']
+    points = []
+    day = date_from
+    while day <= date_to:
+        balance += changes.get(day, Decimal('0.00'))
+        points.append((day, balance))
+        day += timedelta(days=1)
+    return points
+
+
+def _monthly_effects(account, after, until):
+    effects = dict(
+        balance_transactions(account).filter(
+            date__gt=after or date.min,
+            date__lte=until,
+        ).annotate(
+            period=TruncMonth('date'),
+        ).order_by().values('period').annotate(
+            total=Sum(SIGNED_AMOUNT),
+        ).values_list('period', 'total')
+    )
+    archives = TransactionArchive.objects.filter(account=account, month__lte=until)
+    if after is not None:
+        archives = archives.filter(month__gt=after)
+    for month, effect in archives.values_list('month', 'balance_effect'):
+        effects[month] = effects.get(month, Decimal('0.00')) + effect
+    return effects
+
+
+def _first_activity_month(account):
+    first_dates = [
+        balance_transactions(account).order_by('date').values_list('date', flat=True).first(),
+        TransactionArchive.objects.filter(account=account).order_by('month').values_list('month', flat=True).first(),
+    ]
+    first_dates = [value for value in first_dates if value is not None]
+    return min(first_dates).replace(day=1) if first_dates else None
+
+
+@transaction.atomic
+def build_checkpoints_for_account(account, until=None, rebuild=False):
+    """Write the missing month-end checkpoints of ``account`` up to ``until``."""
+    until = until or last_closed_month_end()
+    if rebuild:
+        account.balance_checkpoints.all().delete()
+
+    last = account.balance_checkpoints.order_by('-date').first()
+    if last is not None:
+        balance, after = last.balance, last.date
+        month = add_months(last.date.replace(day=1), 1)
+    else:
+        month = _first_activity_month(account)
+        if month is None:
+            return 0
+        balance, after = account.initial_balance, None
+
+    effects = _monthly_effects(account, after, until)
+    checkpoints = []
+    while month_end(month) <= until:
+        balance += effects.get(month, Decimal('0.00'))
+        checkpoints.append(
+            AccountBalanceCheckpoint(account=account, date=month_end(month), balance=balance)
+        )
+        month = add_months(month, 1)
+
+    AccountBalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=CHECKPOINT_BATCH_SIZE)
+    return len(checkpoints)
+
+
+def build_balance_checkpoints(account_ids=None, until=None, rebuild=False):
+    """Write missing checkpoints for every account (or ``account_ids``); returns how many."""
+    accounts = Account.objects.order_by('pk')
+    if account_ids is not None:
+        accounts = accounts.filter(pk__in=account_ids)
+    return sum(
+        build_checkpoints_for_account(account, until=until, rebuild=rebuild)
+        for account in accounts.iterator()
+    )
+
+
+def apply_checkpoint_deltas(deltas, today=None):
+    """
+    Shift checkpoints by ``{(account_id, month): signed amount}``.
+
+    A change dated in ``month`` affects every checkpoint from that month's
+    end on. Months that are not closed yet have no checkpoint, so the common
+    case (transactions of the current month) costs no query.
+    """
+    current_month = (today or date.today()).replace(day=1)
+    for (account_id, month), delta in deltas.items():
+        if account_id is None or not delta or month >= current_month:
+            continue
+        AccountBalanceCheckpoint.objects.filter(
+            account_id=account_id,
+            date__gte=month,
+        ).update(balance=F('balance') + delta)
@@ -0,0 +1,171 @@
+"""
+Batch closing of credit card bills.
+
+``close_card_bills`` materializes a ``CardBill`` for every billing cycle
+that has already closed, so bill history no longer depends on someone
+paying the card (``CreditCard.pay_bill`` only creates the bill it pays).
+
+Cards are processed in keyset chunks of ``chunk_size`` (by primary key), one
+database transaction per chunk, so the daily run over every user keeps its
+statements and locks bounded. Within a chunk, all totals come from one
+grouped query over ``Transaction.credit_card``: a cycle window depends only
+on the closing day, so each purchase is labelled with the end of its cycle
+through a ``CASE`` on ``credit_card__closing_day`` (at most 28 x months
+branches, whatever the number of cards), then summed per (card, cycle).
+New bills are written with ``bulk_create`` and changed ones with
+``bulk_update``; bills already paid are never touched. Bulk writes skip the
+``CardBill`` signals, so the owners' cache versions are bumped here.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Case, Sum, When
+
+from core.cache import bump_user_data_version
+from transactions.models import Transaction
+
+from .models import BillingCycle, CardBill, CreditCard
+
+BILL_BATCH_SIZE = 500
+CARD_CHUNK_SIZE = 500
+
+
+@dataclass
+class BillClosingResult:
+    created: int = 0
+    updated: int = 0
+
+
+def closed_cycles(card, today=None, months=1):
+    """The ``months`` most recent cycles of ``card`` that closed before ``today``."""
+    cycle = card.get_billing_cycle(today or date.today())
+    cycles = []
+    for _ in range(months):
+        closing_date = cycle.start - timedelta(days=1)
+        cycle = BillingCycle.for_days(card.closing_day, card.due_day, closing_date)
+        cycles.append(cycle)
+    return cycles
+
+
+def _bill_totals(cycles_by_card, closing_days):
+    """``{(card_id, cycle end): total}`` for every cycle, in one grouped query."""
+    windows = {}
+    for card_id, cycles in cycles_by_card.items():
+        for cycle in cycles:
+            windows[(closing_days[card_id], cycle.start)] = cycle.end
+
+    cycle_end = Case(
+        *[
+            When(credit_card__closing_day=closing_day, date__gte=start, date__lte=end, then=models.Value(end))
+            for (closing_day, start), end in windows.items()
+        ],
+        output_field=models.DateField(),
+    )
+    rows = Transaction.objects.filter(
+        credit_card_id__in=list(cycles_by_card),
+        date__gte=min(start for _, start in windows),
+        date__lte=max(windows.values()),
+    ).annotate(
+        cycle_end=cycle_end,
+    ).filter(
+        cycle_end__isnull=False,
+    ).order_by().values('credit_card_id', 'cycle_end').annotate(
+        total=Sum('amount'),
+    )
+    return {(row['credit_card_id'], row['cycle_end']): row['total'] for row in rows}
+
+
+def iter_card_chunks(cards, chunk_size=CARD_CHUNK_SIZE):
+    """Yield lists of cards from ``cards``, walking the primary key in order."""
+    cards = cards.order_by('pk')
+    last_pk = None
+    while True:
+        page = cards if last_pk is None else cards.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+@transaction.atomic
+def _close_chunk(cards, today, months, result):
+    cycles_by_card = {}
+    closing_days = {}
+    owners = {}
+    for card in cards:
+        opened = card.created_at.date()
+        cycles = [cycle for cycle in closed_cycles(card, today, months) if cycle.end >= opened]
+        if cycles:
+            cycles_by_card[card.pk] = cycles
+            closing_days[card.pk] = card.closing_day
+            owners[card.pk] = card.user_id
+    if not cycles_by_card:
+        return
+
+    totals = _bill_totals(cycles_by_card, closing_days)
+    existing = {
+        (bill.credit_card_id, bill.reference_month): bill
+        for bill in CardBill.objects.select_for_update().filter(
+            credit_card_id__in=list(cycles_by_card),
+            reference_month__in={cycle.reference_month for cycles in cycles_by_card.values() for cycle in cycles},
+        )
+    }
+
+    to_create = []
+    to_update = []
+    for card_id, cycles in cycles_by_card.items():
+        for cycle in cycles:
+            total = totals.get((card_id, cycle.end), Decimal('0.00'))
+            bill = existing.get((card_id, cycle.reference_month))
+            if bill is None:
+                if total > 0:
+                    to_create.append(CardBill(
+                        credit_card_id=card_id,
+                        reference_month=cycle.reference_month,
+                        closing_date=cycle.end,
+                        due_date=cycle.due_date,
+                        total_amount=total,
+                        status=CardBill.CLOSED,
+                    ))
+                continue
+            if bill.status == CardBill.PAID:
+                continue
+            if bill.total_amount != total or bill.status != CardBill.CLOSED or bill.closing_date != cycle.end:
+                bill.total_amount = total
+                bill.closing_date = cycle.end
+                bill.due_date = cycle.due_date
+                bill.status = CardBill.CLOSED
+                to_update.append(bill)
+
+    CardBill.objects.bulk_create(to_create, batch_size=BILL_BATCH_SIZE)
+    CardBill.objects.bulk_update(
+        to_update,
+        ['total_amount', 'closing_date', 'due_date', 'status'],
+        batch_size=BILL_BATCH_SIZE,
+    )
+    for user_id in {owners[bill.credit_card_id] for bill in to_create + to_update}:
+        bump_user_data_version(user_id)
+
+    result.created += len(to_create)
+    result.updated += len(to_update)
+
+
+def close_card_bills(today=None, months=1, user_ids=None, chunk_size=CARD_CHUNK_SIZE):
+    """
+    Create or refresh the bills of the last ``months`` closed cycles of every
+    active card, ``chunk_size`` cards per transaction. Returns how many bills
+    were created and updated.
+    """
+    today = today or date.today()
+    cards = CreditCard.objects.filter(is_active=True)
+    if user_ids is not None:
+        cards = cards.filter(user_id__in=user_ids)
+    cards = cards.only('pk', 'user_id', 'closing_day', 'due_day', 'created_at')
+
+    result = BillClosingResult()
+    for chunk in iter_card_chunks(cards, chunk_size):
+        _close_chunk(chunk, today, months, result)
+    return result
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from accounts.balances import build_balance_checkpoints, last_closed_month_end
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava o saldo de fechamento de cada mês encerrado, usado para '
+        'consultar saldos históricos sem somar todo o extrato.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--account',
+            type=int,
+            action='append',
+            dest='account_ids',
+            help='ID da conta a processar (pode ser repetido).',
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Apaga e recalcula os saldos de fechamento existentes.',
+        )
+
+    def handle(self, *args, **options):
+        until = last_closed_month_end()
+        created = build_balance_checkpoints(
+            account_ids=options.get('account_ids'),
+            until=until,
+            rebuild=options['rebuild'],
+        )
+        self.stdout.write(f'{created} saldos de fechamento gravados até {until:%m/%Y}')
@@ -0,0 +1,59 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bills import CARD_CHUNK_SIZE, close_card_bills
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f'Data inválida: {value}. Use o formato AAAA-MM-DD.') from exc
+
+
+class Command(BaseCommand):
+    help = (
+        'Fecha as faturas dos cartões cujo dia de fechamento já passou, '
+        'gravando o total de cada ciclo em CardBill.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=1,
+            help='Quantidade de ciclos fechados a gravar por cartão (padrão: 1).',
+        )
+        parser.add_argument(
+            '--date',
+            type=parse_date,
+            help='Data de referência, no formato AAAA-MM-DD (padrão: hoje).',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a processar (pode ser repetido).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CARD_CHUNK_SIZE,
+            help='Quantidade de cartões processados por lote.',
+        )
+
+    def handle(self, *args, **options):
+        if options['months'] < 1:
+            raise CommandError('--months deve ser maior que zero.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser maior que zero.')
+
+        result = close_card_bills(
+            today=options.get('date'),
+            months=options['months'],
+            user_ids=options.get('user_ids'),
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(f'{result.created} faturas criadas, {result.updated} atualizadas')
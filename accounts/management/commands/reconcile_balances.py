@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from accounts.services import find_balance_drift, iter_account_owner_chunks, repair_balance_drift
+
+USER_CHUNK_SIZE = 1000
+REPAIR_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o saldo atual das contas com o saldo calculado a partir das '
+        'transações e, opcionalmente, corrige as divergências.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a conferir (pode ser repetido).',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Corrige os saldos divergentes.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=USER_CHUNK_SIZE,
+            help='Quantidade de usuários conferidos por consulta.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REPAIR_BATCH_SIZE,
+            help='Quantidade de contas corrigidas por UPDATE.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Quantidade de lotes de usuários processados em paralelo.',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('chunk_size', 'batch_size', 'workers'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} deve ser maior que zero.')
+
+        self.fix = options['fix']
+        self.batch_size = options['batch_size']
+        chunks = iter_account_owner_chunks(options.get('user_ids'), options['chunk_size'])
+
+        if options['workers'] == 1:
+            results = map(self.reconcile_chunk, chunks)
+            drift_count, fixed_count = self.report(results)
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                drift_count, fixed_count = self.report(
+                    executor.map(self.reconcile_chunk_in_thread, chunks)
+                )
+
+        if self.fix:
+            self.stdout.write(f'{drift_count} contas divergentes, {fixed_count} corrigidas')
+        else:
+            self.stdout.write(f'{drift_count} contas divergentes')
+
+    def reconcile_chunk(self, user_ids):
+        if not self.fix:
+            return find_balance_drift(user_ids=user_ids), 0
+
+        with transaction.atomic():
+            drifts = find_balance_drift(user_ids=user_ids)
+            return drifts, repair_balance_drift(drifts, batch_size=self.batch_size)
+
+    def reconcile_chunk_in_thread(self, user_ids):
+        try:
+            return self.reconcile_chunk(user_ids)
+        finally:
+            # Each worker thread opens its own connection; do not leak it.
+            connection.close()
+
+    def report(self, results):
+        drift_count = 0
+        fixed_count = 0
+        for drifts, fixed in results:
+            drift_count += len(drifts)
+            fixed_count += fixed
+            for drift in drifts:
+                self.stdout.write(
+                    f'Conta {drift.account_id} (usuário {drift.user_id}): '
+                    f'saldo {drift.stored_balance}, esperado {drift.expected_balance}, '
+                    f'diferença {drift.difference}'
+                )
+        return drift_count, fixed_count
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.services import iter_account_owner_chunks
+from accounts.snapshots import backfill_user, snapshot_day
+
+USER_CHUNK_SIZE = 500
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f'Data inválida: {value}. Use o formato AAAA-MM-DD.') from exc
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava o saldo diário de cada conta e o patrimônio de cada usuário. '
+        'Sem opções, registra o dia anterior; com --backfill, reconstrói o '
+        'histórico a partir das transações.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=parse_date,
+            help='Dia a registrar, no formato AAAA-MM-DD (padrão: ontem).',
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Reconstrói o histórico até --date a partir das transações.',
+        )
+        parser.add_argument(
+            '--from',
+            type=parse_date,
+            dest='date_from',
+            help='Primeiro dia do histórico no --backfill (padrão: primeira transação).',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a processar (pode ser repetido).',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=USER_CHUNK_SIZE,
+            help='Quantidade de usuários processados por lote.',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser maior que zero.')
+
+        day = options.get('date') or timezone.localdate() - timedelta(days=1)
+        written = 0
+        for user_ids in iter_account_owner_chunks(options.get('user_ids'), options['chunk_size']):
+            with transaction.atomic():
+                if options['backfill']:
+                    written += sum(
+                        backfill_user(user_id, date_from=options.get('date_from'), date_to=day)
+                        for user_id in user_ids
+                    )
+                else:
+                    written += snapshot_day(user_ids, day)
+
+        self.stdout.write(f'{written} saldos diários gravados até {day:%d/%m/%Y}')
@@ -1,9 +1,13 @@
 from calendar import monthrange
+from dataclasses import dataclass
 from datetime import date, timedelta
+from decimal import Decimal
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 
 
 def add_months(base_date, months):
@@ -132,6 +136,187 @@ class Account(models.Model):
         super().save(*args, **kwargs)
 
 
+class AccountBalanceCheckpoint(models.Model):
+    """
+    Account balance at the end of a closed month.
+
+    Written by ``python manage.py build_balance_checkpoints`` and kept in
+    step with later edits by the transaction bookkeeping, so
+    ``balance_as_of`` (see accounts/balances.py) only has to add the
+    transactions after the nearest checkpoint.
+    """
+
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='balance_checkpoints',
+        verbose_name='Conta'
+    )
+    date = models.DateField('Data')
+    balance = models.DecimalField('Saldo', max_digits=14, decimal_places=2)
+    updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['account', 'date']
+        verbose_name = 'Saldo de Fechamento'
+        verbose_name_plural = 'Saldos de Fechamento'
+
+    def __str__(self):
+        return f'{self.account} - {self.date:%d/%m/%Y}: R$ {self.balance}'
+
+
+class AccountBalanceSnapshot(models.Model):
+    """
+    Closing balance of an account on one day.
+
+    Filled by ``python manage.py snapshot_balances`` (see
+    accounts/snapshots.py); history is read from here instead of being
+    derived from the transactions on every request.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        verbose_name='Usuário'
+    )
+    account = models.ForeignKey(
+        Account,
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots',
+        verbose_name='Conta'
+    )
+    date = models.DateField('Data')
+    balance = models.DecimalField('Saldo', max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['account', 'date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+        verbose_name = 'Saldo Diário'
+        verbose_name_plural = 'Saldos Diários'
+
+    def __str__(self):
+        return f'{self.account} - {self.date:%d/%m/%Y}: R$ {self.balance}'
+
+
+class NetWorthSnapshot(models.Model):
+    """Sum of the user's active account balances at the end of one day."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='net_worth_snapshots',
+        verbose_name='Usuário'
+    )
+    date = models.DateField('Data')
+    total = models.DecimalField('Patrimônio', max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+        verbose_name = 'Patrimônio Diário'
+        verbose_name_plural = 'Patrimônios Diários'
+
+    def __str__(self):
+        return f'{self.user} - {self.date:%d/%m/%Y}: R$ {self.total}'
+
+
+@dataclass(frozen=True)
+class BillingCycle:
+    """
+    Billing window of a credit card on a given day.
+
+    Purchases dated in ``[start, end]`` go to the bill that closes on
+    ``end``; ``due_date`` is the next due date from that day.
+    """
+
+    start: date
+    end: date
+    due_date: date
+
+    @classmethod
+    def for_days(cls, closing_day, due_day, today=None):
+        today = today or date.today()
+        this_month = today.replace(day=1)
+        if today.day <= closing_day:
+            previous_month = add_months(this_month, -1)
+            start = get_day_in_month(previous_month.year, previous_month.month, closing_day) + timedelta(days=1)
+            end = get_day_in_month(today.year, today.month, closing_day)
+        else:
+            next_month = add_months(this_month, 1)
+            start = get_day_in_month(today.year, today.month, closing_day) + timedelta(days=1)
+            end = get_day_in_month(next_month.year, next_month.month, closing_day)
+
+        if today.day <= due_day:
+            due_date = get_day_in_month(today.year, today.month, due_day)
+        else:
+            next_month = add_months(this_month, 1)
+            due_date = get_day_in_month(next_month.year, next_month.month, due_day)
+        return cls(start=start, end=end, due_date=due_date)
+
+    @property
+    def reference_month(self):
+        return self.end.replace(day=1)
+
+
+CLOSING_DAYS = range(1, 29)
+
+
+class CreditCardQuerySet(models.QuerySet):
+    def with_current_bill(self, today=None):
+        """
+        Annotate ``current_bill_total``, the sum of each card's purchases in
+        its current billing window, as one correlated subquery.
+
+        The window only depends on the closing day (1-28), so the bounds are
+        resolved in Python per closing day and mapped with ``CASE``.
+        """
+        from transactions.models import Transaction
+
+        cycles = {day: BillingCycle.for_days(day, 1, today) for day in CLOSING_DAYS}
+        bill_start = models.Case(
+            *[models.When(closing_day=day, then=models.Value(cycle.start)) for day, cycle in cycles.items()],
+            output_field=models.DateField(),
+        )
+        bill_end = models.Case(
+            *[models.When(closing_day=day, then=models.Value(cycle.end)) for day, cycle in cycles.items()],
+            output_field=models.DateField(),
+        )
+        bill_total = Transaction.objects.filter(
+            credit_card=models.OuterRef('pk'),
+            date__gte=models.OuterRef('_bill_start'),
+            date__lte=models.OuterRef('_bill_end'),
+        ).order_by().values('credit_card').annotate(
+            total=models.Sum('amount'),
+        ).values('total')
+
+        return self.alias(
+            _bill_start=bill_start,
+            _bill_end=bill_end,
+        ).annotate(
+            current_bill_total=Coalesce(
+                models.Subquery(bill_total),
+                models.Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+    def with_closed_bill(self):
+        """
+        Annotate ``closed_bill_total`` with the most recent closed, unpaid
+        bill materialized by ``close_card_bills`` (None if there is none).
+        """
+        closed_bill = CardBill.objects.filter(
+            credit_card=models.OuterRef('pk'),
+            status=CardBill.CLOSED,
+        ).order_by('-reference_month').values('total_amount')[:1]
+        return self.annotate(closed_bill_total=models.Subquery(closed_bill))
+
+
 class CreditCard(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -163,6 +348,8 @@ class CreditCard(models.Model):
     created_at = models.DateTimeField('Data de Criação', auto_now_add=True)
     updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
 
+    objects = CreditCardQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
         verbose_name = 'Cartão de Crédito'
@@ -171,39 +358,44 @@ class CreditCard(models.Model):
     def __str__(self):
         return self.name
 
+    def get_billing_cycle(self, today=None):
+        return BillingCycle.for_days(self.closing_day, self.due_day, today)
+
+    @cached_property
+    def billing_cycle(self):
+        """Today's billing cycle, computed once per instance."""
+        return self.get_billing_cycle()
+
     @property
     def current_billing_start(self):
-        today = date.today()
-        if today.day <= self.closing_day:
-            previous_month = add_months(today.replace(day=1), -1)
-            closing_date = get_day_in_month(
-                previous_month.year,
-                previous_month.month,
-                self.closing_day
-            )
-            return closing_date + timedelta(days=1)
-
-        closing_date = get_day_in_month(today.year, today.month, self.closing_day)
-        return closing_date + timedelta(days=1)
+        return self.billing_cycle.start
 
     @property
     def current_billing_end(self):
-        today = date.today()
-        if today.day <= self.closing_day:
-            return get_day_in_month(today.year, today.month, self.closing_day)
-
-        next_month = add_months(today.replace(day=1), 1)
-        return get_day_in_month(next_month.year, next_month.month, self.closing_day)
+        return self.billing_cycle.end
 
     @property
+    def next_due_date(self):
+        return self.billing_cycle.due_date
+
+    @cached_property
     def current_bill_amount(self):
+        """
+        Purchases in the current billing window. Read from the
+        ``with_current_bill()`` annotation when present, otherwise
+        aggregated once per instance.
+        """
+        if hasattr(self, 'current_bill_total'):
+            return self.current_bill_total
+
         from transactions.models import Transaction
 
+        cycle = self.billing_cycle
         return (
             Transaction.objects.filter(
                 credit_card=self,
-                date__gte=self.current_billing_start,
-                date__lte=self.current_billing_end,
+                date__gte=cycle.start,
+                date__lte=cycle.end,
             ).aggregate(total=models.Sum('amount'))['total']
             or 0
         )
@@ -212,37 +404,36 @@ class CreditCard(models.Model):
     def available_limit(self):
         return self.credit_limit - self.current_bill_amount
 
-    @property
-    def next_due_date(self):
-        today = date.today()
-        if today.day <= self.due_day:
-            return get_day_in_month(today.year, today.month, self.due_day)
-
-        next_month = add_months(today.replace(day=1), 1)
-        return get_day_in_month(next_month.year, next_month.month, self.due_day)
-
     def pay_bill(self, account):
-        bill = self.bills.filter(
-            status__in=[CardBill.OPEN, CardBill.CLOSED]
-        ).order_by('-reference_month').first()
+        """
+        Pay the oldest closed bill at its stored total (bills materialized by
+        ``close_card_bills`` already hold their cycle's purchases). Only when
+        there is none is the bill built from the current billing cycle.
+        """
+        closed_bill = self.bills.filter(status=CardBill.CLOSED).order_by('reference_month').first()
+        if closed_bill is not None:
+            return closed_bill.pay_bill(account)
+
+        cycle = self.billing_cycle
+        bill_amount = self.current_bill_amount
+        bill = self.bills.filter(status=CardBill.OPEN).order_by('-reference_month').first()
 
         if bill is None:
-            reference_month = self.current_billing_end.replace(day=1)
             bill, _ = CardBill.objects.get_or_create(
                 credit_card=self,
-                reference_month=reference_month,
+                reference_month=cycle.reference_month,
                 defaults={
-                    'closing_date': self.current_billing_end,
-                    'due_date': self.next_due_date,
-                    'total_amount': self.current_bill_amount,
+                    'closing_date': cycle.end,
+                    'due_date': cycle.due_date,
+                    'total_amount': bill_amount,
                     'status': CardBill.CLOSED,
                 },
             )
 
-        if bill.total_amount != self.current_bill_amount and self.current_bill_amount > 0:
-            bill.total_amount = self.current_bill_amount
-            bill.closing_date = self.current_billing_end
-            bill.due_date = self.next_due_date
+        if bill.total_amount != bill_amount and bill_amount > 0:
+            bill.total_amount = bill_amount
+            bill.closing_date = cycle.end
+            bill.due_date = cycle.due_date
             if bill.status == CardBill.OPEN:
                 bill.status = CardBill.CLOSED
             bill.save(update_fields=['total_amount', 'closing_date', 'due_date', 'status'])
@@ -1,7 +1,13 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from categories.models import Category
-from transactions.models import Transaction
+from core.cache import bump_user_data_version
+from transactions.models import Transaction, TransactionArchive
 
 from .models import Account
 
@@ -41,3 +47,137 @@ def debit_account(account, amount, description, category=None, date=None):
         date=transaction_date,
         description=description or '',
     )
+
+
+def apply_balance_deltas(deltas):
+    """
+    Apply ``{account_id: signed amount}`` to ``current_balance``.
+
+    Issues one atomic F() UPDATE per account with a non-zero net change.
+    In-memory ``Account`` instances are not refreshed; call
+    ``refresh_from_db()`` where the new balance is needed.
+    """
+    for account_id, delta in deltas.items():
+        if account_id is None or not delta:
+            continue
+        Account.objects.filter(pk=account_id).update(
+            current_balance=F('current_balance') + delta
+        )
+
+
+@dataclass(frozen=True)
+class BalanceDrift:
+    account_id: int
+    user_id: int
+    stored_balance: Decimal
+    expected_balance: Decimal
+
+    @property
+    def difference(self):
+        return self.stored_balance - self.expected_balance
+
+
+def _sum_for(transaction_type):
+    # Credit card purchases never touch the account balance (see
+    # transactions/signals.py), so they are left out of the ledger as well.
+    return Coalesce(
+        Sum(
+            'transactions__amount',
+            filter=Q(
+                transactions__transaction_type=transaction_type,
+                transactions__credit_card__isnull=True,
+            ),
+        ),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _archived_balance_effect():
+    # Archived transactions (transactions/archive.py) still count towards
+    # the balance; their net effect is stored per archive row.
+    archived = TransactionArchive.objects.filter(
+        account=OuterRef('pk'),
+    ).order_by().values('account').annotate(
+        effect=Sum('balance_effect'),
+    ).values('effect')
+    return Coalesce(
+        Subquery(archived),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def with_ledger_balance(queryset):
+    """Annotate ``ledger_balance`` = initial + income - expense (hot and archived)."""
+    return queryset.annotate(
+        ledger_balance=F('initial_balance')
+        + _sum_for(Transaction.INCOME)
+        - _sum_for(Transaction.EXPENSE)
+        + _archived_balance_effect()
+    )
+
+
+def find_balance_drift(user_ids=None, account_ids=None):
+    """
+    Return a ``BalanceDrift`` for every account whose stored balance differs
+    from the one derived from its transactions.
+
+    Stored and derived balances are read by the same statement, so the diff
+    is consistent even while other transactions are being written.
+    """
+    accounts = Account.objects.all()
+    if user_ids is not None:
+        accounts = accounts.filter(user_id__in=user_ids)
+    if account_ids is not None:
+        accounts = accounts.filter(pk__in=account_ids)
+
+    rows = with_ledger_balance(accounts).order_by().values_list(
+        'pk', 'user_id', 'current_balance', 'ledger_balance'
+    )
+    return [
+        BalanceDrift(account_id, user_id, stored, expected)
+        for account_id, user_id, stored, expected in rows
+        if stored != expected
+    ]
+
+
+def repair_balance_drift(drifts, batch_size=500):
+    """
+    Correct ``current_balance`` for ``drifts`` with one UPDATE per batch.
+
+    The correction is applied as a delta (``current_balance - difference``)
+    rather than an absolute value, so signal updates that land between the
+    diff and the repair are not overwritten. ``update()`` skips the account
+    signals, so the owners' cached data is invalidated here. Returns the
+    number of accounts updated.
+    """
+    updated = 0
+    for start in range(0, len(drifts), batch_size):
+        batch = drifts[start:start + batch_size]
+        correction = Case(
+            *[When(pk=drift.account_id, then=Value(drift.difference)) for drift in batch],
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+        updated += Account.objects.filter(
+            pk__in=[drift.account_id for drift in batch]
+        ).update(current_balance=F('current_balance') - correction)
+        for user_id in {drift.user_id for drift in batch}:
+            bump_user_data_version(user_id)
+    return updated
+
+
+def iter_account_owner_chunks(user_ids=None, chunk_size=1000):
+    """Yield lists of account owner ids, walking the user id index in order."""
+    owners = Account.objects.order_by('user_id').values_list('user_id', flat=True).distinct()
+    if user_ids:
+        owners = owners.filter(user_id__in=user_ids)
+
+    last_user_id = None
+    while True:
+        page = owners if last_user_id is None else owners.filter(user_id__gt=last_user_id)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_user_id = chunk[-1]
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+from .models import Account, CardBill, CreditCard
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=CreditCard)
+@receiver(post_delete, sender=CreditCard)
+def invalidate_user_cache_on_account_change(sender, instance, **kwargs):
+    bump_user_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=CardBill)
+def invalidate_user_cache_on_card_bill_change(sender, instance, **kwargs):
+    # Bills saved through their card (card.bills, CreditCard.pay_bill) carry
+    # it already; for the rest read only the owner's id. close_card_bills
+    # writes in bulk, which sends no signal, and bumps each owner per chunk.
+    if CardBill.credit_card.is_cached(instance):
+        user_id = instance.credit_card.user_id
+    else:
+        user_id = CreditCard.objects.filter(pk=instance.credit_card_id).values_list('user_id', flat=True).first()
+    bump_user_data_version(user_id)
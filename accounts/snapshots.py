@@ -0,0 +1,176 @@
+"""
+Daily balance snapshots.
+
+``AccountBalanceSnapshot`` keeps the closing balance of every account per day
+and ``NetWorthSnapshot`` the sum over the user's active accounts, so the
+net-worth chart reads pre-computed rows instead of replaying years of
+transactions on every request.
+
+- ``snapshot_day`` writes one day for a chunk of users: the stored
+  ``current_balance`` minus whatever is dated after that day (hot rows with
+  one grouped query per chunk, archived ones only when the day is older than
+  the archive horizon). Meant for the nightly run.
+- ``backfill_user`` rebuilds a user's history in one pass: the daily totals
+  of all accounts come from one grouped query (plus the archived months),
+  and a cumulative sum walks them forward day by day.
+
+Both upsert on (account, date) / (user, date), so re-running a day or a
+range is safe.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from transactions.models import Transaction, TransactionArchive
+
+from .balances import SIGNED_AMOUNT
+from .models import Account, AccountBalanceSnapshot, NetWorthSnapshot
+
+SNAPSHOT_BATCH_SIZE = 2000
+
+
+def _upsert(model, rows, unique_fields, update_field):
+    model.objects.bulk_create(
+        rows,
+        batch_size=SNAPSHOT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=[update_field],
+    )
+
+
+def _write(account_rows, net_worth_rows):
+    _upsert(AccountBalanceSnapshot, account_rows, ['account', 'date'], 'balance')
+    _upsert(NetWorthSnapshot, net_worth_rows, ['user', 'date'], 'total')
+
+
+def snapshot_day(user_ids, day):
+    """Write the closing balances of ``day`` for ``user_ids``; returns the account rows written."""
+    from transactions.archive import decode_archive
+
+    accounts = list(
+        Account.objects.filter(user_id__in=user_ids).values_list(
+            'pk', 'user_id', 'current_balance', 'is_active'
+        )
+    )
+    # Transactions dated after ``day`` are already in current_balance.
+    later = defaultdict(Decimal)
+    later.update(
+        Transaction.objects.filter(
+            user_id__in=user_ids,
+            credit_card__isnull=True,
+            date__gt=day,
+        ).order_by().values('account_id').annotate(
+            total=Sum(SIGNED_AMOUNT),
+        ).values_list('account_id', 'total')
+    )
+    # So are archived ones, for a day older than the archive horizon.
+    for archive in TransactionArchive.objects.filter(user_id__in=user_ids, month__gte=day.replace(day=1)):
+        if archive.month > day:
+            later[archive.account_id] += archive.balance_effect
+            continue
+        for row in decode_archive(archive):
+            if row['date'] > day and row['credit_card_id'] is None:
+                amount = row['amount'] if row['transaction_type'] == Transaction.INCOME else -row['amount']
+                later[archive.account_id] += amount
+
+    account_rows = []
+    net_worth = defaultdict(Decimal)
+    for account_id, user_id, current_balance, is_active in accounts:
+        balance = current_balance - later.get(account_id, Decimal('0.00'))
+        account_rows.append(
+            AccountBalanceSnapshot(user_id=user_id, account_id=account_id, date=day, balance=balance)
+        )
+        if is_active:
+            net_worth[user_id] += balance
+        else:
+            net_worth.setdefault(user_id, Decimal('0.00'))
+
+    _write(
+        account_rows,
+        [NetWorthSnapshot(user_id=user_id, date=day, total=total) for user_id, total in net_worth.items()],
+    )
+    return len(account_rows)
+
+
+def _daily_effects(user_id, date_to):
+    """``{date: {account_id: signed total}}`` for every balance-moving row of the user."""
+    effects = defaultdict(lambda: defaultdict(Decimal))
+    rows = Transaction.objects.filter(
+        user_id=user_id,
+        credit_card__isnull=True,
+        date__lte=date_to,
+    ).order_by().values('date', 'account_id').annotate(total=Sum(SIGNED_AMOUNT))
+    for row in rows:
+        effects[row['date']][row['account_id']] += row['total']
+
+    for archive in TransactionArchive.objects.filter(user_id=user_id, month__lte=date_to):
+        for row in decode_archive(archive):
+            if row['credit_card_id'] is not None or row['date'] > date_to:
+                continue
+            amount = row['amount'] if row['transaction_type'] == Transaction.INCOME else -row['amount']
+            effects[row['date']][archive.account_id] += amount
+    return effects
+
+
+def backfill_user(user_id, date_from=None, date_to=None):
+    """
+    Rebuild the snapshots of one user for ``[date_from, date_to]`` (default:
+    from the first transaction to yesterday). Returns the account rows written.
+    """
+    date_to = date_to or timezone.localdate() - timedelta(days=1)
+    accounts = list(
+        Account.objects.filter(user_id=user_id).values_list(
+            'pk', 'initial_balance', 'is_active', 'created_at'
+        )
+    )
+    if not accounts:
+        return 0
+
+    effects = _daily_effects(user_id, date_to)
+    # An account shows up from its creation or its first transaction, whichever comes first.
+    opened = {account_id: created_at.date() for account_id, _, _, created_at in accounts}
+    for day, per_account in effects.items():
+        for account_id in per_account:
+            if account_id in opened and day < opened[account_id]:
+                opened[account_id] = day
+
+    first_day = min(opened.values())
+    date_from = max(date_from or first_day, first_day)
+    balances = {account_id: initial_balance for account_id, initial_balance, _, _ in accounts}
+    active = {account_id for account_id, _, is_active, _ in accounts if is_active}
+
+    # Everything before the range only moves the opening balances.
+    for day in sorted(day for day in effects if day < date_from):
+        for account_id, amount in effects[day].items():
+            balances[account_id] += amount
+
+    account_rows = []
+    net_worth_rows = []
+    written = 0
+    day = date_from
+    while day <= date_to:
+        for account_id, amount in effects.get(day, {}).items():
+            balances[account_id] += amount
+        total = Decimal('0.00')
+        for account_id, balance in balances.items():
+            if day < opened[account_id]:
+                continue
+            account_rows.append(
+                AccountBalanceSnapshot(user_id=user_id, account_id=account_id, date=day, balance=balance)
+            )
+            if account_id in active:
+                total += balance
+        net_worth_rows.append(NetWorthSnapshot(user_id=user_id, date=day, total=total))
+
+        if len(account_rows) >= SNAPSHOT_BATCH_SIZE:
+            _write(account_rows, net_worth_rows)
+            written += len(account_rows)
+            account_rows, net_worth_rows = [], []
+        day += timedelta(days=1)
+
+    _write(account_rows, net_worth_rows)
+    return written + len(account_rows)
@@ -1,9 +1,9 @@
-from datetime import date, datetime
-from decimal import Decimal, InvalidOperation
+from datetime import datetime
 
 from django import template
 from django.utils import timezone
-from django.utils.formats import number_format
+
+from core import formatting
 
 register = template.Library()
 
@@ -11,29 +11,13 @@ register = template.Library()
 @register.filter
 def format_currency(value):
     '''Format value as Brazilian Real: R$ 1.234,56 or -R$ 1.234,56'''
-    try:
-        value = Decimal(str(value))
-    except (TypeError, ValueError, InvalidOperation):
-        return 'R$ 0,00'
-    formatted = number_format(abs(value), decimal_pos=2, use_l10n=True, force_grouping=True)
-    if value < 0:
-        return f'-R$ {formatted}'
-    return f'R$ {formatted}'
+    return formatting.format_brl(value)
 
 
 @register.filter
 def format_currency_signed(value):
     '''Format value with explicit sign: +R$ 1.234,56 or -R$ 1.234,56'''
-    try:
-        value = Decimal(str(value))
-    except (TypeError, ValueError, InvalidOperation):
-        return 'R$ 0,00'
-    formatted = number_format(abs(value), decimal_pos=2, use_l10n=True, force_grouping=True)
-    if value > 0:
-        return f'+R$ {formatted}'
-    elif value < 0:
-        return f'-R$ {formatted}'
-    return 'R$ 0,00'
+    return formatting.format_brl_signed(value)
 
 
 @register.filter
@@ -57,11 +41,7 @@ def format_date_relative(value):
 @register.filter
 def format_date_br(value):
     '''Format date as DD/MM/YYYY'''
-    if not value:
-        return ''
-    if isinstance(value, datetime):
-        return value.strftime('%d/%m/%Y')
-    return value.strftime('%d/%m/%Y')
+    return formatting.format_date_br(value)
 
 
 @register.filter
@@ -87,9 +67,8 @@ def format_date_short(value):
 @register.filter
 def currency_class(value):
     '''Return CSS class based on value sign (positive=green, negative=red)'''
-    try:
-        value = Decimal(str(value))
-    except (TypeError, ValueError, InvalidOperation):
+    value = formatting.to_decimal(value)
+    if value is None:
         return 'text-slate-100'
     if value > 0:
         return 'text-green-400'
@@ -1,12 +1,20 @@
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.http import Http404
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.test.client import RequestFactory
 from django.urls import reverse
+from django.utils import timezone
 
+from .balances import balance_as_of, build_balance_checkpoints, daily_balances, running_balance
+from .bills import close_card_bills
 from .forms import (
     AccountForm,
     AccountUpdateForm,
@@ -14,12 +22,24 @@ from .forms import (
     CreditCardForm,
     TransferForm,
 )
-from .models import Account, CardBill, CreditCard
-from .services import debit_account, get_default_account
+from .models import (
+    Account,
+    AccountBalanceCheckpoint,
+    AccountBalanceSnapshot,
+    BillingCycle,
+    CardBill,
+    CreditCard,
+    NetWorthSnapshot,
+)
+from .services import debit_account, find_balance_drift, get_default_account
+from .snapshots import backfill_user, snapshot_day
 from .templatetags.account_tags import get_bank_icon_path
+from .transfers import TransferError, transfer_between_accounts
 from .views import CardDetailView, CardListView
 from categories.models import Category
-from transactions.models import Transaction
+from core.cache import get_user_data_version
+from transactions.archive import archive_transactions
+from transactions.models import MonthlyCategoryRollup, Transaction
 
 
 class AccountModelTests(TestCase):
@@ -134,6 +154,47 @@ class CreditCardModelTests(TestCase):
         self.assertLessEqual(self.card.current_billing_start, self.card.current_billing_end)
         self.assertGreaterEqual(self.card.next_due_date, date.today())
 
+    def test_billing_cycle_depends_on_closing_and_due_days(self):
+        before_closing = BillingCycle.for_days(10, 20, today=date(2026, 1, 5))
+        self.assertEqual(before_closing.start, date(2025, 12, 11))
+        self.assertEqual(before_closing.end, date(2026, 1, 10))
+        self.assertEqual(before_closing.due_date, date(2026, 1, 20))
+        self.assertEqual(before_closing.reference_month, date(2026, 1, 1))
+
+        after_closing = BillingCycle.for_days(10, 3, today=date(2026, 12, 15))
+        self.assertEqual(after_closing.start, date(2026, 12, 11))
+        self.assertEqual(after_closing.end, date(2027, 1, 10))
+        self.assertEqual(after_closing.due_date, date(2027, 1, 3))
+
+    def test_with_current_bill_annotates_every_card_in_one_query(self):
+        other_card = CreditCard.objects.create(
+            user=self.user,
+            name='Cartao Secundario',
+            bank_code=Account.ITAU,
+            credit_limit=Decimal('800.00'),
+            closing_day=25,
+            due_day=5,
+        )
+        for card, amount in ((self.card, '70.00'), (other_card, '30.00'), (other_card, '15.00')):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.category,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal(amount),
+                date=card.current_billing_end,
+                credit_card=card,
+            )
+
+        with self.assertNumQueries(1):
+            cards = {card.name: card for card in CreditCard.objects.with_current_bill()}
+            amounts = {name: card.current_bill_amount for name, card in cards.items()}
+            limits = {name: card.available_limit for name, card in cards.items()}
+
+        self.assertEqual(amounts, {'Nubank Roxinho': Decimal('70.00'), 'Cartao Secundario': Decimal('45.00')})
+        self.assertEqual(limits['Cartao Secundario'], Decimal('755.00'))
+        self.assertEqual(amounts['Cartao Secundario'], other_card.current_bill_amount)
+
     def test_card_bill_pay_bill_creates_expense_transaction_and_marks_bill_paid(self):
         bill = CardBill.objects.create(
             credit_card=self.card,
@@ -399,6 +460,581 @@ class AccountServiceTests(TestCase):
         self.assertEqual(account.current_balance, Decimal('164.50'))
 
 
+class ReconcileBalancesTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='reconcile@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Conferida',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('500.00'),
+        )
+        self.other_account = Account.objects.create(
+            user=self.user,
+            name='Conta Correta',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('80.00'),
+        )
+        income = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+        expense = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        card = CreditCard.objects.create(
+            user=self.user,
+            name='Cartao',
+            bank_code=Account.NUBANK,
+            credit_limit=Decimal('1000.00'),
+            closing_day=5,
+            due_day=12,
+        )
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, account=self.account, category=income,
+                transaction_type=Transaction.INCOME, amount=Decimal('300.00'),
+                date=date(2026, 5, 1),
+            ),
+            Transaction(
+                user=self.user, account=self.account, category=expense,
+                transaction_type=Transaction.EXPENSE, amount=Decimal('120.00'),
+                date=date(2026, 5, 2),
+            ),
+            Transaction(
+                user=self.user, account=self.account, category=expense,
+                credit_card=card, transaction_type=Transaction.EXPENSE,
+                amount=Decimal('999.00'), date=date(2026, 5, 3),
+            ),
+        ])
+
+    def test_find_balance_drift_ignores_card_purchases_and_correct_accounts(self):
+        drifts = find_balance_drift(user_ids=[self.user.pk])
+
+        self.assertEqual(len(drifts), 1)
+        self.assertEqual(drifts[0].account_id, self.account.pk)
+        self.assertEqual(drifts[0].expected_balance, Decimal('680.00'))
+        self.assertEqual(drifts[0].difference, Decimal('-180.00'))
+
+    def test_command_reports_without_fix_and_repairs_with_fix(self):
+        output = StringIO()
+        call_command('reconcile_balances', stdout=output)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('500.00'))
+        self.assertIn('1 contas divergentes', output.getvalue())
+
+        version = get_user_data_version(self.user.pk)
+        output = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_balances', '--fix', '--chunk-size', '1', '--batch-size', '1', stdout=output)
+        self.assertNotEqual(get_user_data_version(self.user.pk), version)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('680.00'))
+        self.assertIn('1 corrigidas', output.getvalue())
+        self.assertEqual(find_balance_drift(), [])
+
+
+class AccountBalanceHistoryTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='history@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Historico',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('100.00'),
+        )
+        self.income = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+        self.expense = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        for transaction_type, category, amount, day in (
+            (Transaction.INCOME, self.income, '50.00', date(2025, 3, 10)),
+            (Transaction.EXPENSE, self.expense, '30.00', date(2025, 4, 5)),
+            (Transaction.INCOME, self.income, '20.00', date(2025, 4, 20)),
+        ):
+            self.create_transaction(transaction_type, category, amount, day)
+
+    def create_transaction(self, transaction_type, category, amount, day):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=category,
+            transaction_type=transaction_type,
+            amount=Decimal(amount),
+            date=day,
+        )
+
+    def test_running_balance_annotates_balance_after_each_row(self):
+        rows = list(running_balance(self.account, date_from=date(2025, 4, 1)))
+
+        self.assertEqual([row.signed_amount for row in rows], [Decimal('-30.00'), Decimal('20.00')])
+        self.assertEqual([row.running_balance for row in rows], [Decimal('120.00'), Decimal('140.00')])
+
+    def test_daily_balances_and_snapshots_follow_archived_days(self):
+        before = daily_balances(self.account, date(2025, 3, 9), date(2025, 4, 6))
+
+        archive_transactions(before=date(2025, 4, 1), user_ids=[self.user.pk])
+
+        self.assertEqual(Transaction.objects.filter(date__lt=date(2025, 4, 1)).count(), 0)
+        self.assertEqual(daily_balances(self.account, date(2025, 3, 9), date(2025, 4, 6)), before)
+        self.assertEqual(before[0], (date(2025, 3, 9), Decimal('100.00')))
+        self.assertEqual(before[1], (date(2025, 3, 10), Decimal('150.00')))
+
+        snapshot_day([self.user.pk], date(2025, 3, 9))
+        snapshot = AccountBalanceSnapshot.objects.get(account=self.account, date=date(2025, 3, 9))
+        self.assertEqual(snapshot.balance, Decimal('100.00'))
+
+    def test_running_balance_starts_at_the_archive_horizon(self):
+        archive_transactions(before=date(2025, 4, 1), user_ids=[self.user.pk])
+
+        rows = list(running_balance(self.account, date_from=date(2025, 3, 1)))
+
+        self.assertEqual([row.date for row in rows], [date(2025, 4, 5), date(2025, 4, 20)])
+        self.assertEqual([row.running_balance for row in rows], [Decimal('120.00'), Decimal('140.00')])
+
+    def test_balance_as_of_matches_with_and_without_checkpoints(self):
+        expected = {
+            date(2025, 2, 28): Decimal('100.00'),
+            date(2025, 3, 31): Decimal('150.00'),
+            date(2025, 4, 10): Decimal('120.00'),
+            date(2025, 5, 31): Decimal('140.00'),
+        }
+        for as_of, balance in expected.items():
+            self.assertEqual(balance_as_of(self.account, as_of), balance)
+
+        self.assertEqual(build_balance_checkpoints(until=date(2025, 5, 31)), 3)
+        for as_of, balance in expected.items():
+            self.assertEqual(balance_as_of(self.account, as_of), balance)
+
+    def test_back_dated_transaction_shifts_later_checkpoints(self):
+        build_balance_checkpoints(until=date(2025, 5, 31))
+
+        self.create_transaction(Transaction.EXPENSE, self.expense, '15.00', date(2025, 4, 2))
+
+        checkpoints = dict(
+            AccountBalanceCheckpoint.objects.filter(account=self.account).values_list('date', 'balance')
+        )
+        self.assertEqual(checkpoints[date(2025, 3, 31)], Decimal('150.00'))
+        self.assertEqual(checkpoints[date(2025, 4, 30)], Decimal('125.00'))
+        self.assertEqual(checkpoints[date(2025, 5, 31)], Decimal('125.00'))
+        self.assertEqual(balance_as_of(self.account, date(2025, 5, 31)), Decimal('125.00'))
+
+    def test_balance_history_endpoint_returns_daily_points_for_owner_only(self):
+        self.client.force_login(self.user)
+        url = reverse('accounts:balance_history', args=[self.account.pk])
+
+        response = self.client.get(url, {'date_from': '2025-04-04', 'date_to': '2025-04-06'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'account': self.account.pk,
+            'date_from': '2025-04-04',
+            'date_to': '2025-04-06',
+            'points': [
+                {'date': '2025-04-04', 'balance': 150.0},
+                {'date': '2025-04-05', 'balance': 120.0},
+                {'date': '2025-04-06', 'balance': 120.0},
+            ],
+        })
+        self.assertEqual(self.client.get(url, {'date_from': 'ontem'}).status_code, 400)
+
+        other_user = get_user_model().objects.create_user(
+            email='history-other@example.com',
+            password='secret123'
+        )
+        self.client.force_login(other_user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_account_detail_lists_recent_transactions_with_running_balance(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('accounts:detail', args=[self.account.pk]))
+
+        recent = response.context['recent_transactions']
+        self.assertEqual([row.running_balance for row in recent], [
+            Decimal('140.00'), Decimal('120.00'), Decimal('150.00'),
+        ])
+        self.assertContains(response, 'Saldo')
+
+    def test_account_detail_lists_card_purchases_without_moving_the_balance(self):
+        card = CreditCard.objects.create(
+            user=self.user,
+            name='Cartao Historico',
+            bank_code=Account.NUBANK,
+            credit_limit=Decimal('1000.00'),
+            closing_day=10,
+            due_day=20,
+        )
+        purchase = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.expense,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('70.00'),
+            date=date(2025, 4, 10),
+            description='Compra no cartao',
+            credit_card=card,
+        )
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('accounts:detail', args=[self.account.pk]))
+
+        recent = response.context['recent_transactions']
+        self.assertEqual([row.pk for row in recent][1], purchase.pk)
+        self.assertEqual(recent[1].signed_amount, Decimal('-70.00'))
+        self.assertEqual([row.running_balance for row in recent], [
+            Decimal('140.00'), Decimal('120.00'), Decimal('120.00'), Decimal('150.00'),
+        ])
+        self.assertContains(response, 'Compra no cartao')
+        self.assertEqual(list(running_balance(self.account, date_from=date(2025, 4, 1))), [
+            row for row in recent[::-1] if row.date >= date(2025, 4, 1) and row.pk != purchase.pk
+        ])
+
+
+class BalanceSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='snapshots@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Snapshot',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('100.00'),
+        )
+        self.closed_account = Account.objects.create(
+            user=self.user,
+            name='Conta Encerrada',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('40.00'),
+            is_active=False,
+        )
+        income = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+        expense = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        for account, transaction_type, category, amount, day in (
+            (self.account, Transaction.INCOME, income, '50.00', date(2025, 3, 10)),
+            (self.account, Transaction.EXPENSE, expense, '30.00', date(2025, 4, 5)),
+            (self.account, Transaction.INCOME, income, '20.00', date(2025, 4, 20)),
+            (self.closed_account, Transaction.EXPENSE, expense, '10.00', date(2025, 3, 12)),
+        ):
+            Transaction.objects.create(
+                user=self.user,
+                account=account,
+                category=category,
+                transaction_type=transaction_type,
+                amount=Decimal(amount),
+                date=day,
+            )
+
+    def net_worth(self):
+        return dict(NetWorthSnapshot.objects.filter(user=self.user).values_list('date', 'total'))
+
+    def test_backfill_accumulates_daily_totals_from_first_activity(self):
+        written = backfill_user(self.user.pk, date_to=date(2025, 4, 6))
+
+        account_rows = AccountBalanceSnapshot.objects.filter(account=self.account)
+        self.assertEqual(account_rows.count(), 28)
+        self.assertEqual(written, 28 + 26)
+        self.assertEqual(account_rows.get(date=date(2025, 4, 4)).balance, Decimal('150.00'))
+        self.assertEqual(account_rows.get(date=date(2025, 4, 6)).balance, Decimal('120.00'))
+
+        net_worth = self.net_worth()
+        self.assertNotIn(date(2025, 3, 9), net_worth)
+        self.assertEqual(net_worth[date(2025, 3, 10)], Decimal('150.00'))
+        self.assertEqual(net_worth[date(2025, 4, 6)], Decimal('120.00'))
+
+    def test_snapshot_day_matches_backfill_and_overwrites_existing_rows(self):
+        backfill_user(self.user.pk, date_to=date(2025, 4, 6))
+        NetWorthSnapshot.objects.filter(date=date(2025, 4, 6)).update(total=Decimal('0.00'))
+
+        snapshot_day([self.user.pk], date(2025, 4, 6))
+
+        self.assertEqual(self.net_worth()[date(2025, 4, 6)], Decimal('120.00'))
+        self.assertEqual(
+            AccountBalanceSnapshot.objects.get(account=self.closed_account, date=date(2025, 4, 6)).balance,
+            Decimal('30.00'),
+        )
+
+    def test_command_backfills_history_for_selected_users(self):
+        output = StringIO()
+        call_command(
+            'snapshot_balances', '--backfill', '--from', '2025-04-01', '--date', '2025-04-06',
+            '--user', str(self.user.pk), stdout=output,
+        )
+
+        self.assertEqual(sorted(self.net_worth()), [date(2025, 4, day) for day in range(1, 7)])
+        self.assertIn('12 saldos diários gravados até 06/04/2025', output.getvalue())
+
+
+class CloseCardBillsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='bills@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Compras',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        self.card = self.create_card('Cartao Dez', closing_day=10, due_day=20)
+        self.other_card = self.create_card('Cartao Vinte e Cinco', closing_day=25, due_day=5)
+        CreditCard.objects.update(created_at=timezone.make_aware(datetime(2025, 1, 1)))
+        for card, amount, day in (
+            (self.card, '30.00', date(2026, 1, 15)),
+            (self.card, '100.00', date(2026, 2, 20)),
+            (self.card, '50.00', date(2026, 3, 5)),
+            (self.card, '999.00', date(2026, 3, 12)),
+            (self.other_card, '70.00', date(2026, 2, 20)),
+        ):
+            self.purchase(card, amount, day)
+
+    def create_card(self, name, closing_day, due_day):
+        return CreditCard.objects.create(
+            user=self.user,
+            name=name,
+            bank_code=Account.NUBANK,
+            credit_limit=Decimal('5000.00'),
+            closing_day=closing_day,
+            due_day=due_day,
+        )
+
+    def purchase(self, card, amount, day):
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal(amount),
+            date=day,
+            credit_card=card,
+        )
+
+    def test_creates_bills_for_closed_cycles_and_skips_paid_ones(self):
+        CardBill.objects.create(
+            credit_card=self.card,
+            reference_month=date(2026, 2, 1),
+            closing_date=date(2026, 2, 10),
+            due_date=date(2026, 2, 20),
+            total_amount=Decimal('30.00'),
+            status=CardBill.PAID,
+        )
+
+        result = close_card_bills(today=date(2026, 3, 15), months=2)
+
+        self.assertEqual((result.created, result.updated), (2, 0))
+        march_bill = CardBill.objects.get(credit_card=self.card, reference_month=date(2026, 3, 1))
+        self.assertEqual(march_bill.total_amount, Decimal('150.00'))
+        self.assertEqual(march_bill.closing_date, date(2026, 3, 10))
+        self.assertEqual(march_bill.due_date, date(2026, 3, 20))
+        self.assertEqual(march_bill.status, CardBill.CLOSED)
+        other_bill = CardBill.objects.get(credit_card=self.other_card)
+        self.assertEqual(other_bill.reference_month, date(2026, 2, 1))
+        self.assertEqual(other_bill.total_amount, Decimal('70.00'))
+        self.assertEqual(other_bill.due_date, date(2026, 3, 5))
+
+    def test_pay_bill_pays_the_closed_bill_at_its_stored_total(self):
+        close_card_bills(today=date(2026, 3, 15))
+        # A purchase in today's open cycle must stay on the next bill.
+        self.purchase(self.card, '50.00', self.card.billing_cycle.start)
+
+        payment = self.card.pay_bill(self.account)
+
+        march_bill = CardBill.objects.get(credit_card=self.card, reference_month=date(2026, 3, 1))
+        self.assertEqual(march_bill.status, CardBill.PAID)
+        self.assertEqual(march_bill.total_amount, Decimal('150.00'))
+        self.assertEqual(march_bill.closing_date, date(2026, 3, 10))
+        self.assertEqual(payment.amount, Decimal('150.00'))
+        self.assertFalse(CardBill.objects.filter(credit_card=self.card, status=CardBill.CLOSED).exists())
+
+    def test_chunked_run_matches_and_binds_no_card_ids_in_the_case(self):
+        with CaptureQueriesContext(connection) as captured:
+            result = close_card_bills(today=date(2026, 3, 15), months=2, chunk_size=1)
+
+        self.assertEqual((result.created, result.updated), (3, 0))
+        self.assertEqual(
+            set(CardBill.objects.values_list('credit_card_id', 'reference_month', 'total_amount')),
+            {
+                (self.card.pk, date(2026, 2, 1), Decimal('30.00')),
+                (self.card.pk, date(2026, 3, 1), Decimal('150.00')),
+                (self.other_card.pk, date(2026, 2, 1), Decimal('70.00')),
+            },
+        )
+        totals_queries = [query['sql'] for query in captured.captured_queries if 'CASE WHEN' in query['sql']]
+        self.assertEqual(len(totals_queries), 2)
+        for sql in totals_queries:
+            self.assertIn('"closing_day" =', sql)
+
+    def test_bill_save_signal_does_not_load_the_card(self):
+        bill = CardBill.objects.create(
+            credit_card=self.card,
+            reference_month=date(2026, 2, 1),
+            closing_date=date(2026, 2, 10),
+            due_date=date(2026, 2, 20),
+            total_amount=Decimal('30.00'),
+            status=CardBill.CLOSED,
+        )
+        through_card = self.card.bills.get()
+        standalone = CardBill.objects.get(pk=bill.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            through_card.save(update_fields=['status'])
+        self.assertEqual(len(queries), 1)
+
+        version = get_user_data_version(self.user.pk)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            standalone.save(update_fields=['status'])
+        self.assertEqual(len(queries), 2)
+        self.assertIn('"user_id"', queries[1]['sql'])
+        self.assertNotIn('"closing_day"', queries[1]['sql'])
+        self.assertNotEqual(get_user_data_version(self.user.pk), version)
+
+    def test_close_card_bills_sends_no_per_bill_signal(self):
+        with mock.patch('accounts.signals.bump_user_data_version') as bump:
+            close_card_bills(today=date(2026, 4, 1), months=3)
+
+        self.assertTrue(CardBill.objects.exists())
+        bump.assert_not_called()
+
+    def test_rerun_updates_totals_of_unpaid_bills(self):
+        close_card_bills(today=date(2026, 3, 15))
+        self.purchase(self.card, '20.00', date(2026, 3, 1))
+
+        result = close_card_bills(today=date(2026, 3, 15))
+
+        self.assertEqual((result.created, result.updated), (0, 1))
+        self.assertEqual(
+            CardBill.objects.get(credit_card=self.card, reference_month=date(2026, 3, 1)).total_amount,
+            Decimal('170.00'),
+        )
+
+    def test_command_reports_and_card_list_shows_closed_bill(self):
+        output = StringIO()
+        call_command('close_card_bills', '--date', '2026-03-15', '--months', '2', stdout=output)
+        self.assertIn('3 faturas criadas, 0 atualizadas', output.getvalue())
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('accounts:card_list'))
+        closed = {card.name: card.closed_bill_total for card in response.context['cards']}
+        self.assertEqual(closed, {'Cartao Dez': Decimal('150.00'), 'Cartao Vinte e Cinco': Decimal('70.00')})
+        self.assertContains(response, 'Fatura fechada')
+
+
+class TransferServiceTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transfer-service@example.com',
+            password='secret123'
+        )
+        self.from_account = Account.objects.create(
+            user=self.user,
+            name='Conta Origem',
+            account_type=Account.CHECKING,
+            bank_code=Account.NUBANK,
+            initial_balance=Decimal('300.00'),
+        )
+        self.to_account = Account.objects.create(
+            user=self.user,
+            name='Conta Destino',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('50.00'),
+        )
+
+    def test_transfer_links_legs_and_updates_both_balances_in_one_statement(self):
+        with CaptureQueriesContext(connection) as captured:
+            result = transfer_between_accounts(
+                self.from_account,
+                self.to_account,
+                Decimal('120.00'),
+                date=date(2026, 5, 10),
+                description='Reserva',
+            )
+
+        balance_updates = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('UPDATE "accounts_account"')
+        ]
+        self.assertEqual(len(balance_updates), 1)
+        self.assertEqual((result.from_balance, result.to_balance), (Decimal('180.00'), Decimal('170.00')))
+
+        self.from_account.refresh_from_db()
+        self.to_account.refresh_from_db()
+        self.assertEqual(self.from_account.current_balance, Decimal('180.00'))
+        self.assertEqual(self.to_account.current_balance, Decimal('170.00'))
+
+        legs = Transaction.objects.filter(transfer_id=result.transfer_id)
+        self.assertEqual(
+            set(legs.values_list('account_id', 'transaction_type')),
+            {(self.from_account.pk, Transaction.EXPENSE), (self.to_account.pk, Transaction.INCOME)},
+        )
+        self.assertEqual(
+            MonthlyCategoryRollup.objects.filter(user=self.user, month=date(2026, 5, 1)).count(),
+            2,
+        )
+        self.assertEqual(find_balance_drift(user_ids=[self.user.pk]), [])
+
+    def test_invalid_transfer_changes_nothing(self):
+        with self.assertRaises(TransferError):
+            transfer_between_accounts(self.from_account, self.from_account, Decimal('10.00'))
+
+        other_user = get_user_model().objects.create_user(
+            email='transfer-other@example.com',
+            password='secret123'
+        )
+        foreign_account = Account.objects.create(
+            user=other_user,
+            name='Conta Alheia',
+            account_type=Account.WALLET,
+            initial_balance=Decimal('0.00'),
+        )
+        with self.assertRaises(TransferError):
+            transfer_between_accounts(self.from_account, foreign_account, Decimal('10.00'))
+
+        self.assertFalse(Transaction.objects.exists())
+        self.from_account.refresh_from_db()
+        self.assertEqual(self.from_account.current_balance, Decimal('300.00'))
+
+
 class AccountTransferViewTests(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(
@@ -0,0 +1,126 @@
+"""
+Transfers between two accounts of the same user.
+
+``transfer_between_accounts`` runs in one database transaction:
+
+1. both accounts are locked with ``SELECT ... FOR UPDATE`` in primary key
+   order, so two opposite transfers on the same pair queue up instead of
+   deadlocking;
+2. the expense and income legs are inserted with one ``bulk_create`` and
+   share a ``transfer_id``;
+3. both balances change in a single ``UPDATE ... CASE``.
+
+``bulk_create`` skips the transaction signals, so the monthly rollups,
+balance checkpoints and cache version are recorded through
+``record_bookkeeping`` (without balance deltas, already applied in step 3).
+The new balances are computed from the locked rows, with no extra read.
+"""
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from categories.models import Category
+from transactions.bookkeeping import record_bookkeeping
+from transactions.models import Transaction
+from transactions.rollups import add_rollup_delta, transaction_rollup_key
+
+from .balances import checkpoint_key
+from .models import Account
+
+
+class TransferError(Exception):
+    """Raised when a transfer cannot be applied; nothing is changed in that case."""
+
+
+@dataclass(frozen=True)
+class TransferResult:
+    transfer_id: uuid.UUID
+    debit: Transaction
+    credit: Transaction
+    from_balance: Decimal
+    to_balance: Decimal
+
+
+def get_transfer_category():
+    category, _ = Category.objects.get_or_create(
+        user=None,
+        name='Transferência',
+        defaults={
+            'category_type': Category.EXPENSE,
+            'color': '#525252',
+            'is_default': True,
+            'is_active': True,
+        },
+    )
+    return category
+
+
+def transfer_between_accounts(from_account, to_account, amount, date=None, description='', category=None):
+    """Move ``amount`` from ``from_account`` to ``to_account``; returns a ``TransferResult``."""
+    if from_account.pk == to_account.pk:
+        raise TransferError('As contas de origem e destino devem ser diferentes.')
+    if from_account.user_id != to_account.user_id:
+        raise TransferError('As contas devem pertencer ao mesmo usuário.')
+    if amount <= 0:
+        raise TransferError('O valor da transferência deve ser maior que zero.')
+
+    category = category or get_transfer_category()
+    transfer_date = date or timezone.localdate()
+    transfer_id = uuid.uuid4()
+    legs = [
+        Transaction(
+            user_id=from_account.user_id,
+            account_id=account.pk,
+            category=category,
+            transaction_type=transaction_type,
+            amount=amount,
+            date=transfer_date,
+            description=description,
+            transfer_id=transfer_id,
+        )
+        for account, transaction_type in (
+            (from_account, Transaction.EXPENSE),
+            (to_account, Transaction.INCOME),
+        )
+    ]
+
+    with transaction.atomic():
+        balances = dict(
+            Account.objects.select_for_update().filter(
+                pk__in=[from_account.pk, to_account.pk],
+            ).order_by('pk').values_list('pk', 'current_balance')
+        )
+        if len(balances) != 2:
+            raise TransferError('Conta inválida para a transferência.')
+
+        debit, credit = Transaction.objects.bulk_create(legs)
+        Account.objects.filter(pk__in=[from_account.pk, to_account.pk]).update(
+            current_balance=Case(
+                When(pk=from_account.pk, then=F('current_balance') - amount),
+                When(pk=to_account.pk, then=F('current_balance') + amount),
+            )
+        )
+
+        rollup_deltas = {}
+        checkpoint_deltas = defaultdict(Decimal)
+        for leg, effect in ((debit, -amount), (credit, amount)):
+            add_rollup_delta(rollup_deltas, transaction_rollup_key(leg), amount, 1)
+            checkpoint_deltas[checkpoint_key(leg.account_id, leg.date)] += effect
+        record_bookkeeping(
+            rollup_deltas=rollup_deltas,
+            user_ids=[from_account.user_id],
+            checkpoint_deltas=checkpoint_deltas,
+        )
+
+    return TransferResult(
+        transfer_id=transfer_id,
+        debit=debit,
+        credit=credit,
+        from_balance=balances[from_account.pk] - amount,
+        to_balance=balances[to_account.pk] + amount,
+    )
@@ -15,6 +15,7 @@ urlpatterns = [
     path('cartoes/<int:pk>/excluir/', views.CardDeleteView.as_view(), name='card_delete'),
     path('cartoes/<int:pk>/pagar/', views.CardBillPayView.as_view(), name='card_bill_pay'),
     path('<int:pk>/', views.AccountDetailView.as_view(), name='detail'),
+    path('<int:pk>/saldo/', views.AccountBalanceHistoryView.as_view(), name='balance_history'),
     path('<int:pk>/editar/', views.AccountUpdateView.as_view(), name='update'),
     path('<int:pk>/excluir/', views.AccountDeleteView.as_view(), name='delete'),
 ]
@@ -1,11 +1,14 @@
 import logging
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Sum
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.views import View
 from django.views.generic import (
     CreateView,
@@ -16,9 +19,7 @@ from django.views.generic import (
     UpdateView,
 )
 
-from categories.models import Category
-from transactions.models import Transaction
-
+from .balances import daily_balances, running_balance
 from .forms import (
     AccountForm,
     AccountUpdateForm,
@@ -27,7 +28,7 @@ from .forms import (
     TransferForm,
 )
 from .models import Account, CardBill, CreditCard
-from .services import debit_account
+from .transfers import TransferError, transfer_between_accounts
 
 logger = logging.getLogger(__name__)
 
@@ -175,18 +176,71 @@ class AccountDetailView(LoginRequiredMixin, DetailView):
         """Return only accounts owned by the logged user."""
         return Account.objects.filter(user=self.request.user)
 
+    recent_transactions_limit = 10
+
     def get_context_data(self, **kwargs):
-        """Add recent transactions to context."""
+        """
+        Add recent transactions to context, with the balance after each one
+        that moves it (card purchases are listed without a balance).
+        """
         context = super().get_context_data(**kwargs)
 
-        # Get last 10 transactions for this account with related data
-        context['recent_transactions'] = self.object.transactions.select_related(
-            'category'
-        ).order_by('-date', '-created_at')[:10]
+        # The running balance window only needs to start at the date of the
+        # oldest row shown; everything before it comes from balance_as_of.
+        limit = self.recent_transactions_limit
+        cutoff = self.object.transactions.order_by(
+            '-date', '-created_at', '-pk'
+        ).values_list('date', flat=True)[limit - 1:limit].first()
+
+        recent = running_balance(
+            self.object, date_from=cutoff, include_card_purchases=True
+        ).select_related('category')
+        context['recent_transactions'] = list(recent)[-limit:][::-1]
 
         return context
 
 
+class AccountBalanceHistoryView(LoginRequiredMixin, View):
+    """Daily closing balances of an account as JSON (default: last 30 days)."""
+    http_method_names = ['get']
+    default_days = 30
+    max_days = 366
+
+    def get(self, request, *args, **kwargs):
+        account = get_object_or_404(Account, pk=kwargs['pk'], user=request.user)
+        today = timezone.localdate()
+        try:
+            date_to = self._parse_date(request.GET.get('date_to')) or today
+            date_from = (
+                self._parse_date(request.GET.get('date_from'))
+                or date_to - timedelta(days=self.default_days - 1)
+            )
+        except ValueError:
+            return JsonResponse({'error': 'Data inválida. Use o formato AAAA-MM-DD.'}, status=400)
+        if date_from > date_to:
+            return JsonResponse({'error': 'A data inicial deve ser anterior à data final.'}, status=400)
+        if (date_to - date_from).days >= self.max_days:
+            return JsonResponse(
+                {'error': f'O período máximo é de {self.max_days} dias.'},
+                status=400,
+            )
+
+        payload = {
+            'account': account.pk,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'points': [
+                {'date': day.isoformat(), 'balance': float(balance)}
+                for day, balance in daily_balances(account, date_from, date_to)
+            ],
+        }
+        return JsonResponse(payload)
+
+    @staticmethod
+    def _parse_date(value):
+        return date.fromisoformat(value) if value else None
+
+
 class TransferView(LoginRequiredMixin, FormView):
     """Transfer balance between two user accounts."""
 
@@ -208,34 +262,17 @@ class TransferView(LoginRequiredMixin, FormView):
         message_description = (
             f'Transferencia: {description}' if description else 'Transferencia'
         )
-        transfer_category, _ = Category.objects.get_or_create(
-            user=None,
-            name='Transferência',
-            defaults={
-                'category_type': Category.EXPENSE,
-                'color': '#525252',
-                'is_default': True,
-                'is_active': True,
-            },
-        )
-
         try:
-            debit_account(
+            result = transfer_between_accounts(
                 from_account,
+                to_account,
                 amount,
-                message_description,
-                category=transfer_category,
-                date=transfer_date,
-            )
-            Transaction.objects.create(
-                user=self.request.user,
-                account=to_account,
-                category=transfer_category,
-                transaction_type=Transaction.INCOME,
-                amount=amount,
                 date=transfer_date,
                 description=message_description,
             )
+        except TransferError as exc:
+            messages.error(self.request, str(exc))
+            return HttpResponseRedirect(self.get_success_url())
         except Exception:
             logger.exception(
                 'Erro ao transferir saldo entre contas para o usuario %s',
@@ -247,8 +284,7 @@ class TransferView(LoginRequiredMixin, FormView):
             )
             return HttpResponseRedirect(self.get_success_url())
 
-        from_account.refresh_from_db()
-        if from_account.current_balance < 0:
+        if result.from_balance < 0:
             messages.warning(self.request, 'Atenção: sua conta ficou com saldo negativo.')
 
         messages.success(self.request, 'Transferência realizada com sucesso!')
@@ -264,7 +300,7 @@ class CardListView(LoginRequiredMixin, ListView):
         return CreditCard.objects.filter(
             user=self.request.user,
             is_active=True,
-        ).order_by('name')
+        ).with_current_bill().with_closed_bill().order_by('name')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -328,7 +364,7 @@ class CardDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'card'
 
     def get_queryset(self):
-        return CreditCard.objects.filter(user=self.request.user)
+        return CreditCard.objects.filter(user=self.request.user).with_current_bill()
 
     def get_object(self, queryset=None):
         queryset = queryset or self.get_queryset()
@@ -339,9 +375,10 @@ class CardDetailView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        cycle = self.object.billing_cycle
         context['current_bill_transactions'] = self.object.transactions.filter(
-            date__gte=self.object.current_billing_start,
-            date__lte=self.object.current_billing_end,
+            date__gte=cycle.start,
+            date__lte=cycle.end,
         ).select_related('category', 'account').order_by('-date', '-created_at')
         context['bill_history'] = self.object.bills.select_related('payment_account')[:6]
         context['payment_form'] = CardBillPayForm(user=self.request.user)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+from .models import AIAnalysis
+
+
+@receiver(post_save, sender=AIAnalysis)
+@receiver(post_delete, sender=AIAnalysis)
+def invalidate_user_cache_on_analysis_change(sender, instance, **kwargs):
+    bump_user_data_version(instance.user_id)
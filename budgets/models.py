@@ -3,6 +3,63 @@ from decimal import Decimal
 from django.conf import settings
 from django.db import models
 from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+
+
+def monthly_spent_subquery(month_start):
+    """
+    Expenses of the budget's own user and category in ``month_start``, read
+    from the monthly rollups as a correlated subquery.
+
+    Default categories are shared by every user, so joining through
+    ``category__transactions`` would scan everyone's rows before filtering;
+    the subquery starts from (user, month) and reads a handful of rollup
+    rows. Rollups keep archived months, so old budgets stay correct.
+    """
+    from transactions.models import MonthlyCategoryRollup, Transaction
+
+    spent = MonthlyCategoryRollup.objects.filter(
+        user=models.OuterRef('user'),
+        month=month_start,
+        category=models.OuterRef('category'),
+        transaction_type=Transaction.EXPENSE,
+    ).order_by().values('category').annotate(
+        total=Sum('total'),
+    ).values('total')
+    return Coalesce(
+        models.Subquery(spent),
+        models.Value(Decimal('0.00')),
+        output_field=models.DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+class BudgetQuerySet(models.QuerySet):
+    def with_usage(self, month):
+        """
+        Budgets of ``month`` (any day of it) with ``spent`` and
+        ``usage_percentage_value`` annotated, most used first.
+
+        Everything the usage properties need comes in this one query, so a
+        budget list renders without a query per row.
+        """
+        month_start = month.replace(day=1)
+        percentage_base = models.ExpressionWrapper(
+            models.F('spent') * models.Value(100) / models.F('amount'),
+            output_field=models.DecimalField(max_digits=7, decimal_places=2),
+        )
+        return self.filter(
+            month=month_start,
+        ).select_related('category').annotate(
+            spent=monthly_spent_subquery(month_start),
+        ).annotate(
+            usage_percentage_value=models.Case(
+                models.When(amount__lte=0, then=models.Value(Decimal('0.00'))),
+                models.When(spent__gte=models.F('amount'), then=models.Value(Decimal('100.00'))),
+                default=percentage_base,
+                output_field=models.DecimalField(max_digits=7, decimal_places=2),
+            )
+        ).order_by('-usage_percentage_value', 'category__name')
 
 
 class Budget(models.Model):
@@ -27,6 +84,8 @@ class Budget(models.Model):
     created_at = models.DateTimeField('Data de Criação', auto_now_add=True)
     updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
 
+    objects = BudgetQuerySet.as_manager()
+
     class Meta:
         unique_together = ['user', 'category', 'month']
         ordering = ['-month', 'category__name']
@@ -36,14 +95,21 @@ class Budget(models.Model):
     def __str__(self):
         return f'{self.category.name} - {self.month:%Y-%m}'
 
-    @property
+    @cached_property
     def spent_amount(self):
-        total = self.category.transactions.filter(
-            user=self.user,
-            transaction_type='expense',
-            date__year=self.month.year,
-            date__month=self.month.month,
-        ).aggregate(total=Sum('amount'))['total']
+        """Uses the ``spent`` annotation of ``with_usage()`` when present."""
+        spent = getattr(self, 'spent', None)
+        if spent is not None:
+            return spent
+
+        from transactions.models import MonthlyCategoryRollup, Transaction
+
+        total = MonthlyCategoryRollup.objects.filter(
+            user_id=self.user_id,
+            month=self.month.replace(day=1),
+            category_id=self.category_id,
+            transaction_type=Transaction.EXPENSE,
+        ).aggregate(total=Sum('total'))['total']
         return total or Decimal('0.00')
 
     @property
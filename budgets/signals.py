@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+from .models import Budget
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_user_cache_on_budget_change(sender, instance, **kwargs):
+    bump_user_data_version(instance.user_id)
@@ -84,6 +84,26 @@ class BudgetModelTests(TestCase):
         self.assertEqual(self.budget.usage_percentage, Decimal('68.75'))
         self.assertFalse(self.budget.is_exceeded)
 
+    def test_with_usage_properties_read_the_annotation(self):
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('900.00'),
+            date=date(2026, 4, 8),
+            description='Reforma'
+        )
+
+        with self.assertNumQueries(1):
+            budget = Budget.objects.filter(user=self.user).with_usage(date(2026, 4, 17)).get()
+            self.assertEqual(budget.category.name, 'Moradia')
+            self.assertEqual(budget.spent_amount, Decimal('900.00'))
+            self.assertEqual(budget.remaining_amount, Decimal('-100.00'))
+            self.assertEqual(budget.usage_percentage, Decimal('100.00'))
+            self.assertTrue(budget.is_exceeded)
+            self.assertEqual(budget.exceeded_amount, Decimal('100.00'))
+
 
 class BudgetFormTests(TestCase):
     def setUp(self):
@@ -231,6 +251,46 @@ class BudgetViewTests(TestCase):
         self.assertEqual(queryset[0].spent, Decimal('450.00'))
         self.assertEqual(queryset[1].spent, Decimal('120.00'))
 
+    def test_spent_on_shared_default_category_only_counts_the_budget_owner(self):
+        shared = Category.objects.create(
+            user=None,
+            name='Saude',
+            category_type=Category.EXPENSE,
+            color='#14b8a6',
+            is_default=True,
+        )
+        other_account = Account.objects.create(
+            user=self.other_user,
+            name='Conta Outra',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('500.00')
+        )
+        budget = Budget.objects.create(
+            user=self.user,
+            category=shared,
+            amount=Decimal('200.00'),
+            month=date(2026, 4, 1),
+        )
+        for user, account, amount in (
+            (self.user, self.account, Decimal('80.00')),
+            (self.other_user, other_account, Decimal('999.00')),
+        ):
+            Transaction.objects.create(
+                user=user,
+                account=account,
+                category=shared,
+                transaction_type=Transaction.EXPENSE,
+                amount=amount,
+                date=date(2026, 4, 15),
+                description='Farmacia'
+            )
+
+        spent = {item.pk: item.spent for item in Budget.objects.filter(user=self.user).with_usage(date(2026, 4, 1))}
+
+        self.assertEqual(spent[budget.pk], Decimal('80.00'))
+        self.assertEqual(spent[self.food_budget.pk], Decimal('450.00'))
+
     def test_crud_and_api_are_user_scoped(self):
         create_response = self.client.post(
             reverse('budgets:create'),
@@ -1,12 +1,9 @@
 import logging
-from calendar import monthrange
 from datetime import date
 from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Case, DecimalField, ExpressionWrapper, F, Q, Sum, Value, When
-from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
@@ -14,7 +11,7 @@ from django.utils import timezone
 from django.views import View
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
-from transactions.models import Transaction
+from core.dates import shift_month
 
 from .forms import BudgetForm
 from .models import Budget
@@ -26,10 +23,6 @@ def get_month_start(month_value):
     return month_value.replace(day=1)
 
 
-def get_month_end(month_value):
-    return month_value.replace(day=monthrange(month_value.year, month_value.month)[1])
-
-
 def parse_month_param(month_param, fallback):
     if not month_param:
         return get_month_start(fallback)
@@ -42,49 +35,6 @@ def parse_month_param(month_param, fallback):
     return get_month_start(parsed)
 
 
-def shift_month(month_value, offset):
-    total_months = month_value.year * 12 + month_value.month - 1 + offset
-    year = total_months // 12
-    month = total_months % 12 + 1
-    return date(year, month, 1)
-
-
-def get_budget_queryset(user, month_value):
-    month_start = get_month_start(month_value)
-    month_end = get_month_end(month_value)
-    spent_annotation = Coalesce(
-        Sum(
-            'category__transactions__amount',
-            filter=Q(
-                category__transactions__user=user,
-                category__transactions__transaction_type=Transaction.EXPENSE,
-                category__transactions__date__gte=month_start,
-                category__transactions__date__lte=month_end,
-            )
-        ),
-        Value(Decimal('0.00')),
-        output_field=DecimalField(max_digits=10, decimal_places=2),
-    )
-    percentage_base = ExpressionWrapper(
-        F('spent') * Value(100) / F('amount'),
-        output_field=DecimalField(max_digits=7, decimal_places=2),
-    )
-
-    return Budget.objects.filter(
-        user=user,
-        month=month_start,
-    ).select_related('category').annotate(
-        spent=spent_annotation,
-    ).annotate(
-        usage_percentage_value=Case(
-            When(amount__lte=0, then=Value(Decimal('0.00'))),
-            When(spent__gte=F('amount'), then=Value(Decimal('100.00'))),
-            default=percentage_base,
-            output_field=DecimalField(max_digits=7, decimal_places=2),
-        )
-    ).order_by('-usage_percentage_value', 'category__name')
-
-
 class BudgetListView(LoginRequiredMixin, ListView):
     model = Budget
     template_name = 'budgets/budget_list.html'
@@ -97,7 +47,7 @@ class BudgetListView(LoginRequiredMixin, ListView):
         )
 
     def get_queryset(self):
-        return get_budget_queryset(self.request.user, self.get_selected_month())
+        return Budget.objects.filter(user=self.request.user).with_usage(self.get_selected_month())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -200,8 +150,7 @@ class BudgetAPIView(LoginRequiredMixin, View):
     http_method_names = ['get']
 
     def get(self, request, *args, **kwargs):
-        current_month = get_month_start(timezone.localdate())
-        budgets = get_budget_queryset(request.user, current_month)
+        budgets = Budget.objects.filter(user=request.user).with_usage(timezone.localdate())
         payload = [
             {
                 'category_name': budget.category.name,
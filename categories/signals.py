@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_user_cache_on_category_change(sender, instance, **kwargs):
+    # Default categories (user=None) are shared; their cached names and
+    # colors refresh when the per-user entries time out.
+    bump_user_data_version(instance.user_id)
@@ -0,0 +1,79 @@
+"""
+Per-user versioned cache helpers.
+
+Every cached value derived from a user's financial data is keyed on that
+user's *data version*: an opaque token that the save/delete signals of the
+apps holding user data replace whenever something changes. Bumping the
+version makes every previously cached entry unreachable at once, so nothing
+has to track which individual keys depend on which rows; stale entries simply
+expire through their timeout.
+
+The bump is deferred to ``transaction.on_commit``: bumping inside an open
+transaction would let a concurrent request rebuild the entries from the
+not-yet-committed (old) rows under the *new* version, leaving them stale
+until they expire. Outside a transaction it happens immediately.
+
+The helpers only rely on the basic cache API (get/set/add). The version has to
+be seen by every worker process, so production needs a backend shared between
+them (file-based, or an external one); ``settings_production`` refuses the
+per-process local-memory backend.
+"""
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'finanpy'
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:user:{user_id}:data-version'
+
+
+def get_user_data_version(user_id):
+    """Return the current data version for ``user_id``, creating one if missing."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # add() keeps the first writer's token if two requests race here.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_data_version(user_id):
+    """Invalidate every cached value derived from ``user_id``'s data once the transaction commits."""
+    if user_id is None:
+        return
+    transaction.on_commit(partial(_set_new_version, user_id))
+
+
+def _set_new_version(user_id):
+    cache.set(_version_key(user_id), uuid.uuid4().hex, timeout=None)
+
+
+def user_cache_key(user_id, name, *parts):
+    """Build a cache key for ``name`` that is only valid for the current data version."""
+    version = get_user_data_version(user_id)
+    suffix = ':'.join(str(part) for part in parts)
+    key = f'{KEY_PREFIX}:{name}:{user_id}:{version}'
+    return f'{key}:{suffix}' if suffix else key
+
+
+def get_or_build_user_cache(user_id, name, builder, timeout=None, parts=()):
+    """
+    Return the cached value for ``name`` or compute it with ``builder()``.
+
+    ``timeout`` defaults to ``settings.USER_CACHE_TIMEOUT``. ``parts`` are
+    extra key components (dates, filter signatures) that scope the entry.
+    """
+    if timeout is None:
+        timeout = settings.USER_CACHE_TIMEOUT
+    key = user_cache_key(user_id, name, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout=timeout)
+    return value
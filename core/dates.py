@@ -0,0 +1,10 @@
+"""Month arithmetic shared by the dashboard and budget views."""
+from datetime import date
+
+
+def shift_month(month_value, offset):
+    """First day of the month ``offset`` months away from ``month_value``'s."""
+    total_months = month_value.year * 12 + month_value.month - 1 + offset
+    year = total_months // 12
+    month = total_months % 12 + 1
+    return date(year, month, 1)
@@ -0,0 +1,86 @@
+"""
+Fast pt-BR formatting for money and dates.
+
+The template filters in accounts/templatetags/format_filters.py used to go
+through ``django.utils.formats.number_format``, which looks up the active
+locale's separators and walks the digits in Python on every call. The output
+here is the same (two decimals, truncated; ``.`` for thousands and ``,`` for
+decimals), produced by a single ``format(value, ',.2f')`` plus a precomputed
+separator swap.
+
+``format_currency_fields`` formats whole lists ahead of rendering, so a
+table template prints ready-made strings instead of calling a filter per cell.
+"""
+from datetime import datetime
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+ZERO_CURRENCY = 'R$ 0,00'
+# '1,234.56' (Python's format spec) -> '1.234,56'
+_PT_BR_SEPARATORS = str.maketrans(',.', '.,')
+
+
+def to_decimal(value):
+    """Coerce ``value`` to Decimal like ``Decimal(str(value))``; None if it is not a number."""
+    if type(value) is Decimal:
+        decimal_value = value
+    elif type(value) is int:
+        decimal_value = Decimal(value)
+    else:
+        try:
+            decimal_value = Decimal(str(value))
+        except (TypeError, ValueError, InvalidOperation):
+            return None
+    return decimal_value if decimal_value.is_finite() else None
+
+
+def format_number(value):
+    """``abs(value)`` (a finite Decimal) as '1.234,56', decimals truncated."""
+    truncated = abs(value).quantize(CENT, rounding=ROUND_DOWN)
+    return format(truncated, ',.2f').translate(_PT_BR_SEPARATORS)
+
+
+def format_brl(value):
+    """R$ 1.234,56 or -R$ 1.234,56; 'R$ 0,00' for anything that is not a number."""
+    value = to_decimal(value)
+    if value is None:
+        return ZERO_CURRENCY
+    if value < ZERO:
+        return f'-R$ {format_number(value)}'
+    return f'R$ {format_number(value)}'
+
+
+def format_brl_signed(value):
+    """+R$ 1.234,56, -R$ 1.234,56 or R$ 0,00."""
+    value = to_decimal(value)
+    if value is None or value == ZERO:
+        return ZERO_CURRENCY
+    if value > ZERO:
+        return f'+R$ {format_number(value)}'
+    return f'-R$ {format_number(value)}'
+
+
+def format_date_br(value):
+    """DD/MM/YYYY, built from the date fields instead of ``strftime``."""
+    if not value:
+        return ''
+    if isinstance(value, datetime):
+        value = value.date()
+    return f'{value.day:02d}/{value.month:02d}/{value.year:04d}'
+
+
+def format_currency_fields(items, *fields, suffix='_display', signed=False):
+    """
+    Store the formatted value of each of ``fields`` as ``<field><suffix>`` on
+    every item (attribute for objects, key for dicts). Returns ``items``.
+    """
+    formatter = format_brl_signed if signed else format_brl
+    for item in items:
+        if isinstance(item, dict):
+            for name in fields:
+                item[name + suffix] = formatter(item[name])
+        else:
+            for name in fields:
+                setattr(item, name + suffix, formatter(getattr(item, name)))
+    return items
@@ -0,0 +1,331 @@
+from dataclasses import dataclass, field, fields
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from accounts.models import Account, CreditCard
+from ai.models import AIAnalysis
+from budgets.models import Budget
+from goals.models import Goal
+from installments.models import Installment
+from recurrences.services import get_pending_recurrences_count
+from transactions.models import MonthlyCategoryRollup, Transaction
+
+from .cache import get_or_build_user_cache
+
+MONTH_NAMES_PT = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
+]
+
+CHART_TOP_CATEGORIES = 5
+CHART_OTHERS_COLOR = '#6B7280'
+BUDGET_ALERT_THRESHOLD = Decimal('80.00')
+SIDEBAR_COUNTS_ATTR = '_sidebar_counts'
+
+
+@dataclass
+class CardSummary:
+    """Open bill figures for a credit card, resolved without per-card queries."""
+
+    pk: int
+    name: str
+    color: str
+    next_due_date: date
+    current_bill_amount: Decimal
+    available_limit: Decimal
+
+
+@dataclass
+class DashboardSnapshot:
+    """
+    Every figure rendered by the dashboard for a single user and day.
+
+    Field names match the template context keys, so the snapshot can be
+    merged straight into the view context with ``as_context()``.
+    """
+
+    total_balance: Decimal = Decimal('0.00')
+    active_accounts_count: int = 0
+    recent_transactions: list = field(default_factory=list)
+    total_income: Decimal = Decimal('0.00')
+    total_expenses: Decimal = Decimal('0.00')
+    monthly_balance: Decimal = Decimal('0.00')
+    current_month_name: str = ''
+    current_year: int = 0
+    expense_by_category: list = field(default_factory=list)
+    chart_data: list = field(default_factory=list)
+    income_chart_data: list = field(default_factory=list)
+    latest_analysis: AIAnalysis | None = None
+    upcoming_goals: list = field(default_factory=list)
+    goals_active_count: int = 0
+    goals_total_count: int = 0
+    budget_alerts: list = field(default_factory=list)
+    budgets_count: int = 0
+    budgets_exceeded_count: int = 0
+    pending_recurrences_count: int = 0
+    installments_due_this_month: list = field(default_factory=list)
+    installments_total_this_month: Decimal = Decimal('0.00')
+    cards_summary: list = field(default_factory=list)
+    total_card_debt: Decimal = Decimal('0.00')
+
+    @classmethod
+    def empty(cls, today=None):
+        today = today or timezone.localdate()
+        return cls(
+            current_month_name=MONTH_NAMES_PT[today.month - 1],
+            current_year=today.year,
+        )
+
+    def as_context(self):
+        return {item.name: getattr(self, item.name) for item in fields(self)}
+
+
+def get_month_bounds(today):
+    """Return the first day of ``today``'s month and of the following month."""
+    month_start = today.replace(day=1)
+    if month_start.month == 12:
+        next_month_start = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        next_month_start = month_start.replace(month=month_start.month + 1)
+    return month_start, next_month_start
+
+
+def build_category_chart(rows, total):
+    """Top categories plus an 'Outros' slice for the remainder of ``total``."""
+    chart = []
+    if total <= 0:
+        return chart
+
+    top_total = Decimal('0.00')
+    for item in rows[:CHART_TOP_CATEGORIES]:
+        percentage = (item['total'] / total) * 100
+        chart.append({
+            'category': item['category__name'],
+            'color': item['category__color'],
+            'amount': float(item['total']),
+            'percentage': round(float(percentage), 1)
+        })
+        top_total += item['total']
+
+    remaining = total - top_total
+    if remaining > 0:
+        percentage = (remaining / total) * 100
+        chart.append({
+            'category': 'Outros',
+            'color': CHART_OTHERS_COLOR,
+            'amount': float(remaining),
+            'percentage': round(float(percentage), 1)
+        })
+    return chart
+
+
+def get_month_category_totals(user, month_start, next_month_start):
+    """
+    Income and expense totals per category for one month in a single query.
+
+    Reads the monthly rollups, so the cost depends on the number of
+    category/account pairs used in the month rather than on transactions.
+    Returns a dict keyed by transaction type with the grouped rows (ordered
+    by total, descending) and the overall total for that type.
+    """
+    rows = MonthlyCategoryRollup.objects.filter(
+        user=user,
+        month__gte=month_start,
+        month__lt=next_month_start,
+    ).values(
+        'transaction_type',
+        'category__name',
+        'category__color',
+    ).annotate(
+        category_total=Sum('total'),
+    ).order_by('-category_total', 'category__name')
+
+    totals = {
+        Transaction.INCOME: {'rows': [], 'total': Decimal('0.00')},
+        Transaction.EXPENSE: {'rows': [], 'total': Decimal('0.00')},
+    }
+    for row in rows:
+        bucket = totals.get(row['transaction_type'])
+        if bucket is None or row['category_total'] is None:
+            continue
+        bucket['rows'].append({
+            'category__name': row['category__name'],
+            'category__color': row['category__color'],
+            'total': row['category_total'],
+        })
+        bucket['total'] += row['category_total']
+    return totals
+
+
+def get_cards_summary(user, today=None):
+    """
+    Open bill summary for every active card with a non-zero bill.
+
+    Bills come from ``CreditCard.objects.with_current_bill()``, so the whole
+    summary is a single query whatever the number of cards.
+    """
+    cards = CreditCard.objects.filter(
+        user=user,
+        is_active=True,
+    ).with_current_bill(today).order_by('name')
+
+    summaries = []
+    for card in cards:
+        if card.current_bill_total <= 0:
+            continue
+        summaries.append(CardSummary(
+            pk=card.pk,
+            name=card.name,
+            color=card.color,
+            next_due_date=card.get_billing_cycle(today).due_date,
+            current_bill_amount=card.current_bill_total,
+            available_limit=card.credit_limit - card.current_bill_total,
+        ))
+    return summaries
+
+
+def build_dashboard_snapshot(user, today=None):
+    """Compute every dashboard figure for ``user`` with a fixed number of queries."""
+    today = today or timezone.localdate()
+    month_start, next_month_start = get_month_bounds(today)
+    snapshot = DashboardSnapshot.empty(today)
+
+    account_stats = Account.objects.filter(
+        user=user,
+        is_active=True
+    ).aggregate(
+        total=Sum('current_balance'),
+        count=Count('id')
+    )
+    snapshot.total_balance = account_stats['total'] or Decimal('0.00')
+    snapshot.active_accounts_count = account_stats['count']
+
+    snapshot.recent_transactions = list(
+        Transaction.objects.filter(
+            user=user
+        ).select_related('account', 'category').order_by('-date', '-created_at')[:5]
+    )
+
+    month_totals = get_month_category_totals(user, month_start, next_month_start)
+    income = month_totals[Transaction.INCOME]
+    expense = month_totals[Transaction.EXPENSE]
+    snapshot.total_income = income['total']
+    snapshot.total_expenses = expense['total']
+    snapshot.monthly_balance = income['total'] - expense['total']
+    snapshot.expense_by_category = expense['rows'][:CHART_TOP_CATEGORIES]
+    snapshot.chart_data = build_category_chart(expense['rows'], expense['total'])
+    snapshot.income_chart_data = build_category_chart(income['rows'], income['total'])
+
+    snapshot.latest_analysis = AIAnalysis.objects.filter(user=user).first()
+
+    goal_stats = Goal.objects.filter(user=user).aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_completed=False)),
+    )
+    snapshot.goals_total_count = goal_stats['total']
+    snapshot.goals_active_count = goal_stats['active']
+    snapshot.upcoming_goals = list(
+        Goal.objects.filter(
+            user=user,
+            is_completed=False,
+            deadline__isnull=False,
+        ).order_by('deadline')[:3]
+    )
+
+    monthly_budgets = list(Budget.objects.filter(user=user).with_usage(month_start))
+    snapshot.budgets_count = len(monthly_budgets)
+    snapshot.budgets_exceeded_count = sum(
+        1 for budget in monthly_budgets if budget.spent > budget.amount
+    )
+    snapshot.budget_alerts = [
+        budget for budget in monthly_budgets
+        if budget.usage_percentage_value >= BUDGET_ALERT_THRESHOLD
+    ][:3]
+
+    snapshot.pending_recurrences_count = get_pending_recurrences_count(user)
+
+    installments_due = list(
+        Installment.objects.filter(
+            plan__user=user,
+            status=Installment.PENDING,
+            due_date__gte=month_start,
+            due_date__lt=next_month_start,
+        ).select_related('plan').order_by('due_date', 'number')
+    )
+    snapshot.installments_due_this_month = installments_due[:3]
+    snapshot.installments_total_this_month = sum(
+        (installment.amount for installment in installments_due),
+        Decimal('0.00'),
+    )
+
+    snapshot.cards_summary = get_cards_summary(user, today)
+    snapshot.total_card_debt = sum(
+        (card.current_bill_amount for card in snapshot.cards_summary),
+        Decimal('0.00'),
+    )
+    return snapshot
+
+
+def get_dashboard_snapshot(user, today=None):
+    """
+    Cached ``build_dashboard_snapshot``.
+
+    Entries are scoped to the user's data version (bumped by the save/delete
+    signals of every app feeding the dashboard) and to the current day, since
+    billing windows and due dates depend on it.
+    """
+    today = today or timezone.localdate()
+    return get_or_build_user_cache(
+        user.pk,
+        'dashboard',
+        lambda: build_dashboard_snapshot(user, today),
+        parts=(today.isoformat(),),
+    )
+
+
+def compute_sidebar_counts(user, today=None):
+    """Badge counts shown in the sidebar of every authenticated page."""
+    today = today or timezone.localdate()
+    exceeded_count = Budget.objects.filter(user=user).with_usage(
+        today,
+    ).filter(spent__gt=F('amount')).count()
+    return {
+        'budgets_exceeded_count': exceeded_count,
+        'pending_recurrences_count': get_pending_recurrences_count(user),
+    }
+
+
+def remember_sidebar_counts(request, budgets_exceeded_count, pending_recurrences_count):
+    """Share badge counts a view already computed with the context processor."""
+    setattr(request, SIDEBAR_COUNTS_ATTR, {
+        'budgets_exceeded_count': budgets_exceeded_count,
+        'pending_recurrences_count': pending_recurrences_count,
+    })
+
+
+def get_sidebar_counts(request):
+    """
+    Sidebar badge counts, memoized on the request.
+
+    Views that already know the numbers publish them with
+    ``remember_sidebar_counts``; otherwise they come from a short-lived
+    per-user cache entry (``SIDEBAR_CACHE_TIMEOUT``), so list and edit pages
+    do not re-run the budget and recurrence aggregates on every render.
+    """
+    counts = getattr(request, SIDEBAR_COUNTS_ATTR, None)
+    if counts is None:
+        user = request.user
+        today = timezone.localdate()
+        counts = get_or_build_user_cache(
+            user.pk,
+            'sidebar',
+            lambda: compute_sidebar_counts(user, today),
+            timeout=settings.SIDEBAR_CACHE_TIMEOUT,
+            parts=(today.isoformat(),),
+        )
+        setattr(request, SIDEBAR_COUNTS_ATTR, counts)
+    return counts
@@ -108,6 +108,37 @@ DATABASES = {
     )
 }
 
+# Opt-in yearly partitioning of the transactions table (PostgreSQL only; see
+# transactions/partitioning.py). Read by migration 0007 and partition_transactions.
+TRANSACTIONS_PARTITIONED = os.getenv('TRANSACTIONS_PARTITIONED', 'False') == 'True'
+
+# Transactions older than this many months are moved to compressed storage
+# by archive_transactions (see transactions/archive.py).
+TRANSACTION_ARCHIVE_MONTHS = int(os.getenv('TRANSACTION_ARCHIVE_MONTHS', '24'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default, which is per process and only fits development.
+# With several worker processes set CACHE_BACKEND to a shared backend such as
+# django.core.cache.backends.filebased.FileBasedCache (with CACHE_LOCATION
+# pointing to a directory): otherwise a worker keeps serving data another one
+# already invalidated. settings_production refuses LocMemCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'finanpy'),
+    }
+}
+
+# Seconds a per-user cached value (dashboard snapshot, sidebar counts) may be
+# served. Entries are also invalidated whenever the user's data changes.
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', '300'))
+
+# Sidebar badge counts are rendered on every page, so they get a shorter TTL.
+SIDEBAR_CACHE_TIMEOUT = int(os.getenv('SIDEBAR_CACHE_TIMEOUT', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -38,6 +38,17 @@ if not _secret_key:
     raise ValueError('SECRET_KEY environment variable is required in production.')
 SECRET_KEY = _secret_key
 
+# ---------------------------------------------------------------------------
+# Cache - the per-user data versions (core/cache.py) must be shared by every
+# gunicorn worker, so the per-process local-memory backend is not accepted.
+# ---------------------------------------------------------------------------
+
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':  # noqa: F405
+    raise ValueError(
+        'CACHE_BACKEND must be a backend shared between worker processes in production '
+        '(e.g. django.core.cache.backends.filebased.FileBasedCache).'
+    )
+
 # ---------------------------------------------------------------------------
 # Middleware - insert WhiteNoise right after SecurityMiddleware
 # ---------------------------------------------------------------------------
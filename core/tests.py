@@ -1,12 +1,16 @@
 import re
-from datetime import date
+import tempfile
+from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.formats import number_format
 
-from accounts.models import Account, CreditCard
+from accounts.models import Account, CreditCard, NetWorthSnapshot
 from budgets.models import Budget
 from categories.models import Category
 from installments.models import InstallmentPlan
@@ -16,6 +20,7 @@ from transactions.models import Transaction
 
 class DashboardBudgetIntegrationTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = get_user_model().objects.create_user(
             email='dashboard-budgets@example.com',
             password='secret123',
@@ -308,3 +313,458 @@ class DashboardBudgetIntegrationTests(TestCase):
             content.index('data-nav="accounts"'),
             content.index('data-nav="cartoes"'),
         )
+
+
+class DashboardSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='dashboard-snapshot@example.com',
+            password='secret123',
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.salary = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e',
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Alimentacao',
+            category_type=Category.EXPENSE,
+            color='#ef4444',
+        )
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.salary,
+            transaction_type=Transaction.INCOME,
+            amount=Decimal('3000.00'),
+            date=date.today(),
+        )
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.food,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('250.00'),
+            date=date.today(),
+        )
+
+    def _create_card_with_bill(self, name, amount):
+        card = CreditCard.objects.create(
+            user=self.user,
+            name=name,
+            bank_code=Account.NUBANK,
+            credit_limit=Decimal('2000.00'),
+            closing_day=10,
+            due_day=20,
+        )
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.food,
+            transaction_type=Transaction.EXPENSE,
+            amount=amount,
+            date=card.current_billing_start,
+            credit_card=card,
+        )
+        return card
+
+    def test_snapshot_computes_month_totals_and_charts(self):
+        from core.services import build_dashboard_snapshot
+
+        snapshot = build_dashboard_snapshot(self.user, today=date.today())
+
+        self.assertEqual(snapshot.total_income, Decimal('3000.00'))
+        self.assertEqual(snapshot.total_expenses, Decimal('250.00'))
+        self.assertEqual(snapshot.monthly_balance, Decimal('2750.00'))
+        self.assertEqual(snapshot.total_balance, Decimal('3750.00'))
+        self.assertEqual(snapshot.chart_data[0]['category'], 'Alimentacao')
+        self.assertEqual(snapshot.income_chart_data[0]['percentage'], 100.0)
+
+    def test_snapshot_query_count_does_not_grow_with_cards(self):
+        from core.services import build_dashboard_snapshot
+
+        self._create_card_with_bill('Cartao A', Decimal('100.00'))
+        with self.assertNumQueries(10):
+            build_dashboard_snapshot(self.user, today=date.today())
+
+        for index in range(4):
+            self._create_card_with_bill(f'Cartao {index}', Decimal('50.00'))
+
+        with self.assertNumQueries(10):
+            snapshot = build_dashboard_snapshot(self.user, today=date.today())
+
+        self.assertEqual(len(snapshot.cards_summary), 5)
+        self.assertEqual(snapshot.total_card_debt, Decimal('300.00'))
+        card_limits = {card.name: card.available_limit for card in snapshot.cards_summary}
+        self.assertEqual(card_limits['Cartao A'], Decimal('1900.00'))
+
+
+class DashboardSnapshotCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='dashboard-cache@example.com',
+            password='secret123',
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('500.00'),
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Alimentacao',
+            category_type=Category.EXPENSE,
+            color='#ef4444',
+        )
+
+    def _create_expense(self, amount):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.food,
+            transaction_type=Transaction.EXPENSE,
+            amount=amount,
+            date=date.today(),
+        )
+
+    def _assert_cached_and_invalidated(self):
+        from core.services import get_dashboard_snapshot
+
+        self._create_expense(Decimal('40.00'))
+        first = get_dashboard_snapshot(self.user, today=date.today())
+        with self.assertNumQueries(0):
+            cached = get_dashboard_snapshot(self.user, today=date.today())
+        self.assertEqual(cached.total_expenses, first.total_expenses)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_expense(Decimal('60.00'))
+        refreshed = get_dashboard_snapshot(self.user, today=date.today())
+        self.assertEqual(refreshed.total_expenses, Decimal('100.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Budget.objects.create(
+                user=self.user,
+                category=self.food,
+                amount=Decimal('90.00'),
+                month=date.today().replace(day=1),
+            )
+        with_budget = get_dashboard_snapshot(self.user, today=date.today())
+        self.assertEqual(with_budget.budgets_exceeded_count, 1)
+
+    def test_snapshot_is_cached_until_user_data_changes(self):
+        self._assert_cached_and_invalidated()
+
+    def test_snapshot_cache_works_with_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            file_cache = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': cache_dir,
+                }
+            }
+            with override_settings(CACHES=file_cache):
+                self._assert_cached_and_invalidated()
+
+    def test_version_is_bumped_only_when_the_transaction_commits(self):
+        from core.cache import get_user_data_version
+
+        version = get_user_data_version(self.user.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self._create_expense(Decimal('10.00'))
+            self.assertEqual(get_user_data_version(self.user.pk), version)
+        self.assertTrue(callbacks)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_user_data_version(self.user.pk), version)
+
+    def test_other_users_changes_do_not_invalidate_snapshot(self):
+        from core.services import get_dashboard_snapshot
+
+        get_dashboard_snapshot(self.user, today=date.today())
+        other_user = get_user_model().objects.create_user(
+            email='dashboard-cache-other@example.com',
+            password='secret123',
+        )
+        Account.objects.create(
+            user=other_user,
+            name='Outra Conta',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('10.00'),
+        )
+
+        with self.assertNumQueries(0):
+            get_dashboard_snapshot(self.user, today=date.today())
+
+
+class MonthlyEvolutionViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='monthly-evolution@example.com',
+            password='secret123',
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('0.00'),
+        )
+        self.other_account = Account.objects.create(
+            user=self.user,
+            name='Conta Reserva',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('0.00'),
+        )
+        self.salary = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e',
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Alimentacao',
+            category_type=Category.EXPENSE,
+            color='#ef4444',
+        )
+        self.current_month = date.today().replace(day=1)
+        self.client.force_login(self.user)
+
+    def _create(self, category, transaction_type, amount, day, account=None):
+        return Transaction.objects.create(
+            user=self.user,
+            account=account or self.account,
+            category=category,
+            transaction_type=transaction_type,
+            amount=amount,
+            date=day,
+        )
+
+    def test_default_horizon_is_six_zero_filled_months(self):
+        from core.dates import shift_month
+
+        self._create(self.salary, Transaction.INCOME, Decimal('1000.00'), self.current_month)
+        self._create(self.food, Transaction.EXPENSE, Decimal('300.00'), shift_month(self.current_month, -2))
+
+        response = self.client.get(reverse('monthly_evolution'))
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(data), 6)
+        self.assertEqual(data[-1]['income'], 1000.0)
+        self.assertEqual(data[-3]['expense'], 300.0)
+        self.assertEqual(data[-3]['balance'], -300.0)
+        self.assertEqual(data[0]['income'], 0.0)
+
+    def test_months_parameter_extends_and_clamps_horizon(self):
+        from core.dates import shift_month
+
+        self._create(self.food, Transaction.EXPENSE, Decimal('50.00'), shift_month(self.current_month, -30))
+
+        response = self.client.get(reverse('monthly_evolution'), {'months': '36'})
+        data = response.json()
+        self.assertEqual(len(data), 36)
+        self.assertEqual(data[-31]['expense'], 50.0)
+        self.assertIn('/', data[0]['month'])
+
+        clamped = self.client.get(reverse('monthly_evolution'), {'months': '500'})
+        self.assertEqual(len(clamped.json()), 60)
+
+    def test_account_and_category_filters(self):
+        self._create(self.food, Transaction.EXPENSE, Decimal('80.00'), self.current_month)
+        self._create(
+            self.food, Transaction.EXPENSE, Decimal('20.00'), self.current_month,
+            account=self.other_account,
+        )
+        self._create(self.salary, Transaction.INCOME, Decimal('900.00'), self.current_month)
+
+        by_account = self.client.get(
+            reverse('monthly_evolution'),
+            {'account': self.other_account.pk},
+        ).json()
+        by_category = self.client.get(
+            reverse('monthly_evolution'),
+            {'category': self.food.pk},
+        ).json()
+
+        self.assertEqual(by_account[-1]['expense'], 20.0)
+        self.assertEqual(by_account[-1]['income'], 0.0)
+        self.assertEqual(by_category[-1]['expense'], 100.0)
+        self.assertEqual(by_category[-1]['income'], 0.0)
+
+
+class NetWorthHistoryViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='net-worth@example.com',
+            password='secret123',
+        )
+        Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            bank_code=Account.ITAU,
+            initial_balance=Decimal('900.00'),
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='net-worth-other@example.com',
+            password='secret123',
+        )
+        self.today = timezone.localdate()
+        NetWorthSnapshot.objects.bulk_create([
+            NetWorthSnapshot(user=self.user, date=self.today - timedelta(days=400), total=Decimal('100.00')),
+            NetWorthSnapshot(user=self.user, date=self.today - timedelta(days=1), total=Decimal('850.00')),
+            NetWorthSnapshot(user=self.other_user, date=self.today - timedelta(days=1), total=Decimal('5.00')),
+        ])
+        self.client.force_login(self.user)
+
+    def test_returns_snapshots_in_range_followed_by_live_balance(self):
+        response = self.client.get(reverse('net_worth_history'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'date': (self.today - timedelta(days=1)).isoformat(), 'total': 850.0},
+            {'date': self.today.isoformat(), 'total': 900.0},
+        ])
+
+    def test_days_param_extends_range_and_is_clamped(self):
+        self.assertEqual(len(self.client.get(reverse('net_worth_history'), {'days': '500'}).json()), 3)
+        self.assertEqual(len(self.client.get(reverse('net_worth_history'), {'days': '0'}).json()), 1)
+
+
+class SidebarCountsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='sidebar-counts@example.com',
+            password='secret123',
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('100.00'),
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Alimentacao',
+            category_type=Category.EXPENSE,
+            color='#ef4444',
+        )
+        Recurrence.objects.create(
+            user=self.user,
+            name='Internet',
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('99.90'),
+            category=self.food,
+            account=self.account,
+            day_of_month=10,
+            start_date=date.today().replace(day=1),
+        )
+
+    def _request(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return request
+
+    def test_counts_are_memoized_per_request_and_cached_per_user(self):
+        from core.context_processors import budget_sidebar_context
+
+        request = self._request()
+        self.assertEqual(budget_sidebar_context(request)['pending_recurrences_count'], 1)
+        with self.assertNumQueries(0):
+            budget_sidebar_context(request)
+        with self.assertNumQueries(0):
+            budget_sidebar_context(self._request())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Budget.objects.create(
+                user=self.user,
+                category=self.food,
+                amount=Decimal('10.00'),
+                month=date.today().replace(day=1),
+            )
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.food,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal('20.00'),
+                date=date.today(),
+            )
+
+        self.assertEqual(budget_sidebar_context(self._request())['budgets_exceeded_count'], 1)
+
+    def test_view_published_counts_skip_the_aggregates(self):
+        from core.context_processors import budget_sidebar_context
+        from core.services import remember_sidebar_counts
+
+        request = self._request()
+        remember_sidebar_counts(request, 3, 2)
+
+        with self.assertNumQueries(0):
+            context = budget_sidebar_context(request)
+
+        self.assertEqual(context, {'budgets_exceeded_count': 3, 'pending_recurrences_count': 2})
+
+
+class ShiftMonthTests(SimpleTestCase):
+    def test_shift_month_crosses_year_boundaries(self):
+        from core.dates import shift_month
+
+        self.assertEqual(shift_month(date(2026, 1, 31), -1), date(2025, 12, 1))
+        self.assertEqual(shift_month(date(2026, 11, 15), 2), date(2027, 1, 1))
+        self.assertEqual(shift_month(date(2026, 3, 1), -30), date(2023, 9, 1))
+
+
+class FormattingTests(SimpleTestCase):
+    def _number_format_currency(self, value):
+        value = Decimal(str(value))
+        formatted = number_format(abs(value), decimal_pos=2, use_l10n=True, force_grouping=True)
+        return f'-R$ {formatted}' if value < 0 else f'R$ {formatted}'
+
+    def test_format_brl_matches_number_format(self):
+        from core.formatting import format_brl
+
+        values = [
+            Decimal('0'), Decimal('-0.00'), Decimal('0.5'), Decimal('999.99'), Decimal('1000'),
+            Decimal('-1234.56'), Decimal('1234567.899'), Decimal('-0.009'), Decimal('1E+3'),
+            12, -1500, 1234.5, '987654.321',
+        ]
+        with translation.override('pt-br'):
+            for value in values:
+                with self.subTest(value=value):
+                    self.assertEqual(format_brl(value), self._number_format_currency(value))
+
+    def test_invalid_values_fall_back_to_zero(self):
+        from core.formatting import format_brl, format_brl_signed
+
+        for value in (None, '', 'abc', 'NaN', float('inf')):
+            with self.subTest(value=value):
+                self.assertEqual(format_brl(value), 'R$ 0,00')
+                self.assertEqual(format_brl_signed(value), 'R$ 0,00')
+        self.assertEqual(format_brl_signed(Decimal('1234.5')), '+R$ 1.234,50')
+        self.assertEqual(format_brl_signed(Decimal('-0.01')), '-R$ 0,01')
+
+    def test_format_date_br_and_batch_helper(self):
+        from core.formatting import format_currency_fields, format_date_br
+
+        self.assertEqual(format_date_br(date(2024, 3, 5)), '05/03/2024')
+        self.assertEqual(format_date_br(timezone.datetime(2024, 12, 31, 23, 59)), '31/12/2024')
+        self.assertEqual(format_date_br(None), '')
+
+        rows = [{'amount': Decimal('10.5')}, {'amount': Decimal('-2500')}]
+        self.assertIs(format_currency_fields(rows, 'amount', signed=True), rows)
+        self.assertEqual([row['amount_display'] for row in rows], ['+R$ 10,50', '-R$ 2.500,00'])
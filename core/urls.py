@@ -9,7 +9,7 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
-from core.views import DashboardView, HomeView, MonthlyEvolutionView
+from core.views import DashboardView, HomeView, MonthlyEvolutionView, NetWorthHistoryView
 
 handler403 = 'core.views.custom_403'
 handler404 = 'core.views.custom_404'
@@ -19,6 +19,7 @@ urlpatterns = [
     path('', HomeView.as_view(), name='home'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('dashboard/evolucao-mensal/', MonthlyEvolutionView.as_view(), name='monthly_evolution'),
+    path('dashboard/patrimonio/', NetWorthHistoryView.as_view(), name='net_worth_history'),
     path('admin/', admin.site.urls),
     path('usuarios/', include('users.urls')),
     path('', include('profiles.urls')),
@@ -1,22 +1,19 @@
 import logging
-from datetime import date
+from datetime import timedelta
 from decimal import Decimal
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum, Count, Q
+from django.db.models import F, Q, Sum
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.utils import timezone
 from django.views import View
 from django.views.generic import TemplateView
 
-from accounts.models import Account, CreditCard
-from ai.models import AIAnalysis
-from budgets.views import get_budget_queryset
-from categories.models import Category
-from goals.models import Goal
-from installments.models import Installment
-from recurrences.services import get_pending_recurrences_count
-from transactions.models import Transaction
+from accounts.models import Account, AccountBalanceSnapshot, NetWorthSnapshot
+from transactions.models import MonthlyCategoryRollup, Transaction
+
+from .dates import shift_month
+from .services import DashboardSnapshot, get_dashboard_snapshot, remember_sidebar_counts
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +42,9 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     """
     Dashboard with financial summary, charts and recent transactions.
 
-    Calculates: total balance, monthly income/expenses, top 5 category
-    distributions (expense + income) with 'Outros' grouping for charts.
+    All month-scoped figures come from ``core.services.get_dashboard_snapshot``,
+    which runs a fixed number of queries regardless of history size or card count
+    and caches the result until the user's data changes.
     Falls back to empty data on any error.
     """
     template_name = 'dashboard.html'
@@ -56,267 +54,35 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         user = self.request.user
 
         try:
-            # Get current month date range
-            now = timezone.now()
-            current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            if now.month == 12:
-                next_month_start = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            else:
-                next_month_start = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            # Month names in Portuguese
-            month_names = [
-                'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-                'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
-            ]
-
-            # 7.1.1 - Basic data
-            # Calculate total balance and count from all active accounts in a single query
-            account_stats = Account.objects.filter(
-                user=user,
-                is_active=True
-            ).aggregate(
-                total=Sum('current_balance'),
-                count=Count('id')
-            )
-            total_balance = account_stats['total'] or Decimal('0.00')
-            active_accounts_count = account_stats['count']
-
-            # Get last 5 transactions with select_related
-            recent_transactions = Transaction.objects.filter(
-                user=user
-            ).select_related('account', 'category').order_by('-date', '-created_at')[:5]
-
-            # Get category distribution (all transactions)
-            category_distribution = Transaction.objects.filter(
-                user=user
-            ).values('category__name', 'transaction_type').annotate(
-                total=Sum('amount'),
-                count=Count('id')
-            ).order_by('-total')
-
-            # 7.1.2 - Statistical calculations
-            # Total income of current month
-            total_income = Transaction.objects.filter(
-                user=user,
-                transaction_type=Transaction.INCOME,
-                date__gte=current_month_start.date(),
-                date__lt=next_month_start.date()
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-            # Total expenses of current month
-            total_expenses = Transaction.objects.filter(
-                user=user,
-                transaction_type=Transaction.EXPENSE,
-                date__gte=current_month_start.date(),
-                date__lt=next_month_start.date()
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-            # Balance (income - expenses)
-            monthly_balance = total_income - total_expenses
-
-            # Current month name in Portuguese
-            current_month_name = month_names[now.month - 1]
-
-            # 7.1.3 - Chart data
-            # Aggregate expenses by category for current month (all categories)
-            all_expense_by_category = Transaction.objects.filter(
-                user=user,
-                transaction_type=Transaction.EXPENSE,
-                date__gte=current_month_start.date(),
-                date__lt=next_month_start.date()
-            ).values(
-                'category__name',
-                'category__color'
-            ).annotate(
-                total=Sum('amount')
-            ).order_by('-total')
-
-            # Top 5 expense categories for context
-            expense_by_category = all_expense_by_category[:5]
-
-            # Calculate chart data with "Outros" grouping
-            chart_data = []
-            if total_expenses > 0:
-                top_5_total = Decimal('0.00')
-                for item in all_expense_by_category[:5]:
-                    percentage = (item['total'] / total_expenses) * 100
-                    chart_data.append({
-                        'category': item['category__name'],
-                        'color': item['category__color'],
-                        'amount': float(item['total']),
-                        'percentage': round(float(percentage), 1)
-                    })
-                    top_5_total += item['total']
-
-                # Group remaining categories as "Outros"
-                remaining = total_expenses - top_5_total
-                if remaining > 0:
-                    percentage = (remaining / total_expenses) * 100
-                    chart_data.append({
-                        'category': 'Outros',
-                        'color': '#6B7280',
-                        'amount': float(remaining),
-                        'percentage': round(float(percentage), 1)
-                    })
-
-            # chart_data is passed as Python list; use json_script in template
-
-            # Aggregate income by category for current month
-            all_income_by_category = Transaction.objects.filter(
-                user=user,
-                transaction_type=Transaction.INCOME,
-                date__gte=current_month_start.date(),
-                date__lt=next_month_start.date()
-            ).values(
-                'category__name',
-                'category__color'
-            ).annotate(
-                total=Sum('amount')
-            ).order_by('-total')
-
-            income_chart_data = []
-            if total_income > 0:
-                top_5_income_total = Decimal('0.00')
-                for item in all_income_by_category[:5]:
-                    percentage = (item['total'] / total_income) * 100
-                    income_chart_data.append({
-                        'category': item['category__name'],
-                        'color': item['category__color'],
-                        'amount': float(item['total']),
-                        'percentage': round(float(percentage), 1)
-                    })
-                    top_5_income_total += item['total']
-
-                remaining_income = total_income - top_5_income_total
-                if remaining_income > 0:
-                    percentage = (remaining_income / total_income) * 100
-                    income_chart_data.append({
-                        'category': 'Outros',
-                        'color': '#6B7280',
-                        'amount': float(remaining_income),
-                        'percentage': round(float(percentage), 1)
-                    })
-
-            # income_chart_data is passed as Python list; use json_script in template
-
-            # Latest AI analysis for this user
-            latest_analysis = AIAnalysis.objects.filter(user=user).first()
-
-            # Goals summary
-            user_goals = Goal.objects.filter(user=user)
-            active_goals = user_goals.filter(is_completed=False)
-            upcoming_goals = active_goals.filter(
-                deadline__isnull=False
-            ).order_by('deadline')[:3]
-            goals_active_count = active_goals.count()
-            goals_total_count = user_goals.count()
-
-            current_month_date = current_month_start.date()
-            monthly_budgets = list(get_budget_queryset(user, current_month_date))
-            budget_alerts = [
-                budget for budget in monthly_budgets
-                if budget.usage_percentage_value >= Decimal('80.00')
-            ]
-            budget_alerts = budget_alerts[:3]
-            budgets_count = len(monthly_budgets)
-            budgets_exceeded_count = sum(1 for budget in monthly_budgets if budget.spent > budget.amount)
-            pending_recurrences_count = get_pending_recurrences_count(user)
-            installments_due_this_month_queryset = Installment.objects.filter(
-                plan__user=user,
-                status=Installment.PENDING,
-                due_date__year=now.year,
-                due_date__month=now.month,
-            ).select_related('plan').order_by('due_date', 'number')
-            installments_due_this_month = list(installments_due_this_month_queryset[:3])
-            installments_total_this_month = installments_due_this_month_queryset.aggregate(
-                total=Sum('amount'),
-            )['total'] or Decimal('0.00')
-            active_cards = CreditCard.objects.filter(
-                user=user,
-                is_active=True,
-            ).order_by('name')
-            cards_summary = [
-                card for card in active_cards
-                if card.current_bill_amount > 0
-            ]
-            total_card_debt = sum(
-                (card.current_bill_amount for card in cards_summary),
-                Decimal('0.00'),
-            )
-
-            # Add all data to context
-            context.update({
-                # Basic data
-                'total_balance': total_balance,
-                'active_accounts_count': active_accounts_count,
-                'recent_transactions': recent_transactions,
-                'category_distribution': category_distribution,
-
-                # Statistical calculations
-                'total_income': total_income,
-                'total_expenses': total_expenses,
-                'monthly_balance': monthly_balance,
-                'current_month_name': current_month_name,
-                'current_year': now.year,
-
-                # Chart data (raw Python lists, use json_script in template)
-                'expense_by_category': expense_by_category,
-                'chart_data': chart_data,
-                'income_chart_data': income_chart_data,
-
-                # AI analysis
-                'latest_analysis': latest_analysis,
-
-                # Goals
-                'upcoming_goals': upcoming_goals,
-                'goals_active_count': goals_active_count,
-                'goals_total_count': goals_total_count,
-                'budget_alerts': budget_alerts,
-                'budgets_count': budgets_count,
-                'budgets_exceeded_count': budgets_exceeded_count,
-                'pending_recurrences_count': pending_recurrences_count,
-                'installments_due_this_month': installments_due_this_month,
-                'installments_total_this_month': installments_total_this_month,
-                'cards_summary': cards_summary,
-                'total_card_debt': total_card_debt,
-            })
-
+            snapshot = get_dashboard_snapshot(user)
         except Exception:
             logger.exception('Erro ao carregar dados do dashboard para o usuário %s', user.email)
-            now = timezone.now()
-            month_names = [
-                'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-                'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
-            ]
+            context.update(DashboardSnapshot.empty().as_context())
             context.update({
-                'total_balance': Decimal('0.00'),
-                'active_accounts_count': 0,
-                'recent_transactions': [],
                 'category_distribution': [],
-                'total_income': Decimal('0.00'),
-                'total_expenses': Decimal('0.00'),
-                'monthly_balance': Decimal('0.00'),
-                'current_month_name': month_names[now.month - 1],
-                'current_year': now.year,
-                'expense_by_category': [],
-                'chart_data': [],
-                'income_chart_data': [],
-                'latest_analysis': None,
-                'upcoming_goals': [],
-                'goals_active_count': 0,
-                'goals_total_count': 0,
-                'budget_alerts': [],
-                'budgets_count': 0,
-                'budgets_exceeded_count': 0,
-                'pending_recurrences_count': 0,
-                'installments_due_this_month': [],
-                'installments_total_this_month': Decimal('0.00'),
-                'cards_summary': [],
-                'total_card_debt': Decimal('0.00'),
                 'dashboard_error': True,
             })
-
+            return context
+
+        context.update(snapshot.as_context())
+        remember_sidebar_counts(
+            self.request,
+            snapshot.budgets_exceeded_count,
+            snapshot.pending_recurrences_count,
+        )
+        # All-time distribution stays a lazy queryset: it only hits the
+        # database if a template actually iterates it.
+        context['category_distribution'] = MonthlyCategoryRollup.objects.filter(
+            user=user
+        ).values('category__name', 'transaction_type').annotate(
+            category_total=Sum('total'),
+            category_count=Sum('count')
+        ).values(
+            'category__name',
+            'transaction_type',
+            total=F('category_total'),
+            count=F('category_count'),
+        ).order_by('-total')
         return context
 
 
@@ -325,38 +91,112 @@ _MONTH_LABELS_PT = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
 
 
 class MonthlyEvolutionView(LoginRequiredMixin, View):
-    """Returns JSON with income, expense and balance for the last 6 months."""
+    """
+    Returns JSON with income, expense and balance per month.
+
+    Query params: ``months`` (1-60, default 6) and optional ``account`` and
+    ``category`` ids. The whole horizon is read from the monthly rollups in a
+    single grouped query; months without transactions are zero-filled.
+    """
 
     http_method_names = ['get']
+    DEFAULT_MONTHS = 6
+    MAX_MONTHS = 60
 
-    def get(self, request, *args, **kwargs):
-        today = date.today()
-        data = []
+    def get_months(self):
+        try:
+            months = int(self.request.GET.get('months', self.DEFAULT_MONTHS))
+        except (TypeError, ValueError):
+            return self.DEFAULT_MONTHS
+        return max(1, min(months, self.MAX_MONTHS))
+
+    def get_filters(self):
+        filters = Q(user=self.request.user)
+        account = self.request.GET.get('account', '')
+        if account.isdigit():
+            filters &= Q(account_id=int(account))
+        category = self.request.GET.get('category', '')
+        if category.isdigit():
+            filters &= Q(category_id=int(category))
+        return filters
 
-        for i in range(5, -1, -1):
-            total_months = today.year * 12 + today.month - 1 - i
-            year = total_months // 12
-            month = total_months % 12 + 1
+    def get(self, request, *args, **kwargs):
+        months = self.get_months()
+        current_month = timezone.localdate().replace(day=1)
+        first_month = shift_month(current_month, -(months - 1))
+        end_month = shift_month(current_month, 1)
+
+        rows = MonthlyCategoryRollup.objects.filter(
+            self.get_filters(),
+            month__gte=first_month,
+            month__lt=end_month,
+        ).values('month').annotate(
+            income=Sum('total', filter=Q(transaction_type=Transaction.INCOME)),
+            expense=Sum('total', filter=Q(transaction_type=Transaction.EXPENSE)),
+        ).order_by('month')
+        totals = {row['month']: row for row in rows}
 
-            agg = Transaction.objects.filter(
-                user=request.user,
-                date__year=year,
-                date__month=month,
-            ).values('transaction_type').annotate(total=Sum('amount'))
-
-            income = Decimal('0')
-            expense = Decimal('0')
-            for row in agg:
-                if row['transaction_type'] == Transaction.INCOME:
-                    income = row['total'] or Decimal('0')
-                elif row['transaction_type'] == Transaction.EXPENSE:
-                    expense = row['total'] or Decimal('0')
+        data = []
+        for offset in range(months):
+            month = shift_month(first_month, offset)
+            row = totals.get(month, {})
+            income = row.get('income') or Decimal('0')
+            expense = row.get('expense') or Decimal('0')
+            label = _MONTH_LABELS_PT[month.month - 1]
+            if months > 12:
+                label = f'{label}/{month:%y}'
 
             data.append({
-                'month': _MONTH_LABELS_PT[month - 1],
+                'month': label,
+                'year': month.year,
                 'income': float(income),
                 'expense': float(expense),
                 'balance': float(income - expense),
             })
 
         return JsonResponse(data, safe=False)
+
+
+class NetWorthHistoryView(LoginRequiredMixin, View):
+    """
+    Returns JSON with the closing net worth of each day.
+
+    Query params: ``days`` (1-3650, default 365) and an optional ``account``
+    id to chart a single account. Past days come from the daily snapshots
+    (``python manage.py snapshot_balances``); today is the live balance.
+    Days without a snapshot are left out.
+    """
+
+    http_method_names = ['get']
+    DEFAULT_DAYS = 365
+    MAX_DAYS = 3650
+
+    def get_days(self):
+        try:
+            days = int(self.request.GET.get('days', self.DEFAULT_DAYS))
+        except (TypeError, ValueError):
+            return self.DEFAULT_DAYS
+        return max(1, min(days, self.MAX_DAYS))
+
+    def get(self, request, *args, **kwargs):
+        today = timezone.localdate()
+        date_from = today - timedelta(days=self.get_days() - 1)
+        accounts = Account.objects.filter(user=request.user)
+
+        account = request.GET.get('account', '')
+        if account.isdigit():
+            accounts = accounts.filter(pk=int(account))
+            history = AccountBalanceSnapshot.objects.filter(
+                user=request.user,
+                account_id=int(account),
+            ).values_list('date', 'balance')
+        else:
+            accounts = accounts.filter(is_active=True)
+            history = NetWorthSnapshot.objects.filter(user=request.user).values_list('date', 'total')
+
+        rows = history.filter(date__gte=date_from, date__lt=today).order_by('date')
+        data = [{'date': day.isoformat(), 'total': float(total)} for day, total in rows]
+        current = accounts.aggregate(total=Sum('current_balance'))['total'] or Decimal('0')
+        data.append({'date': today.isoformat(), 'total': float(current)})
+
+        return JsonResponse(data, safe=False)
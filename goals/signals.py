@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+from .models import Goal
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def invalidate_user_cache_on_goal_change(sender, instance, **kwargs):
+    bump_user_data_version(instance.user_id)
@@ -1,6 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from core.cache import bump_user_data_version
+
 from .models import Installment, InstallmentPlan, add_months
 
 
@@ -20,3 +22,16 @@ def create_installments_for_plan(sender, instance, created, **kwargs):
         for number in range(1, instance.installment_count + 1)
     ]
     Installment.objects.bulk_create(installments)
+
+
+@receiver(post_save, sender=InstallmentPlan)
+@receiver(post_delete, sender=InstallmentPlan)
+def invalidate_user_cache_on_plan_change(sender, instance, **kwargs):
+    bump_user_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=Installment)
+def invalidate_user_cache_on_installment_change(sender, instance, **kwargs):
+    # Installments are only deleted together with their plan, which already
+    # bumps the version above.
+    bump_user_data_version(instance.plan.user_id)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RecurrencesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recurrences'
+
+    def ready(self):
+        import recurrences.signals  # noqa: F401
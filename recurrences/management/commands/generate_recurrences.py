@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
 from recurrences.models import Recurrence
+from transactions.bookkeeping import deferred_bookkeeping
 from transactions.models import Transaction
 
 
@@ -23,19 +24,25 @@ class Command(BaseCommand):
         generated_count = 0
         error_count = 0
 
-        for recurrence in self.get_due_recurrences(target_month):
-            transaction_date = self.get_transaction_date(recurrence, target_month)
-            if transaction_date is None:
-                continue
-
-            if self.transaction_exists(recurrence, transaction_date):
-                continue
-
-            try:
-                recurrence.generate_transaction(target_date=transaction_date)
-                generated_count += 1
-            except Exception:
-                error_count += 1
+        # Balances, rollups and cache versions are written once per account
+        # at the end instead of once per generated transaction.
+        with deferred_bookkeeping():
+            for recurrence in self.get_due_recurrences(target_month):
+                transaction_date = self.get_transaction_date(recurrence, target_month)
+                if transaction_date is None:
+                    continue
+
+                if self.transaction_exists(recurrence, transaction_date):
+                    continue
+
+                # A nested block (not a bare atomic()) so that a failing
+                # recurrence also drops the deltas it already recorded.
+                try:
+                    with deferred_bookkeeping():
+                        recurrence.generate_transaction(target_date=transaction_date)
+                    generated_count += 1
+                except Exception:
+                    error_count += 1
 
         self.stdout.write(f'{generated_count} recorrências geradas, {error_count} com erro')
 
@@ -50,33 +57,11 @@ class Command(BaseCommand):
             raise CommandError('Informe um mês válido no formato YYYY-MM.') from exc
 
     def get_due_recurrences(self, target_month):
-        month_end = date(
-            target_month.year,
-            target_month.month,
-            monthrange(target_month.year, target_month.month)[1],
+        return Recurrence.objects.pending_in(target_month).select_related(
+            'account',
+            'category',
+            'user',
         )
-        recurrences = Recurrence.objects.filter(
-            is_active=True,
-            start_date__lte=month_end,
-        ).select_related('account', 'category', 'user')
-
-        return [
-            recurrence for recurrence in recurrences
-            if self.is_due_for_month(recurrence, target_month)
-        ]
-
-    def is_due_for_month(self, recurrence, target_month):
-        if recurrence.end_date and recurrence.end_date < target_month:
-            return False
-        if recurrence.last_generated_date:
-            if (
-                recurrence.last_generated_date.year == target_month.year
-                and recurrence.last_generated_date.month == target_month.month
-            ):
-                return False
-        if target_month == timezone.localdate().replace(day=1):
-            return recurrence.is_due_this_month
-        return True
 
     def get_transaction_date(self, recurrence, target_month):
         month_last_day = monthrange(target_month.year, target_month.month)[1]
@@ -1,3 +1,4 @@
+from calendar import monthrange
 from datetime import date
 
 from django.conf import settings
@@ -8,6 +9,34 @@ from django.utils import timezone
 from transactions.models import Transaction
 
 
+class RecurrenceQuerySet(models.QuerySet):
+    def pending_in(self, month=None):
+        """
+        Active recurrences not yet generated for ``month`` (default: current month).
+
+        Database-side equivalent of ``Recurrence.is_due_this_month``: started by
+        the cutoff (today for the current month, the month's last day otherwise),
+        not ended before the month starts, and without a transaction generated
+        within the month.
+        """
+        today = timezone.localdate()
+        month_start = (month or today).replace(day=1)
+        month_end = month_start.replace(day=monthrange(month_start.year, month_start.month)[1])
+        cutoff = today if month_start == today.replace(day=1) else month_end
+
+        return self.filter(
+            models.Q(end_date__isnull=True) | models.Q(end_date__gte=month_start),
+            is_active=True,
+            start_date__lte=cutoff,
+        ).exclude(
+            last_generated_date__gte=month_start,
+            last_generated_date__lte=month_end,
+        )
+
+    def pending_for(self, user, month=None):
+        return self.filter(user=user).pending_in(month)
+
+
 class Recurrence(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -45,6 +74,8 @@ class Recurrence(models.Model):
     created_at = models.DateTimeField('Data de Criação', auto_now_add=True)
     updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
 
+    objects = RecurrenceQuerySet.as_manager()
+
     class Meta:
         ordering = ['transaction_type', 'day_of_month', 'name']
         verbose_name = 'Recorrência'
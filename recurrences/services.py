@@ -8,9 +8,9 @@ def get_active_recurrences(user):
     ).select_related('category', 'account')
 
 
-def get_pending_recurrences(user):
-    return [recurrence for recurrence in get_active_recurrences(user) if recurrence.is_due_this_month]
+def get_pending_recurrences(user, month=None):
+    return Recurrence.objects.pending_for(user, month).select_related('category', 'account')
 
 
-def get_pending_recurrences_count(user):
-    return len(get_pending_recurrences(user))
+def get_pending_recurrences_count(user, month=None):
+    return Recurrence.objects.pending_for(user, month).count()
@@ -1,6 +1,7 @@
 from datetime import date, timedelta
 from decimal import Decimal
 from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core.management import call_command
@@ -12,10 +13,11 @@ from django.utils import timezone
 
 from accounts.models import Account
 from categories.models import Category
-from transactions.models import Transaction
+from transactions.models import MonthlyCategoryRollup, Transaction
 
 from .forms import RecurrenceForm
 from .models import Recurrence
+from .services import get_pending_recurrences_count
 from .views import RecurrenceCreateView, RecurrenceUpdateView
 
 
@@ -69,6 +71,42 @@ class RecurrenceModelTests(TestCase):
 
         self.assertFalse(recurrence.is_due_this_month)
 
+    def test_pending_for_matches_is_due_this_month(self):
+        today = timezone.localdate()
+        month_start = today.replace(day=1)
+        scenarios = {
+            'never_generated': {},
+            'generated_last_month': {'last_generated_date': month_start - timedelta(days=1)},
+            'generated_this_month': {'last_generated_date': month_start},
+            'inactive': {'is_active': False},
+            'starts_in_future': {'start_date': today + timedelta(days=40)},
+            'ended_last_month': {'end_date': month_start - timedelta(days=1)},
+            'ends_this_month': {'end_date': month_start},
+        }
+        for name, overrides in scenarios.items():
+            Recurrence.objects.create(**{
+                'user': self.user,
+                'name': name,
+                'transaction_type': Transaction.EXPENSE,
+                'amount': Decimal('10.00'),
+                'category': self.category,
+                'account': self.account,
+                'day_of_month': 5,
+                'start_date': month_start - timedelta(days=60),
+                **overrides,
+            })
+
+        expected = {
+            recurrence.name for recurrence in Recurrence.objects.filter(user=self.user)
+            if recurrence.is_due_this_month
+        }
+        pending = Recurrence.objects.pending_for(self.user)
+
+        self.assertEqual(set(pending.values_list('name', flat=True)), expected)
+        self.assertEqual(expected, {'never_generated', 'generated_last_month', 'ends_this_month'})
+        with self.assertNumQueries(1):
+            self.assertEqual(get_pending_recurrences_count(self.user), 3)
+
 
 class RecurrenceListViewTests(TestCase):
     def setUp(self):
@@ -317,6 +355,29 @@ class GenerateRecurrencesCommandTests(TestCase):
             timezone.localdate().month,
         )
 
+    def test_failing_recurrence_leaves_balance_and_rollups_untouched(self):
+        self.create_recurrence(name='Internet', amount=Decimal('100.00'), day_of_month=5)
+        self.create_recurrence(name='Academia', amount=Decimal('40.00'), day_of_month=6)
+        self.create_recurrence(name='Streaming', amount=Decimal('30.00'), day_of_month=7)
+        original_save = Recurrence.save
+
+        def save(recurrence, *args, **kwargs):
+            # Fails after generate_transaction already created the row.
+            if recurrence.name == 'Academia' and kwargs.get('update_fields'):
+                raise RuntimeError('falha simulada')
+            return original_save(recurrence, *args, **kwargs)
+
+        stdout = StringIO()
+        with mock.patch.object(Recurrence, 'save', save):
+            call_command('generate_recurrences', stdout=stdout)
+
+        self.assertIn('2 recorrências geradas, 1 com erro', stdout.getvalue())
+        self.assertFalse(Transaction.objects.filter(description='Academia').exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('870.00'))
+        rollup = MonthlyCategoryRollup.objects.get(category=self.category)
+        self.assertEqual((rollup.total, rollup.count), (Decimal('130.00'), 2))
+
     def test_command_accepts_month_argument_and_generates_for_target_month(self):
         recurrence = self.create_recurrence(
             name='Internet',
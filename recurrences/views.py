@@ -9,11 +9,11 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView
 from django.views.generic import CreateView, UpdateView
 
+from core.services import get_sidebar_counts
 from transactions.models import Transaction
 
 from .forms import RecurrenceForm
 from .models import Recurrence
-from .services import get_pending_recurrences_count
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +48,7 @@ class RecurrenceListView(LoginRequiredMixin, ListView):
             (recurrence.amount for recurrence in context['expense_recurrences']),
             Decimal('0.00'),
         )
-        context['pending_recurrences_count'] = get_pending_recurrences_count(self.request.user)
+        context['pending_recurrences_count'] = get_sidebar_counts(self.request)['pending_recurrences_count']
         return context
 
 
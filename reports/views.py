@@ -3,13 +3,13 @@ from datetime import date
 from decimal import Decimal
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, F, Q, Sum
+from django.db.models import F, Q, Sum
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.views.generic import TemplateView
 
 from accounts.models import Account
-from transactions.models import Transaction
+from transactions.models import MonthlyCategoryRollup, Transaction
 
 
 class ReportView(LoginRequiredMixin, TemplateView):
@@ -103,13 +103,23 @@ class ReportView(LoginRequiredMixin, TemplateView):
         transactions = Transaction.objects.filter(transaction_filters)
         transactions_with_related = transactions.select_related('account', 'category')
 
-        totals = transactions.aggregate(
+        # Report periods always span whole months, so totals and breakdowns
+        # come from the monthly rollups instead of scanning every transaction.
+        rollup_filters = Q(
+            user=self.request.user,
+            month__range=(date_start, date_end)
+        )
+        if selected_account:
+            rollup_filters &= Q(account=selected_account)
+        rollups = MonthlyCategoryRollup.objects.filter(rollup_filters)
+
+        totals = rollups.aggregate(
             total_income=Coalesce(
-                Sum('amount', filter=Q(transaction_type=Transaction.INCOME)),
+                Sum('total', filter=Q(transaction_type=Transaction.INCOME)),
                 Decimal('0.00')
             ),
             total_expense=Coalesce(
-                Sum('amount', filter=Q(transaction_type=Transaction.EXPENSE)),
+                Sum('total', filter=Q(transaction_type=Transaction.EXPENSE)),
                 Decimal('0.00')
             ),
         )
@@ -122,12 +132,12 @@ class ReportView(LoginRequiredMixin, TemplateView):
         )
 
         expense_by_category = self._get_category_totals(
-            transactions,
+            rollups,
             Transaction.EXPENSE,
             total_expense,
         )
         income_by_category = self._get_category_totals(
-            transactions,
+            rollups,
             Transaction.INCOME,
             total_income,
         )
@@ -151,28 +161,28 @@ class ReportView(LoginRequiredMixin, TemplateView):
             for item in daily_evolution_queryset
         ]
 
-        account_transaction_filter = Q(
-            transactions__user=self.request.user,
-            transactions__date__range=(date_start, date_end),
+        account_rollup_filter = Q(
+            monthly_rollups__user=self.request.user,
+            monthly_rollups__month__range=(date_start, date_end),
         )
         if selected_account:
-            account_transaction_filter &= Q(transactions__account=selected_account)
+            account_rollup_filter &= Q(monthly_rollups__account=selected_account)
 
         by_account_queryset = accounts.annotate(
             period_income=Coalesce(
                 Sum(
-                    'transactions__amount',
-                    filter=account_transaction_filter & Q(
-                        transactions__transaction_type=Transaction.INCOME
+                    'monthly_rollups__total',
+                    filter=account_rollup_filter & Q(
+                        monthly_rollups__transaction_type=Transaction.INCOME
                     )
                 ),
                 Decimal('0.00')
             ),
             period_expense=Coalesce(
                 Sum(
-                    'transactions__amount',
-                    filter=account_transaction_filter & Q(
-                        transactions__transaction_type=Transaction.EXPENSE
+                    'monthly_rollups__total',
+                    filter=account_rollup_filter & Q(
+                        monthly_rollups__transaction_type=Transaction.EXPENSE
                     )
                 ),
                 Decimal('0.00')
@@ -219,17 +229,25 @@ class ReportView(LoginRequiredMixin, TemplateView):
         })
         return context
 
-    def _get_category_totals(self, transactions, transaction_type, total_amount):
-        queryset = transactions.filter(
+    def _get_category_totals(self, rollups, transaction_type, total_amount):
+        queryset = rollups.filter(
             transaction_type=transaction_type
         ).values(
             name=F('category__name'),
             color=F('category__color'),
         ).annotate(
-            total=Coalesce(Sum('amount'), Decimal('0.00')),
-            count=Count('id'),
-        ).order_by('-total', 'name')
-        category_totals = list(queryset)
+            category_total=Coalesce(Sum('total'), Decimal('0.00')),
+            category_count=Coalesce(Sum('count'), 0),
+        ).order_by('-category_total', 'name')
+        category_totals = [
+            {
+                'name': item['name'],
+                'color': item['color'],
+                'total': item['category_total'],
+                'count': item['category_count'],
+            }
+            for item in queryset
+        ]
 
         for item in category_totals:
             if total_amount > 0:
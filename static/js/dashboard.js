@@ -121,3 +121,92 @@
             console.error('Erro ao carregar evolução mensal:', err);
         });
 })();
+
+(function () {
+    'use strict';
+
+    var canvas = document.getElementById('netWorthChart');
+    if (!canvas) return;
+
+    function formatBRL(value) {
+        return 'R$ ' + value.toLocaleString('pt-BR', {
+            minimumFractionDigits: 2,
+            maximumFractionDigits: 2
+        });
+    }
+
+    function formatDay(isoDate) {
+        var parts = isoDate.split('-');
+        return parts[2] + '/' + parts[1] + '/' + parts[0];
+    }
+
+    fetch(canvas.dataset.url, { credentials: 'same-origin' })
+        .then(function (res) { return res.json(); })
+        .then(function (data) {
+            new Chart(canvas, {
+                type: 'line',
+                data: {
+                    labels: data.map(function (d) { return formatDay(d.date); }),
+                    datasets: [
+                        {
+                            label: 'Patrimônio',
+                            data: data.map(function (d) { return d.total; }),
+                            borderColor: '#22c55e',
+                            backgroundColor: 'rgba(34, 197, 94, 0.08)',
+                            pointRadius: 0,
+                            pointHoverRadius: 4,
+                            tension: 0.2,
+                            fill: true,
+                            borderWidth: 2
+                        }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    interaction: {
+                        intersect: false,
+                        mode: 'index'
+                    },
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            backgroundColor: '#111111',
+                            titleColor: '#f5f5f5',
+                            titleFont: { family: 'Inter, sans-serif', size: 13, weight: 'bold' },
+                            bodyColor: '#a3a3a3',
+                            bodyFont: { family: '"JetBrains Mono", monospace', size: 12 },
+                            borderColor: '#262626',
+                            borderWidth: 1,
+                            padding: 14,
+                            cornerRadius: 8,
+                            callbacks: {
+                                label: function (ctx) {
+                                    return ' ' + formatBRL(ctx.parsed.y);
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            ticks: { color: '#525252', font: { size: 11 }, maxTicksLimit: 12 },
+                            grid: { display: false },
+                            border: { color: 'rgba(38, 38, 38, 0.8)' }
+                        },
+                        y: {
+                            ticks: {
+                                color: '#525252',
+                                font: { size: 11 },
+                                callback: function (value) { return formatBRL(value); }
+                            },
+                            grid: { color: 'rgba(38, 38, 38, 0.8)' },
+                            border: { color: 'rgba(38, 38, 38, 0.8)' }
+                        }
+                    }
+                }
+            });
+        })
+        .catch(function (err) {
+            console.error('Erro ao carregar evolução do patrimônio:', err);
+        });
+})();
@@ -0,0 +1,185 @@
+"""
+Budget spend benchmark.
+
+Seeds a throwaway test database with thousands of users whose expenses all
+go to the shared default categories, then times the budget list of one user
+computed two ways: the previous join through ``category__transactions``
+(which reaches every user's rows of those categories) and the current
+``Budget.objects.with_usage()`` (a correlated subquery over the user's
+monthly rollups). Prints the query plan and the median of each.
+
+Usage (from the project root):
+    DEBUG=True python tests/load/benchmark_budget_spend.py --users 5000
+
+Uses DATABASE_URL like the app does. The real database is never touched:
+Django's test database machinery creates and drops a separate one.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import DecimalField, Q, Sum, Value  # noqa: E402
+from django.db.models.functions import Coalesce  # noqa: E402
+
+from accounts.models import Account  # noqa: E402
+from budgets.models import Budget  # noqa: E402
+from categories.models import Category  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+from transactions.rollups import rebuild_monthly_rollups  # noqa: E402
+
+BATCH_SIZE = 5000
+DEFAULT_CATEGORIES = 10
+
+
+def seed(users, transactions_per_user, months):
+    User = get_user_model()
+    password = make_password('benchmark')
+    User.objects.bulk_create(
+        [User(email=f'benchmark-{number}@example.com', password=password) for number in range(users)],
+        batch_size=BATCH_SIZE,
+    )
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    Account.objects.bulk_create(
+        [
+            Account(
+                user_id=user_id,
+                name='Conta',
+                account_type=Account.CHECKING,
+                initial_balance=Decimal('1000.00'),
+                current_balance=Decimal('1000.00'),
+            )
+            for user_id in user_ids
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    accounts = dict(Account.objects.values_list('user_id', 'pk'))
+    categories = Category.objects.bulk_create([
+        Category(
+            user=None,
+            name=f'Padrão {number}',
+            category_type=Category.EXPENSE,
+            is_default=True,
+        )
+        for number in range(DEFAULT_CATEGORIES)
+    ])
+
+    today = date.today()
+    rows = []
+    created = 0
+    for user_id in user_ids:
+        for _ in range(transactions_per_user):
+            rows.append(Transaction(
+                user_id=user_id,
+                account_id=accounts[user_id],
+                category=random.choice(categories),
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal(random.randint(100, 50000)) / 100,
+                date=today - timedelta(days=random.randint(0, months * 30)),
+            ))
+            if len(rows) >= BATCH_SIZE:
+                Transaction.objects.bulk_create(rows)
+                created += len(rows)
+                rows = []
+    Transaction.objects.bulk_create(rows)
+    created += len(rows)
+
+    # bulk_create skips the signals that keep the rollups in sync.
+    rebuild_monthly_rollups()
+
+    month_start = today.replace(day=1)
+    user_id = random.choice(user_ids)
+    Budget.objects.bulk_create([
+        Budget(user_id=user_id, category=category, amount=Decimal('500.00'), month=month_start)
+        for category in categories
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return created, User.objects.get(pk=user_id), month_start
+
+
+def join_queryset(user, month_start):
+    """The ``spent`` annotation used before the rollup subquery."""
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return Budget.objects.filter(user=user, month=month_start).select_related('category').annotate(
+        spent=Coalesce(
+            Sum(
+                'category__transactions__amount',
+                filter=Q(
+                    category__transactions__user=user,
+                    category__transactions__transaction_type=Transaction.EXPENSE,
+                    category__transactions__date__gte=month_start,
+                    category__transactions__date__lt=next_month,
+                ),
+            ),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+
+
+def run(label, queryset, repeat):
+    print(f'\n=== {label} ===')
+    print(queryset.explain())
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = {budget.pk: budget.spent for budget in queryset.all()}
+        samples.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(samples)
+    print(f'mediana: {median:.2f} ms')
+    return median, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=50, help='Transações por usuário.')
+    parser.add_argument('--months', type=int, default=12, help='Meses de histórico.')
+    parser.add_argument('--repeat', type=int, default=20, help='Execuções por consulta.')
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args()
+
+    random.seed(options.seed)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f'Banco: {connection.vendor}')
+        start = time.perf_counter()
+        total, user, month_start = seed(options.users, options.transactions, options.months)
+        print(f'{total} transações de {options.users} usuários geradas em {time.perf_counter() - start:.1f}s')
+
+        before, join_spent = run('Join por category__transactions', join_queryset(user, month_start), options.repeat)
+        after, rollup_spent = run(
+            'Subquery nos consolidados mensais',
+            Budget.objects.filter(user=user).with_usage(month_start),
+            options.repeat,
+        )
+        if join_spent != rollup_spent:
+            sys.exit('Os dois cálculos divergem.')
+
+        print('\n=== Resumo (mediana) ===')
+        print(f'{"gasto dos orçamentos":<40} {before:>9.2f} ms -> {after:>9.2f} ms')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
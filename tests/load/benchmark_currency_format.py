@@ -0,0 +1,88 @@
+"""
+Currency formatting micro-benchmark.
+
+Formats the same list of amounts with the previous filter implementation
+(``Decimal(str(value))`` + ``django.utils.formats.number_format`` under the
+pt-BR locale) and with ``core.formatting.format_brl``, checks that both give
+the same strings and prints the best time of each.
+
+Usage (from the project root):
+    DEBUG=True python tests/load/benchmark_currency_format.py --values 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import translation  # noqa: E402
+from django.utils.formats import number_format  # noqa: E402
+
+from core.formatting import format_brl, format_currency_fields  # noqa: E402
+
+
+def legacy_format_currency(value):
+    try:
+        value = Decimal(str(value))
+    except (TypeError, ValueError, InvalidOperation):
+        return 'R$ 0,00'
+    formatted = number_format(abs(value), decimal_pos=2, use_l10n=True, force_grouping=True)
+    if value < 0:
+        return f'-R$ {formatted}'
+    return f'R$ {formatted}'
+
+
+def build_values(count, seed):
+    rng = random.Random(seed)
+    return [
+        Decimal(rng.randint(-5_000_000, 50_000_000)) / 100
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--values', type=int, default=10000, help='Valores por execução.')
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por implementação.')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    values = build_values(args.values, args.seed)
+    rows = [{'amount': value} for value in values]
+
+    with translation.override('pt-br'):
+        legacy = [legacy_format_currency(value) for value in values]
+        fast = [format_brl(value) for value in values]
+        if legacy != fast:
+            mismatch = next(i for i, (a, b) in enumerate(zip(legacy, fast)) if a != b)
+            sys.exit(f'Divergência em {values[mismatch]}: {legacy[mismatch]!r} != {fast[mismatch]!r}')
+
+        timings = {
+            'number_format (anterior)': lambda: [legacy_format_currency(value) for value in values],
+            'format_brl': lambda: [format_brl(value) for value in values],
+            'format_currency_fields': lambda: format_currency_fields(rows, 'amount'),
+        }
+        results = {
+            name: min(timeit.repeat(func, number=1, repeat=args.repeat))
+            for name, func in timings.items()
+        }
+
+    baseline = results['number_format (anterior)']
+    print(f'{args.values} valores, melhor de {args.repeat} execuções')
+    for name, seconds in results.items():
+        per_value = seconds / args.values * 1_000_000
+        print(f'{name:<28} {seconds * 1000:>9.2f} ms  {per_value:>6.2f} µs/valor  {baseline / seconds:>5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
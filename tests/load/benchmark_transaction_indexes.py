@@ -0,0 +1,217 @@
+"""
+Transaction index benchmark.
+
+Seeds a throwaway test database with a large transaction history and runs
+the hot query shapes (dashboard/reports, budget spend, card bill) twice:
+with the indexes from before migration 0006 and with the current ones.
+Prints the query plan and the median time of each query for both runs.
+
+Usage (from the project root):
+    DEBUG=True python tests/load/benchmark_transaction_indexes.py --transactions 500000
+
+Uses DATABASE_URL like the app does; run it against PostgreSQL to see the
+partial and covering (INCLUDE) indexes in action. The real database is never
+touched: Django's test database machinery creates and drops a separate one.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, models  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+
+from accounts.models import Account, CreditCard  # noqa: E402
+from categories.models import Category  # noqa: E402
+from transactions.models import Transaction  # noqa: E402
+
+NEW_INDEX_NAMES = (
+    'transaction_user_type_date_idx',
+    'transaction_cat_expense_idx',
+    'transaction_card_date_idx',
+)
+OLD_INDEXES = (
+    models.Index(fields=['user', 'transaction_type'], name='transaction_user_id_98a6b3_idx'),
+)
+
+BATCH_SIZE = 5000
+
+
+def seed(users, transactions_per_user):
+    User = get_user_model()
+    today = date.today()
+    rows = []
+    created = 0
+
+    for user_number in range(users):
+        user = User.objects.create_user(
+            email=f'benchmark-{user_number}@example.com',
+            password='benchmark',
+        )
+        accounts = [
+            Account.objects.create(
+                user=user,
+                name=f'Conta {number}',
+                account_type=Account.CHECKING,
+                initial_balance=Decimal('1000.00'),
+            )
+            for number in range(3)
+        ]
+        card = CreditCard.objects.create(
+            user=user,
+            name='Cartão',
+            bank_code=Account.NUBANK,
+            credit_limit=Decimal('5000.00'),
+            closing_day=5,
+            due_day=12,
+        )
+        categories = {
+            category_type: [
+                Category.objects.create(
+                    user=user,
+                    name=f'{category_type} {number}',
+                    category_type=category_type,
+                )
+                for number in range(8)
+            ]
+            for category_type in (Category.INCOME, Category.EXPENSE)
+        }
+
+        for _ in range(transactions_per_user):
+            transaction_type = random.choice((Transaction.EXPENSE,) * 4 + (Transaction.INCOME,))
+            rows.append(Transaction(
+                user=user,
+                account=random.choice(accounts),
+                category=random.choice(categories[transaction_type]),
+                credit_card=(
+                    card if transaction_type == Transaction.EXPENSE and random.random() < 0.1 else None
+                ),
+                transaction_type=transaction_type,
+                amount=Decimal(random.randint(100, 50000)) / 100,
+                date=today - timedelta(days=random.randint(0, 5 * 365)),
+            ))
+            if len(rows) >= BATCH_SIZE:
+                Transaction.objects.bulk_create(rows)
+                created += len(rows)
+                rows = []
+
+    Transaction.objects.bulk_create(rows)
+    return created + len(rows)
+
+
+def hot_queries():
+    """The query shapes the indexes were designed for, against a random user."""
+    transaction = Transaction.objects.order_by('?').select_related('user').first()
+    user = transaction.user
+    month_start = date.today().replace(day=1)
+    year_start = month_start.replace(month=1)
+    category = Category.objects.filter(user=user, category_type=Category.EXPENSE).first()
+    card = CreditCard.objects.filter(user=user).first()
+
+    return {
+        'dashboard: user + tipo + período': Transaction.objects.filter(
+            user=user,
+            transaction_type=Transaction.EXPENSE,
+            date__gte=year_start,
+            date__lte=date.today(),
+        ),
+        'orçamento: categoria + despesa + mês': Transaction.objects.filter(
+            user=user,
+            category=category,
+            transaction_type=Transaction.EXPENSE,
+            date__gte=month_start,
+            date__lte=date.today(),
+        ),
+        'fatura: cartão + período': Transaction.objects.filter(
+            credit_card=card,
+            date__gte=month_start - timedelta(days=31),
+            date__lte=date.today(),
+        ),
+    }
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def set_index_state(current):
+    """Switch between the pre-0006 indexes (current=False) and the current ones."""
+    new_indexes = [index for index in Transaction._meta.indexes if index.name in NEW_INDEX_NAMES]
+    with connection.schema_editor() as editor:
+        for index in new_indexes:
+            if current:
+                editor.add_index(Transaction, index)
+            else:
+                editor.remove_index(Transaction, index)
+        for index in OLD_INDEXES:
+            if current:
+                editor.remove_index(Transaction, index)
+            else:
+                editor.add_index(Transaction, index)
+    analyze()
+
+
+def run(label, queries, repeat):
+    print(f'\n=== {label} ===')
+    timings = {}
+    for name, queryset in queries.items():
+        aggregate = queryset.order_by()
+        print(f'\n-- {name}')
+        print(aggregate.explain())
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            aggregate.aggregate(total=Sum('amount'))
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+        print(f'mediana: {timings[name]:.2f} ms')
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--transactions', type=int, default=200000, help='Total de transações.')
+    parser.add_argument('--repeat', type=int, default=20, help='Execuções por consulta.')
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args()
+
+    random.seed(options.seed)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f'Banco: {connection.vendor}')
+        start = time.perf_counter()
+        total = seed(options.users, max(1, options.transactions // options.users))
+        print(f'{total} transações geradas em {time.perf_counter() - start:.1f}s')
+
+        queries = hot_queries()
+        set_index_state(current=False)
+        before = run('Índices anteriores (0005)', queries, options.repeat)
+        set_index_state(current=True)
+        after = run('Índices atuais (0006)', queries, options.repeat)
+
+        print('\n=== Resumo (mediana) ===')
+        for name in queries:
+            print(f'{name:<40} {before[name]:>9.2f} ms -> {after[name]:>9.2f} ms')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Transaction
+from .models import MonthlyCategoryRollup, Transaction, TransactionArchive
 
 
 @admin.register(Transaction)
@@ -70,3 +70,40 @@ class TransactionAdmin(admin.ModelAdmin):
         elif db_field.name == 'user':
             kwargs['help_text'] = 'Usuário responsável por esta transação'
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(MonthlyCategoryRollup)
+class MonthlyCategoryRollupAdmin(admin.ModelAdmin):
+    """Read-only view of the rollups maintained by the transaction signals."""
+    list_display = ['month', 'transaction_type', 'category', 'account', 'user', 'total', 'count']
+    list_filter = ['transaction_type', 'month']
+    date_hierarchy = 'month'
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related('user', 'account', 'category')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TransactionArchive)
+class TransactionArchiveAdmin(admin.ModelAdmin):
+    """Read-only view of the compressed transaction archive."""
+    list_display = ['month', 'account', 'user', 'row_count', 'balance_effect', 'codec']
+    list_filter = ['codec', 'month']
+    date_hierarchy = 'month'
+    exclude = ['payload']
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related('user', 'account').defer('payload')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,284 @@
+"""
+Cold archive of old transactions.
+
+``archive_transactions`` moves every transaction dated before the archive
+horizon into ``TransactionArchive`` rows, one per account and month, and
+deletes it from the hot ``Transaction`` table. Each archive stores its rows
+column by column (one JSON list per field), compressed with zstd when
+``zstandard`` is installed and zlib otherwise.
+
+Moving a row to the archive does not change what it represents, so the
+bookkeeping signals are suspended: the monthly rollups and the account
+balance keep counting it. ``TransactionArchive.balance_effect`` records the
+archived part of each balance for ``reconcile_balances``, and
+``rebuild_monthly_rollups`` adds archived rows back in.
+
+``archived_transactions`` decodes the archives of a period read-only, so
+the transaction list and export can show them next to the hot rows without
+touching either table. ``restore_archived`` moves rows back to the hot table
+with their original primary keys and timestamps; it is only run on request,
+through ``python manage.py restore_archived_transactions``. Transactions
+linked to installments are never archived.
+"""
+import json
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+
+from accounts.models import Account, CreditCard, add_months
+from categories.models import Category
+from core.cache import bump_user_data_version
+
+from .bookkeeping import bookkeeping_suspended
+from .models import Transaction, TransactionArchive
+
+try:
+    import zstandard
+    _ZSTD_AVAILABLE = True
+except ImportError:
+    _ZSTD_AVAILABLE = False
+
+ARCHIVE_FIELDS = (
+    'id',
+    'category_id',
+    'credit_card_id',
+    'transaction_type',
+    'amount',
+    'date',
+    'description',
+    'transfer_id',
+    'created_at',
+    'updated_at',
+)
+DELETE_BATCH_SIZE = 1000
+RESTORE_BATCH_SIZE = 1000
+
+
+class ArchiveRestoreError(Exception):
+    """Raised when archived rows cannot be restored; nothing is changed in that case."""
+
+
+@dataclass
+class ArchiveResult:
+    transaction_count: int = 0
+    archive_count: int = 0
+
+
+def get_archive_horizon(today=None, months=None):
+    """First day of the oldest month kept in the hot table."""
+    if months is None:
+        months = settings.TRANSACTION_ARCHIVE_MONTHS
+    today = today or date.today()
+    return add_months(today.replace(day=1), -months)
+
+
+def _compress(data):
+    if _ZSTD_AVAILABLE:
+        return TransactionArchive.ZSTD, zstandard.ZstdCompressor(level=10).compress(data)
+    return TransactionArchive.ZLIB, zlib.compress(data, 9)
+
+
+def _decompress(codec, payload):
+    payload = bytes(payload)
+    if codec == TransactionArchive.ZSTD:
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+def encode_rows(rows):
+    """Pack row dicts (``ARCHIVE_FIELDS`` keys) into ``(codec, payload)``."""
+    columns = {name: [] for name in ARCHIVE_FIELDS}
+    for row in rows:
+        for name in ARCHIVE_FIELDS:
+            value = row[name]
+            if isinstance(value, (date, Decimal, uuid.UUID)):
+                value = value.isoformat() if isinstance(value, date) else str(value)
+            columns[name].append(value)
+    return _compress(json.dumps(columns, ensure_ascii=False, separators=(',', ':')).encode())
+
+
+def decode_archive(archive):
+    """Unpack an archive into row dicts with their original Python types."""
+    columns = json.loads(_decompress(archive.codec, archive.payload))
+    columns['amount'] = [Decimal(value) for value in columns['amount']]
+    columns['date'] = [date.fromisoformat(value) for value in columns['date']]
+    # Archives written before transfer_id existed have no such column.
+    columns['transfer_id'] = [
+        uuid.UUID(value) if value else None
+        for value in columns.get('transfer_id') or [None] * len(columns['id'])
+    ]
+    for name in ('created_at', 'updated_at'):
+        columns[name] = [datetime.fromisoformat(value) for value in columns[name]]
+    return [dict(zip(ARCHIVE_FIELDS, values)) for values in zip(*(columns[name] for name in ARCHIVE_FIELDS))]
+
+
+def _balance_effect(rows):
+    # Same rule as the signal handlers: card purchases do not touch the account.
+    effect = Decimal('0.00')
+    for row in rows:
+        if row['credit_card_id'] is not None:
+            continue
+        effect += row['amount'] if row['transaction_type'] == Transaction.INCOME else -row['amount']
+    return effect
+
+
+def _archive_user(user_id, queryset, result):
+    rows = queryset.order_by('account_id', 'date', 'pk').values('account_id', *ARCHIVE_FIELDS)
+
+    def group_key(row):
+        return row['account_id'], row['date'].replace(day=1)
+
+    with transaction.atomic(), bookkeeping_suspended():
+        for (account_id, month), group in groupby(list(rows), key=group_key):
+            group = list(group)
+            archive = TransactionArchive.objects.select_for_update().filter(
+                account_id=account_id,
+                month=month,
+            ).first()
+            archived_rows = decode_archive(archive) if archive else []
+            if archive is None:
+                archive = TransactionArchive(user_id=user_id, account_id=account_id, month=month)
+
+            archived_rows.extend(group)
+            archive.codec, archive.payload = encode_rows(archived_rows)
+            archive.row_count = len(archived_rows)
+            archive.balance_effect = _balance_effect(archived_rows)
+            archive.save()
+
+            ids = [row['id'] for row in group]
+            for start in range(0, len(ids), DELETE_BATCH_SIZE):
+                Transaction.objects.filter(pk__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+            result.transaction_count += len(ids)
+            result.archive_count += 1
+
+    bump_user_data_version(user_id)
+
+
+def archive_transactions(before=None, user_ids=None):
+    """Archive transactions dated before ``before`` (default: the horizon), user by user."""
+    before = before or get_archive_horizon()
+    candidates = Transaction.objects.filter(date__lt=before, installments__isnull=True)
+    if user_ids is not None:
+        candidates = candidates.filter(user_id__in=user_ids)
+
+    result = ArchiveResult()
+    owners = candidates.order_by('user_id').values_list('user_id', flat=True).distinct()
+    for user_id in list(owners):
+        _archive_user(user_id, candidates.filter(user_id=user_id), result)
+    return result
+
+
+def _archives_in_period(user, date_from=None, date_to=None, account_id=None):
+    archives = TransactionArchive.objects.filter(user=user)
+    if date_from:
+        archives = archives.filter(month__gte=date_from.replace(day=1))
+    if date_to:
+        archives = archives.filter(month__lte=date_to)
+    if account_id:
+        archives = archives.filter(account_id=account_id)
+    return archives
+
+
+def archived_transactions(
+    user,
+    date_from=None,
+    date_to=None,
+    account_id=None,
+    category_id=None,
+    transaction_type=None,
+):
+    """
+    Unsaved ``Transaction`` instances for the archived rows of ``user`` that
+    match the filters, in the list order (``-date, -created_at, -pk``).
+
+    Read-only: neither the archives nor the hot table change. Each instance
+    has ``is_archived`` set and its account, category and card attached
+    (the category or card is None when it was deleted after archiving).
+    """
+    instances = []
+    for archive in _archives_in_period(user, date_from, date_to, account_id).order_by('month'):
+        for row in decode_archive(archive):
+            if date_from and row['date'] < date_from:
+                continue
+            if date_to and row['date'] > date_to:
+                continue
+            if category_id and row['category_id'] != category_id:
+                continue
+            if transaction_type and row['transaction_type'] != transaction_type:
+                continue
+            instance = Transaction(user_id=archive.user_id, account_id=archive.account_id, **row)
+            instance.is_archived = True
+            instances.append(instance)
+    if not instances:
+        return instances
+
+    accounts = Account.objects.in_bulk({instance.account_id for instance in instances})
+    categories = Category.objects.in_bulk({instance.category_id for instance in instances})
+    cards = CreditCard.objects.in_bulk(
+        {instance.credit_card_id for instance in instances if instance.credit_card_id}
+    )
+    for instance in instances:
+        instance.account = accounts[instance.account_id]
+        instance.category = categories.get(instance.category_id)
+        if instance.credit_card_id:
+            instance.credit_card = cards.get(instance.credit_card_id)
+    instances.sort(key=lambda instance: (instance.date, instance.created_at, instance.pk), reverse=True)
+    return instances
+
+
+def _check_references(rows):
+    """Refuse to restore rows whose category or card no longer exists."""
+    category_ids = {row['category_id'] for row in rows}
+    card_ids = {row['credit_card_id'] for row in rows if row['credit_card_id']}
+    missing_categories = category_ids - set(Category.objects.in_bulk(category_ids))
+    missing_cards = card_ids - set(CreditCard.objects.in_bulk(card_ids))
+    if missing_categories or missing_cards:
+        raise ArchiveRestoreError(
+            'Há transações arquivadas que apontam para categorias ou cartões excluídos '
+            f'(categorias: {sorted(missing_categories)}, cartões: {sorted(missing_cards)}).'
+        )
+
+
+def restore_archived(user, date_from=None, date_to=None, account_id=None):
+    """
+    Move archived transactions of ``user`` in the given period back to the
+    hot table. Returns the number of transactions restored.
+    """
+    archives = _archives_in_period(user, date_from, date_to, account_id)
+
+    with transaction.atomic():
+        archives = list(archives.select_for_update())
+        if not archives:
+            return 0
+
+        decoded = [(archive, decode_archive(archive)) for archive in archives]
+        _check_references([row for _, rows in decoded for row in rows])
+
+        restored = []
+        timestamps = []
+        for archive, rows in decoded:
+            for row in rows:
+                timestamps.append((row.pop('created_at'), row.pop('updated_at')))
+                restored.append(Transaction(user_id=archive.user_id, account_id=archive.account_id, **row))
+
+        # bulk_create skips the bookkeeping signals (the rows are already
+        # counted) but stamps auto_now(_add) fields, so put the originals back.
+        Transaction.objects.bulk_create(restored, batch_size=RESTORE_BATCH_SIZE)
+        for instance, (created_at, updated_at) in zip(restored, timestamps):
+            instance.created_at = created_at
+            instance.updated_at = updated_at
+        Transaction.objects.bulk_update(
+            restored,
+            ['created_at', 'updated_at'],
+            batch_size=RESTORE_BATCH_SIZE,
+        )
+        TransactionArchive.objects.filter(pk__in=[archive.pk for archive in archives]).delete()
+
+    bump_user_data_version(user.pk)
+    return len(restored)
@@ -0,0 +1,141 @@
+"""
+Deferred, coalesced bookkeeping for transaction writes.
+
+Every transaction save/delete produces four side effects: an account
+balance delta, a shift of that account's later balance checkpoints, a
+monthly rollup delta and a bump of the owner's cache version. Outside
+``deferred_bookkeeping()`` the signal handlers apply them immediately. Inside
+it they are summed in the block's ledger (one per database alias) per
+account / rollup key / user and written once, right before the outermost
+block exits, so a job that creates hundreds of rows on one account issues a
+single balance UPDATE.
+
+The sums are written inside the block's own transaction, so balances,
+checkpoints and rollups commit or roll back together with the rows that
+produced them. A block that raises discards its ledger with its rows. Nested
+``deferred_bookkeeping()`` blocks are the bookkeeping savepoints: one that
+raises restores the ledger to what it held when it started, so wrap a step
+that may be rolled back on its own in ``deferred_bookkeeping()`` rather than
+a bare ``atomic()``.
+"""
+import copy
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from accounts.balances import apply_checkpoint_deltas
+from accounts.services import apply_balance_deltas
+from core.cache import bump_user_data_version
+
+from .rollups import add_rollup_delta, apply_rollup_deltas
+
+_local = threading.local()
+
+
+class BookkeepingLedger:
+    """Summed side effects of one ``deferred_bookkeeping()`` block on one database alias."""
+
+    def __init__(self, using):
+        self.using = using
+        self.balance_deltas = defaultdict(Decimal)
+        self.checkpoint_deltas = defaultdict(Decimal)
+        self.rollup_deltas = {}
+        self.user_ids = set()
+        self.balance_update_count = 0
+
+    def record(self, balance_deltas=None, rollup_deltas=None, user_ids=(), checkpoint_deltas=None):
+        for account_id, delta in (balance_deltas or {}).items():
+            self.balance_deltas[account_id] += delta
+        for key, delta in (checkpoint_deltas or {}).items():
+            self.checkpoint_deltas[key] += delta
+        for key, (amount, count) in (rollup_deltas or {}).items():
+            add_rollup_delta(self.rollup_deltas, key, amount, count)
+        self.user_ids.update(user_ids)
+
+    def snapshot(self):
+        return copy.deepcopy((self.balance_deltas, self.checkpoint_deltas, self.rollup_deltas, self.user_ids))
+
+    def restore(self, snapshot):
+        self.balance_deltas, self.checkpoint_deltas, self.rollup_deltas, self.user_ids = snapshot
+
+    def flush(self):
+        self.balance_update_count = sum(1 for delta in self.balance_deltas.values() if delta)
+        _apply(self.balance_deltas, self.rollup_deltas, self.user_ids, self.checkpoint_deltas)
+
+
+def _apply(balance_deltas, rollup_deltas, user_ids, checkpoint_deltas):
+    apply_balance_deltas(balance_deltas)
+    apply_checkpoint_deltas(checkpoint_deltas)
+    apply_rollup_deltas(rollup_deltas)
+    for user_id in user_ids:
+        bump_user_data_version(user_id)
+
+
+def _ledgers():
+    if not hasattr(_local, 'ledgers'):
+        _local.ledgers = {}
+    return _local.ledgers
+
+
+def get_active_ledger(using=DEFAULT_DB_ALIAS):
+    return _ledgers().get(using)
+
+
+@contextmanager
+def deferred_bookkeeping(using=DEFAULT_DB_ALIAS):
+    """
+    Run the block atomically, applying balance/rollup/cache side effects once at the end.
+
+    Nested blocks on the same alias join the outermost one. In-memory
+    ``Account`` instances are stale until they are refreshed after the
+    block.
+    """
+    ledger = get_active_ledger(using)
+    if ledger is not None:
+        snapshot = ledger.snapshot()
+        try:
+            with transaction.atomic(using=using):
+                yield ledger
+        except BaseException:
+            ledger.restore(snapshot)
+            raise
+        return
+
+    ledger = BookkeepingLedger(using)
+    _ledgers()[using] = ledger
+    try:
+        with transaction.atomic(using=using):
+            yield ledger
+            ledger.flush()
+    finally:
+        del _ledgers()[using]
+
+
+@contextmanager
+def bookkeeping_suspended():
+    """
+    Skip bookkeeping for writes that move rows without changing what they
+    represent (archiving); balances and rollups must stay as they are.
+    """
+    previous = getattr(_local, 'suspended', False)
+    _local.suspended = True
+    try:
+        yield
+    finally:
+        _local.suspended = previous
+
+
+def record_bookkeeping(
+    balance_deltas=None, rollup_deltas=None, user_ids=(), checkpoint_deltas=None, using=DEFAULT_DB_ALIAS
+):
+    """Apply side effects now, or add them to the ledger of the deferred block active on ``using``."""
+    if getattr(_local, 'suspended', False):
+        return
+    ledger = get_active_ledger(using)
+    if ledger is None:
+        _apply(balance_deltas or {}, rollup_deltas or {}, user_ids, checkpoint_deltas or {})
+    else:
+        ledger.record(balance_deltas, rollup_deltas, user_ids, checkpoint_deltas)
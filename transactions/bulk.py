@@ -0,0 +1,142 @@
+"""
+Bulk delete, recategorize and move-to-account for selected transactions.
+
+Changes are applied with one set-based statement per action instead of one
+save/delete per row. Bookkeeping runs inside ``deferred_bookkeeping()``, so
+each affected account gets a single balance UPDATE and each affected rollup
+row a single change, whatever the size of the selection:
+
+- recategorize/move use ``QuerySet.update()``, which skips the signal
+  handlers; their balance and rollup deltas are derived from one grouped
+  query over the selection, taken before the update.
+- delete goes through ``QuerySet.delete()``: Django's collector enforces the
+  ``on_delete`` rules of every model that references a transaction (e.g.
+  ``Installment.transaction``) and deletes in batches, while the per-row
+  signal deltas are merged by the deferred block.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, ProtectedError, RestrictedError, Sum
+from django.db.models.functions import TruncMonth
+
+from accounts.balances import checkpoint_key
+
+from .bookkeeping import deferred_bookkeeping, record_bookkeeping
+from .models import Transaction
+from .rollups import add_rollup_delta, rollup_key
+
+DELETE = 'delete'
+RECATEGORIZE = 'recategorize'
+MOVE = 'move'
+ACTION_CHOICES = [
+    (DELETE, 'Excluir'),
+    (RECATEGORIZE, 'Alterar categoria'),
+    (MOVE, 'Mover para conta'),
+]
+
+
+class BulkActionError(Exception):
+    """Raised when a bulk action cannot be applied; nothing is changed in that case."""
+
+
+def _selection_footprint(queryset):
+    """Group the selection by everything that decides its balance and rollup effect."""
+    return queryset.order_by().values(
+        'user_id',
+        'account_id',
+        'category_id',
+        'credit_card_id',
+        'transaction_type',
+        month=TruncMonth('date'),
+    ).annotate(
+        total=Sum('amount'),
+        count=Count('pk'),
+    )
+
+
+def _signed_balance_effect(group):
+    # Same rule as the signal handlers: card purchases do not touch the account.
+    if group['credit_card_id'] is not None:
+        return Decimal('0.00')
+    if group['transaction_type'] == Transaction.INCOME:
+        return group['total']
+    return -group['total']
+
+
+def _reassign(queryset, field, target_id):
+    """Point ``field`` of every selected row at ``target_id``, moving its bookkeeping along."""
+    balance_deltas = defaultdict(Decimal)
+    checkpoint_deltas = defaultdict(Decimal)
+    rollup_deltas = {}
+    user_ids = set()
+
+    # Lock the rows so the footprint still matches them when the UPDATE runs.
+    queryset = Transaction.objects.filter(
+        pk__in=list(queryset.select_for_update().values_list('pk', flat=True))
+    )
+    for group in _selection_footprint(queryset):
+        old_key = rollup_key(
+            group['user_id'],
+            group['month'],
+            group['category_id'],
+            group['account_id'],
+            group['transaction_type'],
+        )
+        new_key = rollup_key(
+            group['user_id'],
+            group['month'],
+            target_id if field == 'category_id' else group['category_id'],
+            target_id if field == 'account_id' else group['account_id'],
+            group['transaction_type'],
+        )
+        add_rollup_delta(rollup_deltas, old_key, -group['total'], -group['count'])
+        add_rollup_delta(rollup_deltas, new_key, group['total'], group['count'])
+
+        if field == 'account_id':
+            effect = _signed_balance_effect(group)
+            balance_deltas[group['account_id']] -= effect
+            balance_deltas[target_id] += effect
+            checkpoint_deltas[checkpoint_key(group['account_id'], group['month'])] -= effect
+            checkpoint_deltas[checkpoint_key(target_id, group['month'])] += effect
+        user_ids.add(group['user_id'])
+
+    updated = queryset.update(**{field: target_id})
+    record_bookkeeping(
+        balance_deltas=balance_deltas,
+        rollup_deltas=rollup_deltas,
+        user_ids=user_ids,
+        checkpoint_deltas=checkpoint_deltas,
+    )
+    return updated
+
+
+def bulk_delete(queryset):
+    """Delete the selected transactions; returns how many were deleted."""
+    try:
+        with deferred_bookkeeping():
+            _, deleted_by_model = queryset.delete()
+    except (ProtectedError, RestrictedError) as exc:
+        raise BulkActionError(
+            'Algumas transações selecionadas estão vinculadas a outros registros '
+            'e não podem ser excluídas.'
+        ) from exc
+    return deleted_by_model.get(Transaction._meta.label, 0)
+
+
+def bulk_recategorize(queryset, category):
+    """Move the selected transactions to ``category``; returns how many changed."""
+    with deferred_bookkeeping():
+        if queryset.exclude(transaction_type=category.category_type).exists():
+            raise BulkActionError(
+                'O tipo da categoria deve corresponder ao tipo de todas as transações selecionadas.'
+            )
+        return _reassign(queryset.exclude(category=category), 'category_id', category.pk)
+
+
+def bulk_move(queryset, account):
+    """Move the selected transactions to ``account``; returns how many changed."""
+    with deferred_bookkeeping():
+        if queryset.exclude(user_id=account.user_id).exists():
+            raise BulkActionError('Conta inválida para as transações selecionadas.')
+        return _reassign(queryset.exclude(account=account), 'account_id', account.pk)
@@ -0,0 +1,150 @@
+"""
+Streaming export of transactions as CSV or JSON lines.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` and encoded
+one at a time, so memory use does not depend on the size of the history.
+Archived rows of the filtered period, decoded by the view, are merged into
+the stream in the same order.
+The CSV columns use the same headers accepted by the statement importer
+(see transactions/importers.py), so an export can be imported back.
+"""
+import csv
+import heapq
+import json
+import zlib
+
+try:
+    import zstandard
+    _ZSTD_AVAILABLE = True
+except ImportError:
+    _ZSTD_AVAILABLE = False
+
+CSV = 'csv'
+JSONL = 'jsonl'
+FORMATS = {
+    CSV: ('text/csv; charset=utf-8', 'csv'),
+    JSONL: ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+COMPRESSIONS = {
+    GZIP: ('application/gzip', 'gz'),
+    ZSTD: ('application/zstd', 'zst'),
+}
+
+EXPORT_CHUNK_SIZE = 2000
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+EXPORT_FIELDS = (
+    'date',
+    'transaction_type',
+    'amount',
+    'description',
+    'account__name',
+    'category__name',
+    'credit_card__name',
+)
+CSV_HEADERS = ('data', 'tipo', 'valor', 'descricao', 'conta', 'categoria', 'cartao')
+JSON_KEYS = ('date', 'type', 'amount', 'description', 'account', 'category', 'credit_card')
+
+
+def zstd_available():
+    return _ZSTD_AVAILABLE
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _archived_export_row(transaction):
+    return (
+        transaction.created_at,
+        transaction.pk,
+        transaction.date,
+        transaction.transaction_type,
+        transaction.amount,
+        transaction.description,
+        transaction.account.name,
+        transaction.category.name if transaction.category else None,
+        transaction.credit_card.name if transaction.credit_card_id and transaction.credit_card else None,
+    )
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE, archived=()):
+    """
+    ``EXPORT_FIELDS`` tuples in the list order. ``archived`` (decoded
+    archive rows, already in that order) are merged in as they come.
+    """
+    rows = queryset.order_by('-date', '-created_at', '-pk').values_list(
+        'created_at', 'pk', *EXPORT_FIELDS
+    ).iterator(chunk_size=chunk_size)
+    if archived:
+        rows = heapq.merge(
+            rows,
+            map(_archived_export_row, archived),
+            key=lambda row: (row[2], row[0], row[1]),
+            reverse=True,
+        )
+    for row in rows:
+        yield row[2:]
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADERS)
+    for row_date, *values in rows:
+        yield writer.writerow([row_date.isoformat(), *('' if value is None else value for value in values)])
+
+
+def iter_jsonl(rows):
+    for row_date, transaction_type, amount, *values in rows:
+        record = dict(zip(JSON_KEYS, (row_date.isoformat(), transaction_type, str(amount), *values)))
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def iter_encoded(lines, buffer_size=OUTPUT_BUFFER_SIZE):
+    """Encode text lines to UTF-8 and coalesce them into ~``buffer_size`` chunks."""
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_zstd(chunks):
+    chunker = zstandard.ZstdCompressor().chunker(chunk_size=OUTPUT_BUFFER_SIZE)
+    for chunk in chunks:
+        yield from chunker.compress(chunk)
+    yield from chunker.finish()
+
+
+def stream_export(queryset, export_format=CSV, compression=None, chunk_size=EXPORT_CHUNK_SIZE, archived=()):
+    """Return an iterator of bytes for ``queryset`` (plus ``archived`` rows) in the requested format."""
+    rows = iter_export_rows(queryset, chunk_size=chunk_size, archived=archived)
+    lines = iter_jsonl(rows) if export_format == JSONL else iter_csv(rows)
+    chunks = iter_encoded(lines)
+    if compression == GZIP:
+        return iter_gzip(chunks)
+    if compression == ZSTD:
+        return iter_zstd(chunks)
+    return chunks
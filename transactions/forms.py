@@ -6,8 +6,11 @@ from django.core.exceptions import ValidationError
 from django.db.models import Q
 
 from accounts.services import get_default_account
-from accounts.models import CreditCard
+from accounts.models import Account, CreditCard
+from categories.models import Category
 
+from .bulk import ACTION_CHOICES, MOVE, RECATEGORIZE
+from .importers import FORMAT_CHOICES
 from .models import Transaction
 
 
@@ -163,3 +166,101 @@ class TransactionForm(forms.ModelForm):
             })
 
         return cleaned_data
+
+
+class TransactionImportForm(forms.Form):
+    """Upload form for CSV/OFX bank statements."""
+
+    AUTO_FORMAT = ''
+
+    statement = forms.FileField(
+        label='Arquivo do extrato',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'mt-1 block w-full text-sm',
+            'accept': '.csv,.ofx,.qfx',
+        }),
+    )
+    account = forms.ModelChoiceField(
+        label='Conta',
+        queryset=Account.objects.none(),
+        widget=forms.Select(attrs={
+            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 sm:text-sm',
+        }),
+    )
+    file_format = forms.ChoiceField(
+        label='Formato',
+        required=False,
+        choices=[(AUTO_FORMAT, 'Detectar pela extensão')] + FORMAT_CHOICES,
+        widget=forms.Select(attrs={
+            'class': 'mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 sm:text-sm',
+        }),
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+
+        if self.user:
+            self.fields['account'].queryset = Account.objects.filter(
+                user=self.user,
+                is_active=True
+            ).order_by('name')
+            if not self.is_bound:
+                self.fields['account'].initial = get_default_account(self.user)
+
+
+class TransactionBulkActionForm(forms.Form):
+    """Multi-select action on the transaction list: delete, recategorize or move."""
+
+    MAX_SELECTION = 1000
+
+    action = forms.ChoiceField(label='Ação', choices=ACTION_CHOICES)
+    transactions = forms.ModelMultipleChoiceField(
+        label='Transações',
+        queryset=Transaction.objects.none(),
+        error_messages={'required': 'Selecione ao menos uma transação.'},
+    )
+    category = forms.ModelChoiceField(
+        label='Categoria',
+        queryset=Category.objects.none(),
+        required=False,
+    )
+    account = forms.ModelChoiceField(
+        label='Conta',
+        queryset=Account.objects.none(),
+        required=False,
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+
+        if self.user:
+            self.fields['transactions'].queryset = Transaction.objects.filter(user=self.user)
+            self.fields['category'].queryset = Category.objects.filter(
+                Q(user=self.user) | Q(is_default=True),
+                is_active=True,
+            )
+            self.fields['account'].queryset = Account.objects.filter(
+                user=self.user,
+                is_active=True,
+            )
+
+    def clean_transactions(self):
+        transactions = self.cleaned_data.get('transactions')
+        if transactions is not None and len(self.data.getlist('transactions')) > self.MAX_SELECTION:
+            raise ValidationError(
+                f'Selecione no máximo {self.MAX_SELECTION} transações por vez.'
+            )
+        return transactions
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+
+        if action == RECATEGORIZE and not cleaned_data.get('category'):
+            raise ValidationError({'category': 'Informe a nova categoria.'})
+        if action == MOVE and not cleaned_data.get('account'):
+            raise ValidationError({'account': 'Informe a conta de destino.'})
+
+        return cleaned_data
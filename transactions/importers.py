@@ -0,0 +1,358 @@
+"""
+Bank statement import (CSV and OFX).
+
+Files are parsed as a stream of lines, validated against the user's
+categories held in memory, and written with ``bulk_create`` in chunks. The
+per-row signal handlers are bypassed on purpose: their bookkeeping (account
+balance, monthly rollups, cache version) is recorded once per import through
+``deferred_bookkeeping`` and applied inside the same database transaction as
+the inserts.
+"""
+import codecs
+import csv
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+
+from accounts.balances import checkpoint_key
+from categories.models import Category
+
+from .bookkeeping import deferred_bookkeeping, record_bookkeeping
+from .models import Transaction
+from .rollups import add_rollup_delta, transaction_rollup_key
+
+CSV = 'csv'
+OFX = 'ofx'
+FORMAT_CHOICES = [
+    (CSV, 'CSV'),
+    (OFX, 'OFX'),
+]
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_ERRORS = 50
+MAX_AMOUNT = Decimal('99999999.99')
+DESCRIPTION_MAX_LENGTH = 500
+FALLBACK_CATEGORY_NAME = 'Outros'
+
+CSV_COLUMN_ALIASES = {
+    'date': 'date',
+    'data': 'date',
+    'amount': 'amount',
+    'valor': 'amount',
+    'description': 'description',
+    'descricao': 'description',
+    'historico': 'description',
+    'type': 'type',
+    'tipo': 'type',
+    'category': 'category',
+    'categoria': 'category',
+}
+
+TYPE_ALIASES = {
+    'income': Transaction.INCOME,
+    'receita': Transaction.INCOME,
+    'credito': Transaction.INCOME,
+    'credit': Transaction.INCOME,
+    'expense': Transaction.EXPENSE,
+    'despesa': Transaction.EXPENSE,
+    'debito': Transaction.EXPENSE,
+    'debit': Transaction.EXPENSE,
+}
+
+OFX_TAG_PATTERN = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+# Plain digits, or 1-3 digits followed by groups of three split by '.' or ','.
+AMOUNT_INTEGER_PATTERN = re.compile(r'\d+|\d{1,3}(?:\.\d{3})+|\d{1,3}(?:,\d{3})+')
+AMOUNT_FRACTION_PATTERN = re.compile(r'\d{0,2}')
+
+
+class InvalidRow(ValueError):
+    """A statement line that cannot be turned into a transaction."""
+
+    def __init__(self, line_number, message):
+        super().__init__(f'Linha {line_number}: {message}')
+        self.line_number = line_number
+
+
+class TransactionImportError(Exception):
+    """Raised when an import is rejected; nothing is written in that case."""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+@dataclass
+class ImportRow:
+    line_number: int
+    date: date
+    amount: Decimal
+    transaction_type: str
+    description: str = ''
+    category: str = ''
+
+
+@dataclass
+class ImportResult:
+    created_count: int = 0
+    income_total: Decimal = Decimal('0.00')
+    expense_total: Decimal = Decimal('0.00')
+    errors: list = field(default_factory=list)
+
+    @property
+    def balance_delta(self):
+        return self.income_total - self.expense_total
+
+
+def _normalize_key(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return value.strip().lower()
+
+
+def decode_lines(byte_lines, encoding='utf-8-sig'):
+    """Lazily decode an iterable of byte lines (file object, upload) to text."""
+    return codecs.iterdecode(byte_lines, encoding, errors='replace')
+
+
+def detect_format(filename):
+    return OFX if filename.lower().endswith(('.ofx', '.qfx')) else CSV
+
+
+def parse_amount(value):
+    """
+    Parse '1.234,56', '1,234.56', '-50.00', '1.234' or 'R$ 10,00' into a
+    signed Decimal.
+
+    The last of ``.`` and ``,`` is the decimal separator, unless it repeats
+    ('1.234.567') or is a lone ``.`` followed by exactly three digits
+    ('1.234'): those are thousands separators. Malformed grouping and more
+    than two decimals ('1,234', '10.5678') are rejected instead of rounded.
+    """
+    cleaned = (value or '').replace('R$', '').replace(' ', '').strip()
+    sign = ''
+    if cleaned[:1] in ('+', '-'):
+        sign, cleaned = cleaned[0], cleaned[1:]
+
+    integer, fraction = cleaned, ''
+    position = max(cleaned.rfind('.'), cleaned.rfind(','))
+    if position >= 0:
+        separator = cleaned[position]
+        after = cleaned[position + 1:]
+        is_grouping = cleaned.count(separator) > 1 or (
+            separator == '.' and ',' not in cleaned and len(after) == 3
+        )
+        if not is_grouping:
+            integer, fraction = cleaned[:position], after
+
+    if not AMOUNT_INTEGER_PATTERN.fullmatch(integer) or not AMOUNT_FRACTION_PATTERN.fullmatch(fraction):
+        raise ValueError(f'valor inválido "{value}"')
+    digits = integer.replace('.', '').replace(',', '')
+    return Decimal(f'{sign}{digits}.{fraction}' if fraction else f'{sign}{digits}')
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for pattern in ('%Y-%m-%d', '%d/%m/%Y', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, pattern).date()
+        except ValueError:
+            continue
+    raise ValueError(f'data inválida "{value}"')
+
+
+def parse_csv(lines):
+    """
+    Yield ``(line_number, record)`` for each data row of a CSV statement.
+
+    Accepts ``,`` or ``;`` separators and Portuguese or English headers
+    (data/date, valor/amount, descricao/description, tipo/type,
+    categoria/category).
+    """
+    lines = iter(lines)
+    header = next(lines, '')
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    columns = [
+        CSV_COLUMN_ALIASES.get(_normalize_key(name), _normalize_key(name))
+        for name in next(csv.reader([header], delimiter=delimiter), [])
+    ]
+    for line_number, values in enumerate(csv.reader(lines, delimiter=delimiter), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        yield line_number, dict(zip(columns, values))
+
+
+def parse_ofx(lines):
+    """
+    Yield ``(line_number, record)`` for each ``<STMTTRN>`` block of an OFX file.
+
+    Works with both the SGML (unclosed tags) and XML flavours, one tag per
+    line or several on the same line.
+    """
+    record = None
+    start_line = 0
+    for line_number, line in enumerate(lines, start=1):
+        for closing, tag, value in OFX_TAG_PATTERN.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and record is not None:
+                    yield start_line, record
+                    record = None
+                elif not closing:
+                    record = {}
+                    start_line = line_number
+            elif record is not None and not closing:
+                value = value.strip()
+                if tag == 'DTPOSTED':
+                    record['date'] = value[:8]
+                elif tag == 'TRNAMT':
+                    record['amount'] = value
+                elif tag in ('MEMO', 'NAME') and value:
+                    record['description'] = (
+                        f"{record['description']} {value}" if record.get('description') else value
+                    )
+
+
+def normalize_record(line_number, record):
+    """Validate a raw parsed record and turn it into an ``ImportRow``."""
+    try:
+        row_date = parse_date(record.get('date'))
+        amount = parse_amount(record.get('amount'))
+    except ValueError as exc:
+        raise InvalidRow(line_number, str(exc)) from exc
+
+    type_value = _normalize_key(record.get('type'))
+    if type_value:
+        transaction_type = TYPE_ALIASES.get(type_value)
+        if transaction_type is None:
+            raise InvalidRow(line_number, f'tipo inválido "{record.get("type")}"')
+    else:
+        transaction_type = Transaction.EXPENSE if amount < 0 else Transaction.INCOME
+
+    amount = abs(amount).quantize(Decimal('0.01'))
+    if amount <= 0 or amount > MAX_AMOUNT:
+        raise InvalidRow(line_number, 'valor fora do intervalo permitido')
+
+    return ImportRow(
+        line_number=line_number,
+        date=row_date,
+        amount=amount,
+        transaction_type=transaction_type,
+        description=(record.get('description') or '').strip()[:DESCRIPTION_MAX_LENGTH],
+        category=(record.get('category') or '').strip(),
+    )
+
+
+class CategoryResolver:
+    """In-memory lookup of the user's and default categories by type and name."""
+
+    def __init__(self, user):
+        self.by_name = {}
+        self.first_by_type = {}
+        categories = Category.objects.filter(
+            Q(user=user) | Q(is_default=True),
+            is_active=True,
+        ).order_by('name')
+        for category in categories:
+            # User categories win over defaults with the same name.
+            key = (category.category_type, _normalize_key(category.name))
+            if category.user_id is not None or key not in self.by_name:
+                self.by_name[key] = category
+            self.first_by_type.setdefault(category.category_type, category)
+
+    def resolve(self, transaction_type, name):
+        """Match by name, else 'Outros', else the first category of the type."""
+        category = self.by_name.get((transaction_type, _normalize_key(name)))
+        if category is None:
+            category = self.by_name.get(
+                (transaction_type, _normalize_key(FALLBACK_CATEGORY_NAME))
+            )
+        if category is None:
+            category = self.first_by_type.get(transaction_type)
+        return category
+
+
+def import_transactions(user, account, records, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Insert parsed ``records`` as transactions of ``account``.
+
+    Either every row is imported or none is: invalid rows are collected
+    (up to ``MAX_ERRORS``) and raise ``TransactionImportError`` after the
+    whole file has been checked, rolling back the inserts.
+    """
+    if account.user_id != user.pk:
+        raise TransactionImportError(['Conta inválida para este usuário.'])
+
+    resolver = CategoryResolver(user)
+    result = ImportResult()
+    rollup_deltas = {}
+    checkpoint_deltas = defaultdict(Decimal)
+    batch = []
+
+    def flush():
+        Transaction.objects.bulk_create(batch)
+        result.created_count += len(batch)
+        batch.clear()
+
+    with deferred_bookkeeping():
+        for line_number, record in records:
+            try:
+                row = normalize_record(line_number, record)
+                category = resolver.resolve(row.transaction_type, row.category)
+                if category is None:
+                    raise InvalidRow(line_number, 'nenhuma categoria disponível para o tipo')
+            except InvalidRow as exc:
+                if len(result.errors) < MAX_ERRORS:
+                    result.errors.append(str(exc))
+                continue
+
+            if result.errors:
+                # Keep validating, but stop writing once the import is doomed.
+                continue
+
+            instance = Transaction(
+                user=user,
+                account=account,
+                category=category,
+                transaction_type=row.transaction_type,
+                amount=row.amount,
+                date=row.date,
+                description=row.description,
+            )
+            if row.transaction_type == Transaction.INCOME:
+                result.income_total += row.amount
+                checkpoint_deltas[checkpoint_key(account.pk, row.date)] += row.amount
+            else:
+                result.expense_total += row.amount
+                checkpoint_deltas[checkpoint_key(account.pk, row.date)] -= row.amount
+            add_rollup_delta(rollup_deltas, transaction_rollup_key(instance), row.amount, 1)
+
+            batch.append(instance)
+            if len(batch) >= chunk_size:
+                flush()
+
+        if result.errors:
+            raise TransactionImportError(result.errors)
+        if batch:
+            flush()
+
+        record_bookkeeping(
+            balance_deltas={account.pk: result.balance_delta},
+            rollup_deltas=rollup_deltas,
+            user_ids=[user.pk],
+            checkpoint_deltas=checkpoint_deltas,
+        )
+
+    return result
+
+
+def import_statement(user, account, byte_lines, file_format, encoding='utf-8-sig',
+                     chunk_size=IMPORT_CHUNK_SIZE):
+    """Parse a CSV or OFX statement from raw byte lines and import it."""
+    parser = parse_ofx if file_format == OFX else parse_csv
+    records = parser(decode_lines(byte_lines, encoding))
+    return import_transactions(user, account, records, chunk_size=chunk_size)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.archive import archive_transactions, get_archive_horizon
+
+
+class Command(BaseCommand):
+    help = (
+        'Move transações anteriores ao horizonte de arquivamento para o '
+        'arquivo compactado, mantendo consolidados e saldos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            help='Meses mantidos na tabela principal (padrão: TRANSACTION_ARCHIVE_MONTHS).',
+        )
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a arquivar (pode ser repetido).',
+        )
+
+    def handle(self, *args, **options):
+        months = options.get('months')
+        if months is not None and months < 1:
+            raise CommandError('--months deve ser maior que zero.')
+
+        before = get_archive_horizon(months=months)
+        result = archive_transactions(before=before, user_ids=options.get('user_ids'))
+        self.stdout.write(
+            f'{result.transaction_count} transações anteriores a {before:%m/%Y} '
+            f'arquivadas em {result.archive_count} blocos'
+        )
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Account
+from transactions.importers import (
+    CSV,
+    IMPORT_CHUNK_SIZE,
+    OFX,
+    TransactionImportError,
+    detect_format,
+    import_statement,
+)
+
+
+class Command(BaseCommand):
+    help = 'Importa transações de um extrato bancário em CSV ou OFX.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Caminho do arquivo de extrato.')
+        parser.add_argument('--user', required=True, help='E-mail do usuário.')
+        parser.add_argument('--account', type=int, required=True, help='ID da conta de destino.')
+        parser.add_argument(
+            '--format',
+            choices=[CSV, OFX],
+            help='Formato do arquivo (detectado pela extensão se omitido).',
+        )
+        parser.add_argument('--encoding', default='utf-8-sig', help='Codificação do arquivo.')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Quantidade de linhas por INSERT em lote.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f'Usuário "{options["user"]}" não encontrado.') from exc
+
+        try:
+            account = Account.objects.get(pk=options['account'], user=user)
+        except Account.DoesNotExist as exc:
+            raise CommandError('Conta não encontrada para este usuário.') from exc
+
+        file_format = options.get('format') or detect_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as statement:
+                result = import_statement(
+                    user,
+                    account,
+                    statement,
+                    file_format,
+                    encoding=options['encoding'],
+                    chunk_size=options['chunk_size'],
+                )
+        except OSError as exc:
+            raise CommandError(f'Não foi possível ler o arquivo: {exc}') from exc
+        except TransactionImportError as exc:
+            for error in exc.errors:
+                self.stderr.write(error)
+            raise CommandError('Importação cancelada; nenhuma transação foi criada.') from exc
+
+        self.stdout.write(f'{result.created_count} transações importadas')
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.partitioning import (
+    PartitioningError,
+    convert_to_partitioned,
+    convert_to_unpartitioned,
+    ensure_partitions,
+    is_partitioned,
+    supports_partitioning,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria antecipadamente as partições anuais da tabela de transações '
+        '(somente PostgreSQL). Com --convert, particiona uma tabela existente; '
+        'com --revert, volta a uma tabela comum.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years-ahead',
+            type=int,
+            default=1,
+            help='Quantidade de anos futuros com partição criada (padrão: 1).',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Converte a tabela atual em tabela particionada por ano.',
+        )
+        parser.add_argument(
+            '--revert',
+            action='store_true',
+            help='Converte a tabela particionada de volta em tabela comum.',
+        )
+
+    def handle(self, *args, **options):
+        years_ahead = options['years_ahead']
+        if years_ahead < 0:
+            raise CommandError('--years-ahead não pode ser negativo.')
+
+        if options['convert'] and options['revert']:
+            raise CommandError('Use --convert ou --revert, não ambos.')
+
+        if not supports_partitioning():
+            if options['convert'] or options['revert']:
+                raise CommandError('O particionamento só é suportado no PostgreSQL.')
+            self.stdout.write('Banco sem suporte a particionamento; nada a fazer.')
+            return
+
+        if options['convert']:
+            try:
+                result = convert_to_partitioned(years_ahead=years_ahead)
+            except PartitioningError as exc:
+                raise CommandError(str(exc)) from exc
+            for table, name, definition in result.dropped_foreign_keys:
+                self.stdout.write(f'Chave estrangeira removida: {table}.{name} ({definition})')
+            self.stdout.write(f'Tabela particionada; {len(result.years)} partições anuais criadas')
+            return
+
+        if options['revert']:
+            try:
+                convert_to_unpartitioned()
+            except PartitioningError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write('Tabela convertida de volta em tabela comum; chaves estrangeiras recriadas')
+            return
+
+        if not is_partitioned():
+            self.stdout.write('A tabela de transações não está particionada; use --convert.')
+            return
+
+        created = ensure_partitions(years_ahead=years_ahead)
+        self.stdout.write(f'{len(created)} partições anuais criadas')
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.rollups import rebuild_monthly_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os consolidados mensais de transações a partir dos lançamentos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='ID do usuário a recalcular (pode ser repetido).',
+        )
+        parser.add_argument(
+            '--month',
+            type=str,
+            action='append',
+            dest='months',
+            help='Mês a recalcular no formato YYYY-MM (pode ser repetido).',
+        )
+
+    def handle(self, *args, **options):
+        months = options.get('months')
+        if months:
+            months = [self.parse_month(month) for month in months]
+
+        written = rebuild_monthly_rollups(
+            user_ids=options.get('user_ids'),
+            months=months,
+        )
+        self.stdout.write(f'{written} consolidados mensais recalculados')
+
+    def parse_month(self, month_option):
+        try:
+            return date.fromisoformat(f'{month_option}-01')
+        except ValueError as exc:
+            raise CommandError('Informe um mês válido no formato YYYY-MM.') from exc
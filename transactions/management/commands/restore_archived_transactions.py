@@ -0,0 +1,44 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.archive import ArchiveRestoreError, restore_archived
+
+
+def parse_month(value):
+    try:
+        return date.fromisoformat(f'{value}-01')
+    except ValueError as exc:
+        raise CommandError(f'Mês inválido: {value} (use YYYY-MM).') from exc
+
+
+class Command(BaseCommand):
+    help = (
+        'Devolve transações arquivadas de um usuário para a tabela principal. '
+        'A listagem e a exportação já leem o arquivo sem restaurá-lo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, required=True, help='ID do usuário.')
+        parser.add_argument('--from', dest='month_from', help='Primeiro mês (YYYY-MM).')
+        parser.add_argument('--to', dest='month_to', help='Último mês (YYYY-MM).')
+        parser.add_argument('--account', type=int, help='Restringe a uma conta.')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(pk=options['user']).first()
+        if user is None:
+            raise CommandError(f'Usuário {options["user"]} não encontrado.')
+
+        date_from = parse_month(options['month_from']) if options.get('month_from') else None
+        date_to = parse_month(options['month_to']) if options.get('month_to') else None
+        try:
+            restored = restore_archived(
+                user,
+                date_from=date_from,
+                date_to=date_to,
+                account_id=options.get('account'),
+            )
+        except ArchiveRestoreError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f'{restored} transações restauradas')
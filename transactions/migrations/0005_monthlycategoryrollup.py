@@ -0,0 +1,72 @@
+# Generated by Django 5.2.10 on 2026-10-18 02:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_monthly_rollups(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyCategoryRollup = apps.get_model('transactions', 'MonthlyCategoryRollup')
+
+    rows = Transaction.objects.annotate(
+        period=TruncMonth('date'),
+    ).values(
+        'user_id', 'period', 'category_id', 'account_id', 'transaction_type',
+    ).annotate(
+        row_total=Sum('amount'),
+        row_count=Count('id'),
+    ).order_by()
+
+    MonthlyCategoryRollup.objects.bulk_create(
+        (
+            MonthlyCategoryRollup(
+                user_id=row['user_id'],
+                month=row['period'],
+                category_id=row['category_id'],
+                account_id=row['account_id'],
+                transaction_type=row['transaction_type'],
+                total=row['row_total'],
+                count=row['row_count'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_creditcard_cardbill'),
+        ('categories', '0003_category_categories__user_id_15497c_idx_and_more'),
+        ('transactions', '0004_transaction_credit_card'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês de Referência')),
+                ('transaction_type', models.CharField(choices=[('income', 'Receita'), ('expense', 'Despesa')], max_length=10, verbose_name='Tipo de Transação')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Data de Atualização')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='accounts.account', verbose_name='Conta')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='categories.category', verbose_name='Categoria')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Consolidado Mensal',
+                'verbose_name_plural': 'Consolidados Mensais',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['user', 'month'], name='transaction_user_id_6bc7ee_idx')],
+                'unique_together': {('user', 'month', 'category', 'account', 'transaction_type')},
+            },
+        ),
+        migrations.RunPython(backfill_monthly_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_creditcard_cardbill'),
+        ('categories', '0003_category_categories__user_id_15497c_idx_and_more'),
+        ('transactions', '0005_monthlycategoryrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_98a6b3_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'transaction_type', 'date'], include=('amount',), name='transaction_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('transaction_type', 'expense')), fields=['category', 'date'], include=('amount',), name='transaction_cat_expense_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('credit_card__isnull', False)), fields=['credit_card', 'date'], include=('amount',), name='transaction_card_date_idx'),
+        ),
+    ]
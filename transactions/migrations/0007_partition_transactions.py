@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.backends.utils import truncate_name
+
+# Everything below is a frozen copy of the DDL in transactions/partitioning.py
+# as of this migration, so later changes to that module cannot alter what
+# this migration does. ``build_partition_statements`` and
+# ``build_unpartition_statements`` are pure and asserted by the tests.
+
+TABLE = 'transactions_transaction'
+OLD_TABLE = 'transactions_transaction_unpartitioned'
+DEFAULT_PARTITION = 'transactions_transaction_default'
+# Foreign keys from the models that point at transactions, recreated on revert.
+INBOUND_FOREIGN_KEYS = [('installments_installment', 'transaction_id')]
+
+
+def create_index_sql(quote, table, index):
+    name, method, unique, key_count, columns, predicate = index
+    sql = f'CREATE {"UNIQUE " if unique else ""}INDEX {quote(name)} ON {table} USING {method} ({", ".join(columns[:key_count])})'
+    if columns[key_count:]:
+        sql += f' INCLUDE ({", ".join(columns[key_count:])})'
+    if predicate:
+        sql += f' WHERE {predicate}'
+    return sql
+
+
+def build_rebuild_statements(quote, create_table_sql, indexes, foreign_keys, primary_key, after_create=()):
+    parent, old = quote(TABLE), quote(OLD_TABLE)
+    statements = [f'ALTER TABLE {parent} RENAME TO {old}']
+    statements += [f'DROP INDEX {quote(index[0])}' for index in indexes]
+    if primary_key:
+        statements.append(f'ALTER TABLE {old} DROP CONSTRAINT {quote(primary_key)}')
+    statements += [sql.format(parent=parent, old=old) for sql in (create_table_sql, *after_create)]
+    statements += [
+        f'INSERT INTO {parent} SELECT * FROM {old}',
+        f"SELECT setval(pg_get_serial_sequence('{parent}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {parent}",
+        f'DROP TABLE {old}',
+    ]
+    statements += [create_index_sql(quote, parent, index) for index in indexes]
+    statements += [f'ALTER TABLE {parent} ADD CONSTRAINT {quote(name)} {definition}' for name, definition in foreign_keys]
+    return statements
+
+
+def build_partition_statements(quote, years, indexes, foreign_keys, primary_key, inbound_foreign_keys):
+    return [
+        *(f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}' for table, name in inbound_foreign_keys),
+        *build_rebuild_statements(
+            quote,
+            'CREATE TABLE {parent} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY '
+            'INCLUDING CONSTRAINTS, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)',
+            indexes,
+            foreign_keys,
+            primary_key,
+            after_create=[
+                f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {{parent}} DEFAULT',
+                *(
+                    f'CREATE TABLE {quote(f"{TABLE}_y{year}")} PARTITION OF {{parent}} '
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                    for year in years
+                ),
+            ],
+        ),
+    ]
+
+
+def build_unpartition_statements(quote, indexes, foreign_keys, primary_key, max_name_length):
+    statements = build_rebuild_statements(
+        quote,
+        'CREATE TABLE {parent} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY '
+        'INCLUDING CONSTRAINTS, PRIMARY KEY (id))',
+        indexes,
+        foreign_keys,
+        primary_key,
+    )
+    for table, column in INBOUND_FOREIGN_KEYS:
+        name = truncate_name(f'{table}_{column}_fk_{TABLE}_id', max_name_length)
+        statements.append(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} '
+            f'FOREIGN KEY ({quote(column)}) REFERENCES {quote(TABLE)} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+    return statements
+
+
+def read_catalog(cursor):
+    """Secondary indexes, outbound foreign keys and primary key name of the table."""
+    cursor.execute(
+        'SELECT index_class.relname, access_method.amname, ix.indisunique, ix.indnkeyatts, '
+        'ARRAY(SELECT pg_get_indexdef(ix.indexrelid, k, true) '
+        '      FROM generate_series(1, ix.indnatts) AS k ORDER BY k), '
+        'pg_get_expr(ix.indpred, ix.indrelid, true) '
+        'FROM pg_index ix '
+        'JOIN pg_class index_class ON index_class.oid = ix.indexrelid '
+        'JOIN pg_am access_method ON access_method.oid = index_class.relam '
+        'WHERE ix.indrelid = to_regclass(%s) AND NOT ix.indisprimary '
+        'ORDER BY index_class.relname',
+        [TABLE],
+    )
+    indexes = [tuple(row) for row in cursor.fetchall()]
+    cursor.execute(
+        'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+        'WHERE conrelid = to_regclass(%s) AND contype = %s ORDER BY conname',
+        [TABLE, 'f'],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute(
+        'SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = %s',
+        [TABLE, 'p'],
+    )
+    primary_key = cursor.fetchone()
+    return indexes, foreign_keys, primary_key[0] if primary_key else None
+
+
+def is_partitioned(cursor):
+    cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE])
+    return cursor.fetchone() is not None
+
+
+def partition_transactions(apps, schema_editor):
+    # Opt-in and PostgreSQL only; everywhere else the table stays as it is.
+    # Existing databases can also be converted later with
+    # ``python manage.py partition_transactions --convert``.
+    connection = schema_editor.connection
+    if not settings.TRANSACTIONS_PARTITIONED or connection.vendor != 'postgresql':
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            return
+        cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'SELECT EXTRACT(YEAR FROM MIN(date))::int, EXTRACT(YEAR FROM now())::int FROM {quote(TABLE)}')
+        first_year, current_year = cursor.fetchone()
+        years = range(min(first_year or current_year, current_year), current_year + 2)
+        cursor.execute(
+            'SELECT conrelid::regclass::text, conname FROM pg_constraint '
+            'WHERE confrelid = to_regclass(%s) AND contype = %s ORDER BY conname',
+            [TABLE, 'f'],
+        )
+        inbound_foreign_keys = cursor.fetchall()
+        for statement in build_partition_statements(quote, years, *read_catalog(cursor), inbound_foreign_keys):
+            cursor.execute(statement)
+
+
+def unpartition_transactions(apps, schema_editor):
+    # Rebuilds a plain table and recreates the foreign keys pointing at it
+    # (installments), whatever TRANSACTIONS_PARTITIONED says now.
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return
+        cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+        for statement in build_unpartition_statements(quote, *read_catalog(cursor), connection.ops.max_name_length()):
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('installments', '0001_initial'),
+        ('transactions', '0006_transaction_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_transactions, unpartition_transactions),
+    ]
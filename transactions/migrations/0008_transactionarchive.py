@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_creditcard_cardbill'),
+        ('transactions', '0007_partition_transactions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mês de Referência')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Quantidade')),
+                ('balance_effect', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Efeito no Saldo')),
+                ('codec', models.CharField(choices=[('zstd', 'zstd'), ('zlib', 'zlib')], max_length=10, verbose_name='Compressão')),
+                ('payload', models.BinaryField(verbose_name='Dados')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Data de Atualização')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transaction_archives', to='accounts.account', verbose_name='Conta')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transaction_archives', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Arquivo de Transações',
+                'verbose_name_plural': 'Arquivos de Transações',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['user', 'month'], name='transaction_user_id_8ae09e_idx')],
+                'unique_together': {('account', 'month')},
+            },
+        ),
+    ]
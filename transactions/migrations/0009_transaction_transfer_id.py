@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0008_transactionarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='transfer_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name='Transferência'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0003_category_categories__user_id_15497c_idx_and_more'),
+        ('transactions', '0010_transaction_query_indexes_key_columns'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='monthlycategoryrollup',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='monthly_rollups', to='categories.category', verbose_name='Categoria'),
+        ),
+    ]
@@ -65,6 +65,14 @@ class Transaction(models.Model):
         blank=True,
         validators=[MaxLengthValidator(500)]
     )
+    # Shared by the two legs of a transfer between accounts.
+    transfer_id = models.UUIDField(
+        'Transferência',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
 
     # Timestamp fields last
     created_at = models.DateTimeField('Data de Criação', auto_now_add=True)
@@ -78,8 +86,173 @@ class Transaction(models.Model):
             models.Index(fields=['date']),
             models.Index(fields=['transaction_type']),
             models.Index(fields=['user', 'date']),
-            models.Index(fields=['user', 'transaction_type']),
         ]
+        # transaction_user_type_date_idx (dashboard, reports, AI tools),
+        # transaction_cat_expense_idx (budget spend) and
+        # transaction_card_date_idx (card bills) carry INCLUDE (amount) on
+        # PostgreSQL, which Django can only declare for backends with covering
+        # indexes. They are owned by migration 0010 as raw SQL and are not
+        # part of the model state.
 
     def __str__(self):
         return f'{self.get_transaction_type_display()} - R$ {self.amount}'
+
+    # Fields whose original values the balance/rollup signals need on edit.
+    TRACKED_FIELDS = (
+        'user_id',
+        'account_id',
+        'category_id',
+        'credit_card_id',
+        'transaction_type',
+        'amount',
+        'date',
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_values()
+        return instance
+
+    def remember_tracked_values(self):
+        """Snapshot the tracked fields as persisted (called on load and after save)."""
+        loaded = self.__dict__
+        if all(name in loaded for name in self.TRACKED_FIELDS):
+            self._tracked_values = {name: loaded[name] for name in self.TRACKED_FIELDS}
+        else:
+            # Deferred fields: let the signals fall back to a SELECT.
+            self._tracked_values = None
+
+    def get_tracked_values(self):
+        """Original tracked values, or None when they were not captured."""
+        return getattr(self, '_tracked_values', None)
+
+
+class MonthlyCategoryRollup(models.Model):
+    """
+    Month-granular totals per user, category, account and transaction type.
+
+    Kept up to date incrementally by the transaction signals (see
+    transactions/rollups.py) so month-level reports can read a handful of
+    rows instead of scanning the full history. Rebuild from scratch with
+    ``python manage.py rebuild_monthly_rollups``.
+
+    Rows are removed once they count no transaction, so ``category`` is
+    protected like ``Transaction.category``: a rollup that outlives its hot
+    rows still carries the spend of archived months, which nothing else could
+    rebuild once the category is gone.
+    """
+
+    # ForeignKey fields first
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='Usuário'
+    )
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.PROTECT,
+        related_name='monthly_rollups',
+        verbose_name='Categoria'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups',
+        verbose_name='Conta'
+    )
+
+    # Regular fields
+    month = models.DateField('Mês de Referência')
+    transaction_type = models.CharField(
+        'Tipo de Transação',
+        max_length=10,
+        choices=Transaction.TRANSACTION_TYPE_CHOICES
+    )
+    total = models.DecimalField(
+        'Total',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    count = models.IntegerField('Quantidade', default=0)
+
+    # Timestamp fields last
+    updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
+
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['user', 'month', 'category', 'account', 'transaction_type']
+        verbose_name = 'Consolidado Mensal'
+        verbose_name_plural = 'Consolidados Mensais'
+        indexes = [
+            models.Index(fields=['user', 'month']),
+        ]
+
+    def __str__(self):
+        return f'{self.month:%m/%Y} - {self.get_transaction_type_display()} - R$ {self.total}'
+
+
+class TransactionArchive(models.Model):
+    """
+    Compressed cold storage for one account's transactions of one month.
+
+    Rows older than the archive horizon are moved here by
+    ``python manage.py archive_transactions`` (see transactions/archive.py)
+    and removed from ``Transaction``. Their rollup rows and balance effect
+    stay in place, so reports, budgets and balances are unchanged. Reads never
+    write: when the user filters into an archived period, the list and the
+    export decode the blobs with ``archived_transactions()`` and merge the
+    rows, read-only, with the hot ones. Moving them back into ``Transaction``
+    is an explicit admin step (``restore_archived_transactions``).
+    """
+
+    ZSTD = 'zstd'
+    ZLIB = 'zlib'
+    CODEC_CHOICES = [
+        (ZSTD, 'zstd'),
+        (ZLIB, 'zlib'),
+    ]
+
+    # ForeignKey fields first
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='transaction_archives',
+        verbose_name='Usuário'
+    )
+    account = models.ForeignKey(
+        'accounts.Account',
+        on_delete=models.PROTECT,
+        related_name='transaction_archives',
+        verbose_name='Conta'
+    )
+
+    # Regular fields
+    month = models.DateField('Mês de Referência')
+    row_count = models.PositiveIntegerField('Quantidade', default=0)
+    balance_effect = models.DecimalField(
+        'Efeito no Saldo',
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    codec = models.CharField('Compressão', max_length=10, choices=CODEC_CHOICES)
+    payload = models.BinaryField('Dados')
+
+    # Timestamp fields last
+    created_at = models.DateTimeField('Data de Criação', auto_now_add=True)
+    updated_at = models.DateTimeField('Data de Atualização', auto_now=True)
+
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['account', 'month']
+        verbose_name = 'Arquivo de Transações'
+        verbose_name_plural = 'Arquivos de Transações'
+        indexes = [
+            models.Index(fields=['user', 'month']),
+        ]
+
+    def __str__(self):
+        return f'{self.account} - {self.month:%m/%Y} ({self.row_count})'
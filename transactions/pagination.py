@@ -0,0 +1,192 @@
+"""
+Keyset (cursor) pagination for transaction lists.
+
+Pages are addressed by an opaque token that encodes the position of a
+boundary row in the ``(-date, -created_at, -pk)`` ordering, so fetching any
+page is an index range scan of ``page_size + 1`` rows instead of an
+``OFFSET`` that grows with the page number.
+
+``MergedRows`` interleaves in-memory rows (archived transactions) with a
+queryset in that same ordering, for the numbered paginator.
+"""
+import base64
+import binascii
+import heapq
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+
+from django.db.models import Q
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+CURSOR_ORDERING = ('-date', '-created_at', '-pk')
+REVERSED_ORDERING = ('date', 'created_at', 'pk')
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(transaction, direction=FORWARD):
+    payload = [
+        transaction.date.isoformat(),
+        transaction.created_at.isoformat(),
+        transaction.pk,
+        direction,
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(date, created_at, pk, direction)`` for a token built by ``encode_cursor``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        date_value, created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded))
+        position = (
+            date.fromisoformat(date_value),
+            datetime.fromisoformat(created_at),
+            int(pk),
+        )
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise InvalidCursor(token) from exc
+    if direction not in (FORWARD, BACKWARD):
+        raise InvalidCursor(token)
+    return (*position, direction)
+
+
+def _after(position):
+    """Rows that come after ``position`` in the descending list order."""
+    row_date, created_at, pk = position
+    return (
+        Q(date__lt=row_date)
+        | Q(date=row_date, created_at__lt=created_at)
+        | Q(date=row_date, created_at=created_at, pk__lt=pk)
+    )
+
+
+def _before(position):
+    """Rows that come before ``position`` in the descending list order."""
+    row_date, created_at, pk = position
+    return (
+        Q(date__gt=row_date)
+        | Q(date=row_date, created_at__gt=created_at)
+        | Q(date=row_date, created_at=created_at, pk__gt=pk)
+    )
+
+
+@dataclass
+class CursorPage:
+    """One keyset page plus the tokens needed to reach its neighbours."""
+
+    object_list: list = field(default_factory=list)
+    next_cursor: str = ''
+    previous_cursor: str = ''
+    count: int | None = None
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_previous(self):
+        return bool(self.previous_cursor)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginate_by_cursor(queryset, page_size, token=None):
+    """
+    Return the ``CursorPage`` of ``queryset`` addressed by ``token``.
+
+    A missing or malformed token yields the first page. Only ``page_size + 1``
+    rows are fetched; the extra row tells whether a further page exists.
+    """
+    position = direction = None
+    if token:
+        try:
+            *position, direction = decode_cursor(token)
+        except InvalidCursor:
+            position = direction = None
+
+    if direction == BACKWARD:
+        rows = list(
+            queryset.filter(_before(position)).order_by(*REVERSED_ORDERING)[:page_size + 1]
+        )
+        has_more_before = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_more_after = True
+        if not has_more_before:
+            # Walked back to the start: serve a full first page instead.
+            return paginate_by_cursor(queryset, page_size)
+    else:
+        if position is not None:
+            queryset = queryset.filter(_after(position))
+        rows = list(queryset.order_by(*CURSOR_ORDERING)[:page_size + 1])
+        has_more_after = len(rows) > page_size
+        rows = rows[:page_size]
+        has_more_before = position is not None
+
+    page = CursorPage(object_list=rows)
+    if rows and has_more_after:
+        page.next_cursor = encode_cursor(rows[-1], FORWARD)
+    if rows and has_more_before:
+        page.previous_cursor = encode_cursor(rows[0], BACKWARD)
+    return page
+
+
+def _position(transaction):
+    return transaction.date, transaction.created_at, transaction.pk
+
+
+class MergedRows:
+    """
+    Sliceable sequence of ``queryset`` plus ``extra_rows`` (instances not in
+    the queryset, already in the list order), for Django's ``Paginator``.
+
+    Queryset rows that come before the first extra row are sliced in SQL;
+    only the part of the list from there on is merged in Python.
+    """
+
+    def __init__(self, queryset, extra_rows):
+        self.queryset = queryset.order_by(*CURSOR_ORDERING)
+        self.extra_rows = extra_rows
+        self.ordered = True
+
+    def count(self):
+        return self.queryset.count() + len(self.extra_rows)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.extra_rows:
+            return list(self.queryset[start:stop])
+
+        first_extra = _position(self.extra_rows[0])
+        head_count = self.queryset.filter(_before(first_extra)).count()
+        rows = list(self.queryset[start:min(stop, head_count)]) if start < head_count else []
+        if stop > head_count:
+            tail = heapq.merge(
+                self.queryset.filter(_after(first_extra)).iterator(),
+                self.extra_rows,
+                key=_position,
+                reverse=True,
+            )
+            offset = max(start - head_count, 0)
+            rows.extend(islice(tail, offset, offset + stop - max(start, head_count)))
+        return rows
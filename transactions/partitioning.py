@@ -0,0 +1,368 @@
+"""
+Yearly range partitioning of ``transactions_transaction`` on PostgreSQL.
+
+Opt-in: set ``TRANSACTIONS_PARTITIONED=True`` before running migrate, or
+convert an existing database later with
+``python manage.py partition_transactions --convert``. Other backends
+(SQLite in development) keep the plain table and every function here is a
+no-op for them.
+
+Layout after conversion:
+
+- the parent table is ``PARTITION BY RANGE (date)`` with one partition per
+  year (``transactions_transaction_y2026`` covers 2026-01-01 to 2027-01-01)
+  and a ``transactions_transaction_default`` partition so inserts never fail
+  for a year that was not created ahead of time;
+- the primary key becomes ``(id, date)``, as PostgreSQL requires the
+  partition key in every unique constraint. ``id`` keeps its identity
+  sequence, so the ORM still addresses rows by ``pk`` alone;
+- foreign keys *pointing to* transactions cannot be enforced by the
+  database any more (there is no unique constraint on ``id`` alone). Each
+  one (today only ``installments_installment.transaction_id``) is dropped
+  by name and reported in the result; ``on_delete=SET_NULL`` is still
+  applied by Django's collector. Nothing is dropped with ``CASCADE``: if
+  anything else depends on the table, the conversion fails and rolls back.
+
+Secondary indexes keep their names and are recreated from the catalog
+(``pg_index``), column by column. ``convert_to_unpartitioned`` is the exact
+reverse (plain table, ``id`` primary key, inbound foreign keys recreated
+from the models). The DDL itself is built by ``partitioning_statements`` and
+``unpartitioning_statements`` from the catalog rows read under the lock;
+migration 0007 carries its own frozen copy of the same statements.
+
+Date-range filters, which every dashboard, report and list query uses, let
+the planner prune to the partitions of the years involved.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connection as default_connection
+from django.db import transaction
+from django.db.backends.utils import truncate_name
+
+from .models import Transaction
+
+TABLE = Transaction._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+UNPARTITIONED_TABLE = f'{TABLE}_unpartitioned'
+PARTITION_NAME_PATTERN = re.compile(rf'^{TABLE}_y(\d{{4}})$')
+
+
+class PartitioningError(Exception):
+    """Raised when the table cannot be (re)partitioned on this database."""
+
+
+@dataclass(frozen=True)
+class IndexDefinition:
+    """A secondary index as read from ``pg_index``, recreatable on another table."""
+
+    name: str
+    method: str
+    unique: bool
+    key_count: int
+    columns: tuple
+    predicate: str | None
+
+    def create_sql(self, table, quote):
+        keys = ', '.join(self.columns[:self.key_count])
+        sql = f'CREATE {"UNIQUE " if self.unique else ""}INDEX {quote(self.name)} ON {table} USING {self.method} ({keys})'
+        included = self.columns[self.key_count:]
+        if included:
+            sql += f' INCLUDE ({", ".join(included)})'
+        if self.predicate:
+            sql += f' WHERE {self.predicate}'
+        return sql
+
+
+@dataclass
+class ConversionResult:
+    years: list = field(default_factory=list)
+    # (table, constraint name, definition) of the inbound foreign keys dropped.
+    dropped_foreign_keys: list = field(default_factory=list)
+
+
+def partition_name(year):
+    return f'{TABLE}_y{year}'
+
+
+def supports_partitioning(connection=default_connection):
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(connection=default_connection):
+    if not supports_partitioning(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)',
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partition_years(connection=default_connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)',
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        int(match.group(1))
+        for match in (PARTITION_NAME_PATTERN.match(name) for name in names)
+        if match
+    )
+
+
+def create_year_partition(year, connection=default_connection):
+    """
+    Create the partition for ``year``; returns False if it already exists.
+
+    Rows for that year that landed in the default partition are moved into
+    the new partition before it is attached, which PostgreSQL requires.
+    """
+    if year in existing_partition_years(connection):
+        return False
+
+    name = connection.ops.quote_name(partition_name(year))
+    parent = connection.ops.quote_name(TABLE)
+    default = connection.ops.quote_name(DEFAULT_PARTITION)
+    bounds = [date(year, 1, 1), date(year + 1, 1, 1)]
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds[0]:%Y-%m-%d}') TO ('{bounds[1]:%Y-%m-%d}')"
+        )
+    return True
+
+
+def ensure_partitions(years_ahead=1, connection=default_connection, today=None):
+    """Create yearly partitions up to ``years_ahead`` years from now; returns the new years."""
+    if not is_partitioned(connection):
+        return []
+
+    current_year = (today or date.today()).year
+    existing = existing_partition_years(connection)
+    first_year = existing[0] if existing else current_year
+    return [
+        year
+        for year in range(min(first_year, current_year), current_year + years_ahead + 1)
+        if create_year_partition(year, connection)
+    ]
+
+
+def _index_definitions(cursor, table):
+    """Every index of ``table`` except the primary key's."""
+    cursor.execute(
+        'SELECT index_class.relname, access_method.amname, ix.indisunique, ix.indnkeyatts, '
+        'ARRAY(SELECT pg_get_indexdef(ix.indexrelid, k, true) '
+        '      FROM generate_series(1, ix.indnatts) AS k ORDER BY k), '
+        'pg_get_expr(ix.indpred, ix.indrelid, true) '
+        'FROM pg_index ix '
+        'JOIN pg_class index_class ON index_class.oid = ix.indexrelid '
+        'JOIN pg_am access_method ON access_method.oid = index_class.relam '
+        'WHERE ix.indrelid = to_regclass(%s) AND NOT ix.indisprimary '
+        'ORDER BY index_class.relname',
+        [table],
+    )
+    return [
+        IndexDefinition(name, method, unique, key_count, tuple(columns), predicate)
+        for name, method, unique, key_count, columns, predicate in cursor.fetchall()
+    ]
+
+
+def _outbound_foreign_keys(cursor, table):
+    cursor.execute(
+        'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+        'WHERE conrelid = to_regclass(%s) AND contype = %s ORDER BY conname',
+        [table, 'f'],
+    )
+    return cursor.fetchall()
+
+
+def _inbound_foreign_keys(cursor, table):
+    cursor.execute(
+        'SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint '
+        'WHERE confrelid = to_regclass(%s) AND contype = %s ORDER BY conname',
+        [table, 'f'],
+    )
+    return cursor.fetchall()
+
+
+def _model_inbound_foreign_keys():
+    """``(table, column)`` of every model foreign key the database should enforce on transactions."""
+    return [
+        (related.related_model._meta.db_table, related.field.column)
+        for related in Transaction._meta.related_objects
+        if not related.many_to_many and related.field.db_constraint and related.related_model._meta.managed
+    ]
+
+
+def _primary_key_name(cursor, table):
+    cursor.execute(
+        'SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = %s',
+        [table, 'p'],
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _rebuild_statements(quote, create_table_sql, indexes, foreign_keys, primary_key, after_create=()):
+    """
+    Statements swapping ``transactions_transaction`` for a copy built by
+    ``create_table_sql`` (``{parent}`` and ``{old}`` are filled in), keeping
+    rows, identity, secondary indexes and outbound foreign keys.
+    """
+    parent = quote(TABLE)
+    old = quote(UNPARTITIONED_TABLE)
+    statements = [f'ALTER TABLE {parent} RENAME TO {old}']
+    # Free the index names (the primary key index included) for the new table.
+    statements += [f'DROP INDEX {quote(index.name)}' for index in indexes]
+    if primary_key:
+        statements.append(f'ALTER TABLE {old} DROP CONSTRAINT {quote(primary_key)}')
+    statements += [sql.format(parent=parent, old=old) for sql in (create_table_sql, *after_create)]
+    statements += [
+        f'INSERT INTO {parent} SELECT * FROM {old}',
+        f"SELECT setval(pg_get_serial_sequence('{parent}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {parent}",
+        # No CASCADE: inbound foreign keys are handled separately, and
+        # anything else depending on the old table aborts the whole rebuild.
+        f'DROP TABLE {old}',
+    ]
+    statements += [index.create_sql(parent, quote) for index in indexes]
+    statements += [
+        f'ALTER TABLE {parent} ADD CONSTRAINT {quote(name)} {definition}'
+        for name, definition in foreign_keys
+    ]
+    return statements
+
+
+def partitioning_statements(quote, years, indexes, foreign_keys, primary_key, inbound_foreign_keys):
+    """
+    DDL turning the plain table into the yearly-partitioned one, given what
+    ``convert_to_partitioned`` read from the catalog (under an exclusive lock).
+    """
+    return [
+        *(
+            f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}'
+            for table, name, _ in inbound_foreign_keys
+        ),
+        *_rebuild_statements(
+            quote,
+            'CREATE TABLE {parent} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY '
+            'INCLUDING CONSTRAINTS, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)',
+            indexes,
+            foreign_keys,
+            primary_key,
+            after_create=[
+                f'CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {{parent}} DEFAULT',
+                *(
+                    f'CREATE TABLE {quote(partition_name(year))} PARTITION OF {{parent}} '
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                    for year in years
+                ),
+            ],
+        ),
+    ]
+
+
+def unpartitioning_statements(quote, indexes, foreign_keys, primary_key, model_foreign_keys, max_name_length):
+    """DDL reversing ``partitioning_statements``, recreating ``model_foreign_keys``."""
+    statements = _rebuild_statements(
+        quote,
+        'CREATE TABLE {parent} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY '
+        'INCLUDING CONSTRAINTS, PRIMARY KEY (id))',
+        indexes,
+        foreign_keys,
+        primary_key,
+    )
+    for table, column in model_foreign_keys:
+        name = truncate_name(f'{table}_{column}_fk_{TABLE}_id', max_name_length)
+        statements.append(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} '
+            f'FOREIGN KEY ({quote(column)}) REFERENCES {quote(TABLE)} (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+    return statements
+
+
+def convert_to_partitioned(years_ahead=1, connection=default_connection):
+    """
+    Rebuild ``transactions_transaction`` as a yearly-partitioned table.
+
+    Runs in one transaction and takes an exclusive lock for the copy, so
+    schedule it in a maintenance window on large tables. Returns a
+    ``ConversionResult`` with the partition years created and the inbound
+    foreign keys that were dropped.
+    """
+    if not supports_partitioning(connection):
+        raise PartitioningError('O particionamento só é suportado no PostgreSQL.')
+    if is_partitioned(connection):
+        raise PartitioningError('A tabela de transações já está particionada.')
+
+    quote = connection.ops.quote_name
+    result = ConversionResult()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(f'SELECT EXTRACT(YEAR FROM MIN(date))::int FROM {quote(TABLE)}')
+        first_year = cursor.fetchone()[0]
+        current_year = date.today().year
+        result.years = list(range(min(first_year or current_year, current_year), current_year + years_ahead + 1))
+        result.dropped_foreign_keys = _inbound_foreign_keys(cursor, TABLE)
+
+        for statement in partitioning_statements(
+            quote,
+            result.years,
+            _index_definitions(cursor, TABLE),
+            _outbound_foreign_keys(cursor, TABLE),
+            _primary_key_name(cursor, TABLE),
+            result.dropped_foreign_keys,
+        ):
+            cursor.execute(statement)
+    return result
+
+
+def convert_to_unpartitioned(connection=default_connection):
+    """
+    Reverse of ``convert_to_partitioned``: rebuild a plain table with an
+    ``id`` primary key and recreate the inbound foreign keys of the models.
+
+    Fails (and changes nothing) if a referencing row points at a transaction
+    that no longer exists, since the database could not check that while
+    the table was partitioned.
+    """
+    if not is_partitioned(connection):
+        raise PartitioningError('A tabela de transações não está particionada.')
+
+    quote = connection.ops.quote_name
+    model_foreign_keys = _model_inbound_foreign_keys()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+        for table, column in model_foreign_keys:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {quote(table)} child WHERE child.{quote(column)} IS NOT NULL '
+                f'AND NOT EXISTS (SELECT 1 FROM {quote(TABLE)} t WHERE t.id = child.{quote(column)})'
+            )
+            dangling = cursor.fetchone()[0]
+            if dangling:
+                raise PartitioningError(
+                    f'{dangling} linhas de {table}.{column} apontam para transações inexistentes.'
+                )
+
+        for statement in unpartitioning_statements(
+            quote,
+            _index_definitions(cursor, TABLE),
+            _outbound_foreign_keys(cursor, TABLE),
+            _primary_key_name(cursor, TABLE),
+            model_foreign_keys,
+            connection.ops.max_name_length(),
+        ):
+            cursor.execute(statement)
@@ -0,0 +1,172 @@
+"""
+Incremental maintenance of ``MonthlyCategoryRollup``.
+
+Each transaction contributes ``(amount, 1)`` to the rollup row identified by
+its user, month, category, account and type. The signal handlers turn every
+create/edit/delete into signed deltas and hand them to
+``apply_rollup_deltas``; ``rebuild_monthly_rollups`` recomputes rows from
+the raw transactions (hot and archived) for backfills and repairs.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import MonthlyCategoryRollup, Transaction, TransactionArchive
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def rollup_key(user_id, transaction_date, category_id, account_id, transaction_type):
+    return (user_id, transaction_date.replace(day=1), category_id, account_id, transaction_type)
+
+
+def transaction_rollup_key(instance):
+    return rollup_key(
+        instance.user_id,
+        instance.date,
+        instance.category_id,
+        instance.account_id,
+        instance.transaction_type,
+    )
+
+
+def add_rollup_delta(deltas, key, amount, count):
+    """Accumulate a signed ``(amount, count)`` change for ``key`` into ``deltas``."""
+    current_amount, current_count = deltas.get(key, (Decimal('0.00'), 0))
+    deltas[key] = (current_amount + amount, current_count + count)
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Apply accumulated ``{key: (amount, count)}`` changes to the rollup table.
+
+    Existing rows are updated atomically with F() expressions and removed
+    once they no longer count any transaction; missing rows are inserted,
+    falling back to an update if a concurrent writer created the row first.
+    """
+    for key, (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+
+        user_id, month, category_id, account_id, transaction_type = key
+        lookup = {
+            'user_id': user_id,
+            'month': month,
+            'category_id': category_id,
+            'account_id': account_id,
+            'transaction_type': transaction_type,
+        }
+        updated = MonthlyCategoryRollup.objects.filter(**lookup).update(
+            total=F('total') + amount,
+            count=F('count') + count,
+        )
+        if updated:
+            if count < 0:
+                # Drop rows whose last transaction moved away or was deleted.
+                MonthlyCategoryRollup.objects.filter(count__lte=0, **lookup).delete()
+            continue
+
+        try:
+            with transaction.atomic():
+                MonthlyCategoryRollup.objects.create(total=amount, count=count, **lookup)
+        except IntegrityError:
+            MonthlyCategoryRollup.objects.filter(**lookup).update(
+                total=F('total') + amount,
+                count=F('count') + count,
+            )
+
+
+def compute_monthly_rollups(queryset):
+    """Group ``queryset`` into unsaved ``MonthlyCategoryRollup`` rows."""
+    rows = queryset.annotate(
+        period=TruncMonth('date'),
+    ).values(
+        'user_id',
+        'period',
+        'category_id',
+        'account_id',
+        'transaction_type',
+    ).annotate(
+        row_total=Sum('amount'),
+        row_count=Count('id'),
+    ).order_by()
+
+    for row in rows.iterator():
+        yield MonthlyCategoryRollup(
+            user_id=row['user_id'],
+            month=row['period'],
+            category_id=row['category_id'],
+            account_id=row['account_id'],
+            transaction_type=row['transaction_type'],
+            total=row['row_total'],
+            count=row['row_count'],
+        )
+
+
+def compute_archived_rollup_deltas(archives):
+    """Rollup contributions of the rows stored in ``archives``."""
+    from .archive import decode_archive
+
+    deltas = {}
+    for archive in archives.iterator():
+        for row in decode_archive(archive):
+            key = rollup_key(
+                archive.user_id,
+                row['date'],
+                row['category_id'],
+                archive.account_id,
+                row['transaction_type'],
+            )
+            add_rollup_delta(deltas, key, row['amount'], 1)
+    return deltas
+
+
+@transaction.atomic
+def rebuild_monthly_rollups(user_ids=None, months=None):
+    """
+    Recompute rollup rows from raw transactions.
+
+    ``user_ids`` and ``months`` (first days of month) narrow the rebuild;
+    by default the whole table is rebuilt. Returns the number of rows written.
+    """
+    rollups = MonthlyCategoryRollup.objects.all()
+    transactions = Transaction.objects.all()
+    archives = TransactionArchive.objects.all()
+    if user_ids is not None:
+        rollups = rollups.filter(user_id__in=user_ids)
+        transactions = transactions.filter(user_id__in=user_ids)
+        archives = archives.filter(user_id__in=user_ids)
+    if months is not None:
+        months = sorted({month.replace(day=1) for month in months})
+        rollups = rollups.filter(month__in=months)
+        transactions = transactions.annotate(period=TruncMonth('date')).filter(period__in=months)
+        archives = archives.filter(month__in=months)
+
+    rollups.delete()
+
+    written = 0
+    batch = []
+    for rollup in compute_monthly_rollups(transactions):
+        batch.append(rollup)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            MonthlyCategoryRollup.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        MonthlyCategoryRollup.objects.bulk_create(batch)
+        written += len(batch)
+
+    archived_deltas = compute_archived_rollup_deltas(archives)
+    apply_rollup_deltas(archived_deltas)
+    return written + len(archived_deltas)
+
+
+def group_rollup_deltas(transactions, sign=1):
+    """Signed rollup deltas for an iterable of transactions (for bulk paths)."""
+    deltas = defaultdict(lambda: (Decimal('0.00'), 0))
+    for instance in transactions:
+        add_rollup_delta(deltas, transaction_rollup_key(instance), sign * instance.amount, sign)
+    return dict(deltas)
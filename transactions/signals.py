@@ -1,9 +1,14 @@
-from django.db.models import F
-from django.db.models.signals import post_save, pre_delete, pre_save
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 
-from accounts.models import Account
+from accounts.balances import checkpoint_key
+
+from .bookkeeping import record_bookkeeping
 from .models import Transaction
+from .rollups import add_rollup_delta, rollup_key, transaction_rollup_key
 
 
 @receiver(pre_save, sender=Transaction)
@@ -12,27 +17,29 @@ def store_old_transaction_values(sender, instance, **kwargs):
     Signal to store old transaction values before editing.
 
     This signal runs before a transaction is saved (on update only).
-    It stores the old values (account, amount, transaction_type) in instance
-    attributes so they can be used in post_save to reverse the old transaction effect.
+    The original values of ``Transaction.TRACKED_FIELDS`` are captured when
+    the instance is loaded (see ``Transaction.from_db``), so no query is
+    needed here; instances built without loading (or with deferred fields)
+    fall back to a single SELECT. The values are stored in ``_old_values``
+    for post_save to reverse the old transaction effect.
 
     Args:
         sender: The model class (Transaction)
         instance: The actual instance being saved
         **kwargs: Additional keyword arguments
     """
-    if instance.pk:  # Only for existing transactions (updates)
-        try:
-            old_transaction = Transaction.objects.get(pk=instance.pk)
-            instance._old_account = old_transaction.account
-            instance._old_amount = old_transaction.amount
-            instance._old_transaction_type = old_transaction.transaction_type
-            instance._old_credit_card_id = old_transaction.credit_card_id
-        except Transaction.DoesNotExist:
-            # In case the transaction was deleted between pre_save and now
-            instance._old_account = None
-            instance._old_amount = None
-            instance._old_transaction_type = None
-            instance._old_credit_card_id = None
+    instance._old_values = None
+    if not instance.pk:
+        return
+
+    old_values = instance.get_tracked_values()
+    if old_values is None:
+        # In case the transaction was deleted between loading and now,
+        # there is nothing to reverse.
+        old_values = Transaction.objects.filter(pk=instance.pk).values(
+            *Transaction.TRACKED_FIELDS
+        ).first()
+    instance._old_values = old_values
 
 
 @receiver(post_save, sender=Transaction)
@@ -45,37 +52,41 @@ def update_account_balance_on_save(sender, instance, created, **kwargs):
     - On EDIT: Reverse old transaction effect, then apply new transaction effect
       (handles account changes too)
 
+    Both effects are merged per account first, so an edit issues at most one
+    UPDATE per affected account and none when the net change is zero. Inside
+    ``deferred_bookkeeping()`` the deltas are added to the block's ledger and
+    applied when it ends (see transactions/bookkeeping.py).
+    Callers that need the new balance must refresh the account themselves.
+
     Args:
         sender: The model class (Transaction)
         instance: The actual instance being saved
         created: Boolean indicating if this is a new record
         **kwargs: Additional keyword arguments
     """
-    if created:
-        if _should_affect_balance(instance.credit_card_id):
-            _apply_transaction_to_account(
-                instance.account,
-                instance.amount,
-                instance.transaction_type
-            )
-    else:
-        if (
-            hasattr(instance, '_old_account')
-            and instance._old_account
-            and _should_affect_balance(getattr(instance, '_old_credit_card_id', None))
-        ):
-            _reverse_transaction_from_account(
-                instance._old_account,
-                instance._old_amount,
-                instance._old_transaction_type
-            )
-
-        if _should_affect_balance(instance.credit_card_id):
-            _apply_transaction_to_account(
-                instance.account,
-                instance.amount,
-                instance.transaction_type
-            )
+    deltas = defaultdict(Decimal)
+    checkpoint_deltas = defaultdict(Decimal)
+    old_values = getattr(instance, '_old_values', None)
+    if not created and old_values:
+        _add_balance_effect(
+            deltas,
+            checkpoint_deltas,
+            old_values['account_id'],
+            -old_values['amount'],
+            old_values['transaction_type'],
+            old_values['credit_card_id'],
+            old_values['date'],
+        )
+    _add_balance_effect(
+        deltas,
+        checkpoint_deltas,
+        instance.account_id,
+        instance.amount,
+        instance.transaction_type,
+        instance.credit_card_id,
+        instance.date,
+    )
+    record_bookkeeping(balance_deltas=deltas, checkpoint_deltas=checkpoint_deltas, using=kwargs['using'])
 
 
 @receiver(pre_delete, sender=Transaction)
@@ -92,55 +103,97 @@ def update_account_balance_on_delete(sender, instance, **kwargs):
         instance: The actual instance being deleted
         **kwargs: Additional keyword arguments
     """
-    if _should_affect_balance(instance.credit_card_id):
-        _reverse_transaction_from_account(
-            instance.account,
-            instance.amount,
-            instance.transaction_type
-        )
+    deltas = defaultdict(Decimal)
+    checkpoint_deltas = defaultdict(Decimal)
+    _add_balance_effect(
+        deltas,
+        checkpoint_deltas,
+        instance.account_id,
+        -instance.amount,
+        instance.transaction_type,
+        instance.credit_card_id,
+        instance.date,
+    )
+    record_bookkeeping(balance_deltas=deltas, checkpoint_deltas=checkpoint_deltas, using=kwargs['using'])
 
 
-def _should_affect_balance(credit_card_id):
-    return credit_card_id is None
-
-
-def _apply_transaction_to_account(account, amount, transaction_type):
+@receiver(post_save, sender=Transaction)
+def update_monthly_rollup_on_save(sender, instance, created, **kwargs):
     """
-    Apply a transaction effect to an account balance using atomic F() expressions.
+    Keep ``MonthlyCategoryRollup`` in sync when a transaction is created or edited.
 
-    Args:
-        account: Account instance to update
-        amount: Transaction amount (Decimal)
-        transaction_type: 'income' or 'expense'
+    On edit the old contribution is removed from the row it was counted in
+    (which may differ when date, category, account or type changed) and the
+    new one is added; unchanged keys collapse into a single amount delta.
     """
-    if transaction_type == Transaction.INCOME:
-        Account.objects.filter(pk=account.pk).update(
-            current_balance=F('current_balance') + amount
-        )
-    elif transaction_type == Transaction.EXPENSE:
-        Account.objects.filter(pk=account.pk).update(
-            current_balance=F('current_balance') - amount
+    deltas = {}
+    old_values = getattr(instance, '_old_values', None)
+    if not created and old_values:
+        old_key = rollup_key(
+            old_values['user_id'],
+            old_values['date'],
+            old_values['category_id'],
+            old_values['account_id'],
+            old_values['transaction_type'],
         )
-    account.refresh_from_db()
+        add_rollup_delta(deltas, old_key, -old_values['amount'], -1)
+    add_rollup_delta(deltas, transaction_rollup_key(instance), instance.amount, 1)
+    record_bookkeeping(rollup_deltas=deltas, using=kwargs['using'])
 
 
-def _reverse_transaction_from_account(account, amount, transaction_type):
+@receiver(pre_delete, sender=Transaction)
+def update_monthly_rollup_on_delete(sender, instance, **kwargs):
+    """Remove a deleted transaction's contribution from its rollup row."""
+    record_bookkeeping(
+        rollup_deltas={transaction_rollup_key(instance): (-instance.amount, -1)},
+        using=kwargs['using'],
+    )
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_user_cache_on_transaction_change(sender, instance, **kwargs):
+    """Drop cached dashboard data derived from the owner's transactions."""
+    record_bookkeeping(user_ids=[instance.user_id], using=kwargs['using'])
+
+
+@receiver(post_save, sender=Transaction)
+def remember_saved_transaction_values(sender, instance, **kwargs):
+    """Treat the saved values as the originals for the next save of this instance."""
+    instance._old_values = None
+    instance.remember_tracked_values()
+
+
+def _should_affect_balance(credit_card_id):
+    return credit_card_id is None
+
+
+def _add_balance_effect(deltas, checkpoint_deltas, account_id, amount, transaction_type,
+                        credit_card_id, transaction_date):
     """
-    Reverse a transaction effect from an account balance using atomic F() expressions.
+    Accumulate a transaction's signed effect on its account balance.
 
-    This is the opposite of apply: income subtracts, expense adds.
+    Income adds ``amount`` and expense subtracts it; pass a negative
+    ``amount`` to reverse a previous effect. Credit card purchases do not
+    touch the account balance. The same effect is recorded against the
+    transaction's month for the balance checkpoints (accounts/balances.py).
 
     Args:
-        account: Account instance to update
-        amount: Transaction amount (Decimal)
+        deltas: Mapping of account id to accumulated balance change
+        checkpoint_deltas: Mapping of (account id, month) to balance change
+        account_id: Account affected by the transaction
+        amount: Signed transaction amount (Decimal)
         transaction_type: 'income' or 'expense'
+        credit_card_id: Credit card id, if the purchase was made on a card
+        transaction_date: Date of the transaction
     """
+    if not _should_affect_balance(credit_card_id):
+        return
     if transaction_type == Transaction.INCOME:
-        Account.objects.filter(pk=account.pk).update(
-            current_balance=F('current_balance') - amount
-        )
+        effect = amount
     elif transaction_type == Transaction.EXPENSE:
-        Account.objects.filter(pk=account.pk).update(
-            current_balance=F('current_balance') + amount
-        )
-    account.refresh_from_db()
+        effect = -amount
+    else:
+        return
+    deltas[account_id] += effect
+    checkpoint_deltas[checkpoint_key(account_id, transaction_date)] += effect
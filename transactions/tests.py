@@ -1,16 +1,49 @@
 from datetime import date
+import gzip
+import json
+import tempfile
+from importlib import import_module
+from io import StringIO
+from pathlib import Path
 from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock, skipIf, skipUnless
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import ProtectedError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from accounts.models import Account, CreditCard
+from accounts.services import find_balance_drift
 from budgets.models import Budget
 from categories.models import Category
 
 from .forms import TransactionForm
-from .models import Transaction
+from .models import MonthlyCategoryRollup, Transaction, TransactionArchive
+from .archive import archive_transactions, archived_transactions, restore_archived
+from .bookkeeping import deferred_bookkeeping
+from .bulk import bulk_delete, bulk_move
+from .exporters import zstd_available
+from .importers import TransactionImportError, import_statement, parse_amount, parse_csv, parse_ofx
+from .pagination import MergedRows, decode_cursor
+from .partitioning import (
+    TABLE,
+    IndexDefinition,
+    PartitioningError,
+    convert_to_partitioned,
+    convert_to_unpartitioned,
+    is_partitioned,
+    partitioning_statements,
+    unpartitioning_statements,
+)
+from .rollups import rebuild_monthly_rollups
 
 
 class TransactionFormTests(TestCase):
@@ -226,6 +259,74 @@ class TransactionSignalTests(TestCase):
             due_day=20,
         )
 
+    def create_expense(self, amount='100.00', account=None):
+        return Transaction.objects.create(
+            user=self.user,
+            account=account or self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal(amount),
+            date=date.today(),
+        )
+
+    def test_edit_moving_accounts_uses_one_update_per_account_and_no_reads(self):
+        savings = Account.objects.create(
+            user=self.user,
+            name='Poupança',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('500.00'),
+        )
+        transaction = Transaction.objects.get(pk=self.create_expense().pk)
+        transaction.account = savings
+        transaction.amount = Decimal('40.00')
+
+        with CaptureQueriesContext(connection) as queries:
+            transaction.save()
+
+        sql = [query['sql'] for query in queries.captured_queries]
+        self.assertFalse([query for query in sql if query.startswith('SELECT "transactions_transaction"')])
+        self.assertFalse([query for query in sql if query.startswith('SELECT "accounts_account"')])
+        self.assertEqual(len([query for query in sql if query.startswith('UPDATE "accounts_account"')]), 2)
+        self.account.refresh_from_db()
+        savings.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('1000.00'))
+        self.assertEqual(savings.current_balance, Decimal('460.00'))
+
+    def test_edit_without_balance_change_skips_account_update(self):
+        transaction = self.create_expense()
+        transaction.description = 'Só a descrição'
+
+        with CaptureQueriesContext(connection) as queries:
+            transaction.save()
+
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "accounts_account"')
+        ])
+
+    def test_repeated_saves_and_unloaded_instances_keep_balance_correct(self):
+        transaction = self.create_expense()
+        transaction.amount = Decimal('150.00')
+        transaction.save()
+        transaction.amount = Decimal('120.00')
+        transaction.save()
+
+        detached = Transaction(
+            pk=transaction.pk,
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('20.00'),
+            date=transaction.date,
+            created_at=transaction.created_at,
+        )
+        detached.save()
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('980.00'))
+        self.assertEqual(MonthlyCategoryRollup.objects.get().total, Decimal('20.00'))
+
     def test_credit_card_transaction_does_not_change_account_balance(self):
         Transaction.objects.create(
             user=self.user,
@@ -241,3 +342,1150 @@ class TransactionSignalTests(TestCase):
         self.account.refresh_from_db()
 
         self.assertEqual(self.account.current_balance, Decimal('1000.00'))
+
+
+class MonthlyCategoryRollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transaction-rollups@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        self.leisure = Category.objects.create(
+            user=self.user,
+            name='Lazer',
+            category_type=Category.EXPENSE,
+            color='#f97316'
+        )
+
+    def create_expense(self, amount, transaction_date, category=None):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=category or self.food,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal(amount),
+            date=transaction_date,
+        )
+
+    def rollup_snapshot(self):
+        return sorted(
+            MonthlyCategoryRollup.objects.values_list(
+                'month', 'category_id', 'account_id', 'transaction_type', 'total', 'count'
+            )
+        )
+
+    def test_signals_keep_rollups_in_sync_with_creates_edits_and_deletes(self):
+        first = self.create_expense('100.00', date(2026, 3, 5))
+        self.create_expense('50.00', date(2026, 3, 20))
+
+        rollup = MonthlyCategoryRollup.objects.get()
+        self.assertEqual(rollup.month, date(2026, 3, 1))
+        self.assertEqual(rollup.total, Decimal('150.00'))
+        self.assertEqual(rollup.count, 2)
+
+        first.date = date(2026, 4, 2)
+        first.category = self.leisure
+        first.amount = Decimal('80.00')
+        first.save()
+
+        self.assertEqual(self.rollup_snapshot(), [
+            (date(2026, 3, 1), self.food.pk, self.account.pk, Transaction.EXPENSE, Decimal('50.00'), 1),
+            (date(2026, 4, 1), self.leisure.pk, self.account.pk, Transaction.EXPENSE, Decimal('80.00'), 1),
+        ])
+
+        first.delete()
+
+        self.assertEqual(self.rollup_snapshot(), [
+            (date(2026, 3, 1), self.food.pk, self.account.pk, Transaction.EXPENSE, Decimal('50.00'), 1),
+        ])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.create_expense('10.00', date(2026, 1, 31))
+        self.create_expense('20.00', date(2026, 2, 1))
+        self.create_expense('30.00', date(2026, 2, 15), category=self.leisure)
+        incremental = self.rollup_snapshot()
+
+        MonthlyCategoryRollup.objects.update(total=Decimal('0.00'))
+        written = rebuild_monthly_rollups(user_ids=[self.user.pk])
+
+        self.assertEqual(written, 3)
+        self.assertEqual(self.rollup_snapshot(), incremental)
+
+    def test_rebuild_command_can_be_limited_to_a_month(self):
+        self.create_expense('10.00', date(2026, 1, 10))
+        self.create_expense('20.00', date(2026, 2, 10))
+        MonthlyCategoryRollup.objects.all().delete()
+
+        call_command('rebuild_monthly_rollups', month=['2026-02'], stdout=StringIO())
+
+        self.assertEqual(
+            list(MonthlyCategoryRollup.objects.values_list('month', 'total')),
+            [(date(2026, 2, 1), Decimal('20.00'))],
+        )
+
+
+class TransactionListCursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='transaction-cursor@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        # 45 expenses spread over a few days, with several rows per date so
+        # the created_at/pk tie-breakers are exercised.
+        for index in range(45):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.category,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal('1.00'),
+                date=date(2026, 5, 1 + index % 4),
+            )
+        self.client.force_login(self.user)
+
+    def expected_order(self):
+        return list(
+            Transaction.objects.order_by('-date', '-created_at', '-pk').values_list('pk', flat=True)
+        )
+
+    def test_cursor_mode_walks_every_row_once_in_list_order(self):
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('transactions:list'), {'cursor': cursor})
+            page = response.context['page_obj']
+            seen.extend(transaction.pk for transaction in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, self.expected_order())
+        self.assertEqual(page.count, 45)
+
+    def test_previous_cursor_returns_to_the_prior_page(self):
+        first = self.client.get(reverse('transactions:list'), {'cursor': ''}).context['page_obj']
+        second = self.client.get(
+            reverse('transactions:list'), {'cursor': first.next_cursor}
+        ).context['page_obj']
+        back = self.client.get(
+            reverse('transactions:list'), {'cursor': second.previous_cursor}
+        ).context['page_obj']
+
+        self.assertEqual(decode_cursor(second.previous_cursor)[-1], 'p')
+        self.assertEqual(
+            [transaction.pk for transaction in back],
+            [transaction.pk for transaction in first],
+        )
+
+    def test_cursor_mode_respects_filters_and_skips_offset_and_cached_count(self):
+        params = {'cursor': '', 'date_from': '2026-05-03'}
+        self.client.get(reverse('transactions:list'), params)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('transactions:list'), params)
+
+        page = response.context['page_obj']
+        self.assertTrue(all(transaction.date >= date(2026, 5, 3) for transaction in page))
+        self.assertEqual(page.count, Transaction.objects.filter(date__gte=date(2026, 5, 3)).count())
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(*)', sql)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('transactions:list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [transaction.pk for transaction in response.context['page_obj']],
+            self.expected_order()[:20],
+        )
+
+
+class TransactionListQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='transaction-list-queries@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.income = Category.objects.create(
+            user=self.user,
+            name='Salário',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+        self.expense = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        for index in range(45):
+            income = index % 3 == 0
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.income if income else self.expense,
+                transaction_type=Transaction.INCOME if income else Transaction.EXPENSE,
+                amount=Decimal('10.00'),
+                date=date(2026, 6, 1 + index % 28),
+            )
+        self.client.force_login(self.user)
+
+    def test_totals_use_the_filtered_queryset(self):
+        response = self.client.get(reverse('transactions:list'), {'date_from': '2026-06-15'})
+
+        filtered = Transaction.objects.filter(date__gte=date(2026, 6, 15))
+        income = sum(t.amount for t in filtered if t.transaction_type == Transaction.INCOME)
+        expense = sum(t.amount for t in filtered if t.transaction_type == Transaction.EXPENSE)
+        self.assertEqual(response.context['total_income'], income)
+        self.assertEqual(response.context['total_expense'], expense)
+        self.assertEqual(response.context['balance'], income - expense)
+        self.assertEqual(
+            [item['name'] for item in response.context['available_categories']],
+            ['Mercado', 'Salário'],
+        )
+
+    def test_paging_a_filtered_list_only_queries_the_page(self):
+        params = {'transaction_type': Transaction.EXPENSE}
+        self.client.get(reverse('transactions:list'), params)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('transactions:list'), {**params, 'page': 2})
+
+        self.assertEqual(response.status_code, 200)
+        transaction_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'transactions_transaction' in query['sql']
+        ]
+        self.assertEqual(len(transaction_queries), 1)
+        self.assertNotIn('accounts_account" WHERE', ' '.join(
+            query['sql'] for query in queries.captured_queries
+            if 'transactions_transaction' not in query['sql']
+        ))
+
+
+SAMPLE_OFX = """OFXHEADER:100
+DATA:OFXSGML
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260310120000[-3:BRT]
+<TRNAMT>-45.90
+<FITID>1
+<MEMO>Padaria
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260305<TRNAMT>3500,00<FITID>2<NAME>Salario</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+class TransactionImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='transaction-import@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('100.00'),
+        )
+        self.food = Category.objects.create(
+            user=self.user,
+            name='Alimentação',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        self.other_expense = Category.objects.create(
+            user=None,
+            name='Outros',
+            category_type=Category.EXPENSE,
+            color='#6b7280',
+            is_default=True,
+        )
+        self.salary = Category.objects.create(
+            user=self.user,
+            name='Salário',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+
+    def csv_lines(self, *rows):
+        content = 'data;descrição;valor;categoria\n' + '\n'.join(rows) + '\n'
+        return content.encode().splitlines(keepends=True)
+
+    def test_parse_amount_detects_the_decimal_separator(self):
+        cases = {
+            '1.234,56': Decimal('1234.56'),
+            '1,234.56': Decimal('1234.56'),
+            '1.234': Decimal('1234'),
+            '1.234.567': Decimal('1234567'),
+            '1,234,567.8': Decimal('1234567.8'),
+            '-50.00': Decimal('-50.00'),
+            '10,5': Decimal('10.5'),
+            'R$ -1.000,00': Decimal('-1000.00'),
+            '+12': Decimal('12'),
+        }
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(parse_amount(raw), expected)
+
+        for raw in ('1,234', '10.5678', '1.23.4', '1.234,567.89', 'abc', '', 'NaN', '1e5'):
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                parse_amount(raw)
+
+    def test_ambiguous_amount_is_reported_as_row_error(self):
+        with self.assertRaises(TransactionImportError) as raised:
+            import_statement(
+                self.user,
+                self.account,
+                self.csv_lines('05/03/2026;Mercado;1.234;alimentacao', '06/03/2026;Padaria;1,234;alimentacao'),
+                'csv',
+            )
+
+        self.assertIn('Linha 3: valor inválido "1,234"', str(raised.exception))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_csv_import_applies_balance_and_rollups_once(self):
+        rows = [f'0{1 + index % 9}/03/2026;Mercado {index};-10,00;alimentacao' for index in range(300)]
+        rows.append('15/03/2026;Salário;1.500,00;Salário')
+        rows.append('16/03/2026;Farmácia;-20,00;Saúde')
+
+        with CaptureQueriesContext(connection) as queries:
+            result = import_statement(self.user, self.account, self.csv_lines(*rows), 'csv', chunk_size=100)
+
+        self.account.refresh_from_db()
+        self.assertEqual(result.created_count, 302)
+        self.assertEqual(self.account.current_balance, Decimal('100.00') + Decimal('1500.00') - Decimal('3020.00'))
+        self.assertEqual(Transaction.objects.filter(category=self.food).count(), 300)
+        self.assertEqual(Transaction.objects.get(description='Farmácia').category, self.other_expense)
+        self.assertEqual(
+            MonthlyCategoryRollup.objects.get(category=self.food).total,
+            Decimal('3000.00'),
+        )
+        account_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "accounts_account"')
+        ]
+        self.assertEqual(len(account_updates), 1)
+        # Bounded by chunks and rollup keys, not by the number of rows.
+        self.assertLess(len(queries.captured_queries), 40)
+
+    def test_invalid_row_rejects_the_whole_file(self):
+        lines = self.csv_lines('01/03/2026;Ok;-10,00;', '32/03/2026;Data ruim;-5,00;', '02/03/2026;Zero;0;')
+
+        with self.assertRaises(TransactionImportError) as raised:
+            import_statement(self.user, self.account, lines, 'csv')
+
+        self.assertEqual(len(raised.exception.errors), 2)
+        self.assertIn('Linha 3', raised.exception.errors[0])
+        self.assertFalse(Transaction.objects.exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('100.00'))
+
+    def test_parse_ofx_handles_sgml_and_inline_tags(self):
+        records = [record for _, record in parse_ofx(SAMPLE_OFX.splitlines())]
+
+        self.assertEqual(records, [
+            {'date': '20260310', 'amount': '-45.90', 'description': 'Padaria'},
+            {'date': '20260305', 'amount': '3500,00', 'description': 'Salario'},
+        ])
+
+    def test_import_command_reads_ofx_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'extrato.ofx'
+            path.write_text(SAMPLE_OFX, encoding='utf-8')
+            stdout = StringIO()
+            call_command(
+                'import_transactions',
+                str(path),
+                user=self.user.email,
+                account=self.account.pk,
+                stdout=stdout,
+            )
+
+        self.assertIn('2 transações importadas', stdout.getvalue())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('3554.10'))
+
+    def test_import_command_rejects_foreign_account(self):
+        other_user = get_user_model().objects.create_user(
+            email='transaction-import-other@example.com',
+            password='secret123'
+        )
+
+        with self.assertRaises(CommandError):
+            call_command('import_transactions', 'extrato.csv', user=other_user.email, account=self.account.pk)
+
+    def test_upload_view_imports_statement(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile(
+            'extrato.csv',
+            b'date,description,amount\n2026-03-01,Mercado,-12.50\n',
+            content_type='text/csv',
+        )
+
+        response = self.client.post(
+            reverse('transactions:import'),
+            data={'statement': upload, 'account': self.account.pk, 'file_format': ''},
+            follow=True,
+        )
+
+        self.assertContains(response, '1 transações importadas com sucesso!')
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('87.50'))
+
+
+class TransactionExportTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transaction-export@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        for day in range(1, 6):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.category,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal(f'{day}.50'),
+                date=date(2026, 4, day),
+                description=f'Compra, dia {day}',
+            )
+        other_user = get_user_model().objects.create_user(
+            email='transaction-export-other@example.com',
+            password='secret123'
+        )
+        other_account = Account.objects.create(
+            user=other_user,
+            name='Outra',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('0.00'),
+        )
+        Transaction.objects.create(
+            user=other_user,
+            account=other_account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('99.00'),
+            date=date(2026, 4, 3),
+        )
+        self.client.force_login(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('transactions:export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_honors_filters_and_round_trips_through_importer(self):
+        response, body = self.export(date_from='2026-04-03')
+
+        self.assertIn('attachment;', response['Content-Disposition'])
+        records = [record for _, record in parse_csv(body.decode().splitlines(keepends=True))]
+        self.assertEqual([record['date'] for record in records], ['2026-04-05', '2026-04-04', '2026-04-03'])
+        self.assertEqual(records[0]['amount'], '5.50')
+        self.assertEqual(records[0]['description'], 'Compra, dia 5')
+        self.assertEqual(records[0]['category'], 'Mercado')
+
+    def test_jsonl_export_with_gzip(self):
+        response, body = self.export(format='jsonl', compression='gzip')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.jsonl.gz"'))
+        lines = gzip.decompress(body).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[-1]), {
+            'date': '2026-04-01',
+            'type': 'expense',
+            'amount': '1.50',
+            'description': 'Compra, dia 1',
+            'account': 'Conta Principal',
+            'category': 'Mercado',
+            'credit_card': None,
+        })
+
+    def test_zstd_export_when_available(self):
+        response, body = self.export(compression='zstd')
+
+        if not zstd_available():
+            self.assertEqual(response['Content-Type'], 'application/gzip')
+            return
+        import zstandard
+
+        self.assertEqual(response['Content-Type'], 'application/zstd')
+        text = zstandard.ZstdDecompressor().decompressobj().decompress(body).decode()
+        self.assertEqual(len(text.splitlines()), 6)
+
+
+class DeferredBookkeepingTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transaction-bookkeeping@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+
+    def create_expense(self, amount):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal(amount),
+            date=date(2026, 7, 10),
+        )
+
+    def account_updates(self, queries):
+        return [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "accounts_account"')
+        ]
+
+    def test_block_coalesces_balance_updates_per_account(self):
+        with CaptureQueriesContext(connection) as queries:
+            with deferred_bookkeeping():
+                for _ in range(25):
+                    self.create_expense('10.00')
+                self.account.refresh_from_db()
+                self.assertEqual(self.account.current_balance, Decimal('1000.00'))
+
+        self.assertEqual(len(self.account_updates(queries)), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('750.00'))
+        rollup = MonthlyCategoryRollup.objects.get()
+        self.assertEqual((rollup.total, rollup.count), (Decimal('250.00'), 25))
+
+    def test_rolled_back_nested_block_discards_its_deltas(self):
+        with deferred_bookkeeping() as ledger:
+            self.create_expense('10.00')
+            try:
+                with deferred_bookkeeping() as nested:
+                    self.assertIs(nested, ledger)
+                    self.create_expense('500.00')
+                    raise ValueError('falha simulada')
+            except ValueError:
+                pass
+            with deferred_bookkeeping():
+                self.create_expense('5.00')
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('985.00'))
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(MonthlyCategoryRollup.objects.get().total, Decimal('15.00'))
+
+    def test_failed_flush_rolls_back_the_rows(self):
+        with mock.patch('transactions.bookkeeping.apply_rollup_deltas', side_effect=RuntimeError('falha simulada')):
+            with self.assertRaises(RuntimeError):
+                with deferred_bookkeeping():
+                    self.create_expense('10.00')
+
+        self.assertFalse(Transaction.objects.exists())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('1000.00'))
+
+    def test_failed_block_applies_nothing(self):
+        with self.assertRaises(ValueError):
+            with deferred_bookkeeping():
+                self.create_expense('10.00')
+                raise ValueError('falha simulada')
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('1000.00'))
+        self.assertFalse(MonthlyCategoryRollup.objects.exists())
+
+
+class TransactionBulkActionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transaction-bulk@example.com',
+            password='secret123'
+        )
+        self.client.force_login(self.user)
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.savings = Account.objects.create(
+            user=self.user,
+            name='Poupanca',
+            account_type=Account.SAVINGS,
+            initial_balance=Decimal('0.00'),
+        )
+        self.market = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        self.leisure = Category.objects.create(
+            user=self.user,
+            name='Lazer',
+            category_type=Category.EXPENSE,
+            color='#f97316'
+        )
+        self.expenses = [
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.market,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal('10.00'),
+                date=date(2026, 6, day),
+            )
+            for day in range(1, 11)
+        ]
+        self.url = reverse('transactions:bulk')
+
+    def post(self, action, transactions, **extra):
+        return self.client.post(self.url, {
+            'action': action,
+            'transactions': [transaction.pk for transaction in transactions],
+            **extra,
+        })
+
+    def account_updates(self, queries):
+        return [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "accounts_account"')
+        ]
+
+    def test_bulk_delete_updates_each_balance_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            deleted = bulk_delete(Transaction.objects.filter(pk__in=[t.pk for t in self.expenses[:3]]))
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(len(self.account_updates(queries)), 1)
+
+        response = self.post('delete', self.expenses[3:6])
+
+        self.assertRedirects(response, reverse('transactions:list'))
+        self.assertEqual(Transaction.objects.count(), 4)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('960.00'))
+        self.assertEqual(MonthlyCategoryRollup.objects.get().count, 4)
+
+    def test_bulk_move_shifts_balance_and_rollups(self):
+        selected = Transaction.objects.filter(pk__in=[t.pk for t in self.expenses[:3]])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(bulk_move(selected, self.savings), 3)
+
+        self.assertEqual(len(self.account_updates(queries)), 2)
+        self.account.refresh_from_db()
+        self.savings.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('930.00'))
+        self.assertEqual(self.savings.current_balance, Decimal('-30.00'))
+        rollups = dict(MonthlyCategoryRollup.objects.values_list('account_id', 'total'))
+        self.assertEqual(rollups, {self.account.pk: Decimal('70.00'), self.savings.pk: Decimal('30.00')})
+
+    def test_bulk_recategorize_keeps_balance_and_rejects_type_mismatch(self):
+        self.post('recategorize', self.expenses[:4], category=self.leisure.pk)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('900.00'))
+        self.assertEqual(Transaction.objects.filter(category=self.leisure).count(), 4)
+        rollups = dict(MonthlyCategoryRollup.objects.values_list('category_id', 'total'))
+        self.assertEqual(rollups, {self.market.pk: Decimal('60.00'), self.leisure.pk: Decimal('40.00')})
+
+        salary = Category.objects.create(
+            user=self.user,
+            name='Salario',
+            category_type=Category.INCOME,
+            color='#22c55e'
+        )
+        response = self.post('recategorize', self.expenses[4:], category=salary.pk)
+        self.assertRedirects(response, reverse('transactions:list'))
+        self.assertFalse(Transaction.objects.filter(category=salary).exists())
+
+    def test_bulk_action_ignores_other_users_transactions(self):
+        other_user = get_user_model().objects.create_user(
+            email='transaction-bulk-other@example.com',
+            password='secret123'
+        )
+        self.client.force_login(other_user)
+
+        self.post('delete', self.expenses)
+
+        self.assertEqual(Transaction.objects.count(), 10)
+
+
+class QueryIndexTests(TestCase):
+    def test_query_indexes_are_built_by_their_migration(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Transaction._meta.db_table)
+
+        self.assertEqual(constraints['transaction_user_type_date_idx']['columns'][:3], [
+            'user_id', 'transaction_type', 'date',
+        ])
+        self.assertEqual(constraints['transaction_cat_expense_idx']['columns'][:2], ['category_id', 'date'])
+        self.assertEqual(constraints['transaction_card_date_idx']['columns'][:2], ['credit_card_id', 'date'])
+        model_index_names = {index.name for index in Transaction._meta.indexes}
+        self.assertNotIn('transaction_user_type_date_idx', model_index_names)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Índices de cobertura exigem PostgreSQL.')
+    def test_query_indexes_cover_amount_on_postgresql(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname, indexdef FROM pg_indexes WHERE indexname IN %s',
+                [('transaction_user_type_date_idx', 'transaction_cat_expense_idx', 'transaction_card_date_idx')],
+            )
+            definitions = dict(cursor.fetchall())
+
+        self.assertEqual(len(definitions), 3)
+        for definition in definitions.values():
+            self.assertIn('INCLUDE (amount)', definition)
+
+
+class PartitionTransactionsCommandTests(TestCase):
+    @skipIf(connection.vendor == 'postgresql', 'Comportamento sem PostgreSQL.')
+    def test_command_is_a_no_op_without_postgresql(self):
+        output = StringIO()
+
+        call_command('partition_transactions', stdout=output)
+
+        self.assertIn('nada a fazer', output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('partition_transactions', '--convert', stdout=StringIO())
+
+
+class PartitionStatementTests(TestCase):
+    """The partitioning DDL, asserted statement by statement on any backend."""
+
+    migration = import_module('transactions.migrations.0007_partition_transactions')
+    index = ('transaction_cat_expense_idx', 'btree', False, 2, ('category_id', 'date', 'amount'),
+             "transaction_type::text = 'expense'::text")
+    foreign_key = ('transactions_transaction_user_id_fk', 'FOREIGN KEY (user_id) REFERENCES users_user(id)')
+
+    def quote(self, name):
+        return f'"{name}"'
+
+    def rebuild(self, create_table, *after_create):
+        return [
+            'ALTER TABLE "transactions_transaction" RENAME TO "transactions_transaction_unpartitioned"',
+            'DROP INDEX "transaction_cat_expense_idx"',
+            'ALTER TABLE "transactions_transaction_unpartitioned" DROP CONSTRAINT "transactions_transaction_pkey"',
+            'CREATE TABLE "transactions_transaction" (LIKE "transactions_transaction_unpartitioned" '
+            f'INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS, {create_table}',
+            *after_create,
+            'INSERT INTO "transactions_transaction" SELECT * FROM "transactions_transaction_unpartitioned"',
+            "SELECT setval(pg_get_serial_sequence('\"transactions_transaction\"', 'id'), "
+            'COALESCE(MAX(id), 0) + 1, false) FROM "transactions_transaction"',
+            'DROP TABLE "transactions_transaction_unpartitioned"',
+            'CREATE INDEX "transaction_cat_expense_idx" ON "transactions_transaction" USING btree '
+            "(category_id, date) INCLUDE (amount) WHERE transaction_type::text = 'expense'::text",
+            'ALTER TABLE "transactions_transaction" ADD CONSTRAINT "transactions_transaction_user_id_fk" '
+            'FOREIGN KEY (user_id) REFERENCES users_user(id)',
+        ]
+
+    def expected_partitioning(self):
+        return [
+            'ALTER TABLE "installments_installment" DROP CONSTRAINT "installments_fk"',
+            *self.rebuild(
+                'PRIMARY KEY (id, date)) PARTITION BY RANGE (date)',
+                'CREATE TABLE "transactions_transaction_default" PARTITION OF "transactions_transaction" DEFAULT',
+                'CREATE TABLE "transactions_transaction_y2025" PARTITION OF "transactions_transaction" '
+                "FOR VALUES FROM ('2025-01-01') TO ('2026-01-01')",
+                'CREATE TABLE "transactions_transaction_y2026" PARTITION OF "transactions_transaction" '
+                "FOR VALUES FROM ('2026-01-01') TO ('2027-01-01')",
+            ),
+        ]
+
+    def expected_unpartitioning(self):
+        return [
+            *self.rebuild('PRIMARY KEY (id))'),
+            'ALTER TABLE "installments_installment" ADD CONSTRAINT '
+            '"installments_installment_transaction_id_fk_transactions_tra461c" FOREIGN KEY ("transaction_id") '
+            'REFERENCES "transactions_transaction" (id) DEFERRABLE INITIALLY DEFERRED',
+        ]
+
+    def test_partitioning_statements(self):
+        statements = partitioning_statements(
+            self.quote,
+            [2025, 2026],
+            [IndexDefinition(*self.index)],
+            [self.foreign_key],
+            'transactions_transaction_pkey',
+            [('installments_installment', 'installments_fk', 'FOREIGN KEY (transaction_id) REFERENCES ...')],
+        )
+
+        self.assertEqual(statements, self.expected_partitioning())
+
+    def test_unpartitioning_statements(self):
+        statements = unpartitioning_statements(
+            self.quote,
+            [IndexDefinition(*self.index)],
+            [self.foreign_key],
+            'transactions_transaction_pkey',
+            [('installments_installment', 'transaction_id')],
+            63,
+        )
+
+        self.assertEqual(statements, self.expected_unpartitioning())
+
+    def test_migration_statements_are_frozen(self):
+        partition = self.migration.build_partition_statements(
+            self.quote,
+            [2025, 2026],
+            [self.index],
+            [self.foreign_key],
+            'transactions_transaction_pkey',
+            [('installments_installment', 'installments_fk')],
+        )
+        unpartition = self.migration.build_unpartition_statements(
+            self.quote, [self.index], [self.foreign_key], 'transactions_transaction_pkey', 63
+        )
+
+        self.assertEqual(partition, self.expected_partitioning())
+        self.assertEqual(unpartition, self.expected_unpartitioning())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Particionamento exige PostgreSQL.')
+class PartitionConversionTests(TestCase):
+    def setUp(self):
+        from installments.models import Installment, InstallmentPlan
+
+        self.user = get_user_model().objects.create_user(
+            email='transaction-partitions@example.com',
+            password='secret123'
+        )
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('0.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+        )
+        self.transactions = [
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.category,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal('10.00'),
+                date=date(year, 6, 1),
+            )
+            for year in (2023, 2024, date.today().year)
+        ]
+        plan = InstallmentPlan.objects.create(
+            user=self.user,
+            name='Geladeira',
+            total_amount=Decimal('300.00'),
+            installment_count=3,
+            start_date=date(2024, 6, 1),
+            category=self.category,
+            account=self.account,
+        )
+        self.installment = Installment.objects.create(
+            plan=plan,
+            number=99,
+            due_date=date(2024, 6, 1),
+            amount=Decimal('100.00'),
+            transaction=self.transactions[1],
+        )
+        # DDL on a table with pending deferred checks is refused by PostgreSQL.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+    def catalog(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT indexname FROM pg_indexes WHERE tablename = %s ORDER BY indexname', [TABLE]
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                'SELECT conrelid::regclass::text FROM pg_constraint '
+                'WHERE confrelid = to_regclass(%s) AND contype = %s',
+                [TABLE, 'f'],
+            )
+            inbound = [row[0] for row in cursor.fetchall()]
+        return indexes, inbound
+
+    def test_convert_and_revert_keep_rows_indexes_and_foreign_keys(self):
+        indexes, inbound = self.catalog()
+        self.assertEqual(inbound, ['installments_installment'])
+
+        result = convert_to_partitioned()
+
+        self.assertTrue(is_partitioned())
+        self.assertIn(2023, result.years)
+        self.assertEqual([fk[0] for fk in result.dropped_foreign_keys], ['installments_installment'])
+        partitioned_indexes, partitioned_inbound = self.catalog()
+        self.assertEqual(partitioned_inbound, [])
+        self.assertEqual(
+            set(partitioned_indexes) - {f'{TABLE}_pkey'},
+            set(indexes) - {f'{TABLE}_pkey'},
+        )
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertEqual(
+            Transaction.objects.filter(date__year=2024, transaction_type=Transaction.EXPENSE).get(),
+            self.transactions[1],
+        )
+        created = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('5.00'),
+            date=date(2024, 7, 1),
+        )
+        self.assertGreater(created.pk, self.transactions[-1].pk)
+        self.transactions[1].delete()
+        self.installment.refresh_from_db()
+        self.assertIsNone(self.installment.transaction_id)
+
+        convert_to_unpartitioned()
+
+        self.assertFalse(is_partitioned())
+        reverted_indexes, reverted_inbound = self.catalog()
+        self.assertEqual(reverted_indexes, indexes)
+        self.assertEqual(reverted_inbound, ['installments_installment'])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_migration_converts_and_reverts(self):
+        indexes, inbound = self.catalog()
+        schema_editor = SimpleNamespace(connection=connection)
+
+        with self.settings(TRANSACTIONS_PARTITIONED=True):
+            PartitionStatementTests.migration.partition_transactions(None, schema_editor)
+
+        self.assertTrue(is_partitioned())
+        self.assertEqual(self.catalog()[1], [])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+        PartitionStatementTests.migration.unpartition_transactions(None, schema_editor)
+
+        self.assertFalse(is_partitioned())
+        self.assertEqual(self.catalog(), (indexes, inbound))
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_revert_refuses_dangling_references(self):
+        convert_to_partitioned()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE id = %s', [self.transactions[1].pk])
+
+        with self.assertRaises(PartitioningError):
+            convert_to_unpartitioned()
+
+
+class TransactionArchiveTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='transaction-archive@example.com',
+            password='secret123'
+        )
+        self.client.force_login(self.user)
+        self.account = Account.objects.create(
+            user=self.user,
+            name='Conta Principal',
+            account_type=Account.CHECKING,
+            initial_balance=Decimal('1000.00'),
+        )
+        self.category = Category.objects.create(
+            user=self.user,
+            name='Mercado',
+            category_type=Category.EXPENSE,
+            color='#ef4444'
+        )
+        self.old = [
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                category=self.category,
+                transaction_type=Transaction.EXPENSE,
+                amount=Decimal('10.50'),
+                date=date(2023, month, 5),
+                description=f'Compra antiga {month}',
+            )
+            for month in (1, 1, 2)
+        ]
+        self.recent = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('5.00'),
+            date=date(2026, 6, 1),
+        )
+
+    def test_archive_keeps_balance_and_rollups(self):
+        rollups_before = list(MonthlyCategoryRollup.objects.order_by('month').values_list('month', 'total', 'count'))
+
+        result = archive_transactions(before=date(2024, 1, 1))
+
+        self.assertEqual((result.transaction_count, result.archive_count), (3, 2))
+        self.assertEqual(list(Transaction.objects.all()), [self.recent])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('963.50'))
+        self.assertEqual(
+            list(MonthlyCategoryRollup.objects.order_by('month').values_list('month', 'total', 'count')),
+            rollups_before,
+        )
+        self.assertEqual(find_balance_drift(), [])
+
+        rebuild_monthly_rollups()
+        self.assertEqual(
+            list(MonthlyCategoryRollup.objects.order_by('month').values_list('month', 'total', 'count')),
+            rollups_before,
+        )
+
+    def test_category_with_archived_rows_cannot_be_deleted(self):
+        legacy = Category.objects.create(
+            user=self.user,
+            name='Antiga',
+            category_type=Category.EXPENSE,
+            color='#525252'
+        )
+        Transaction.objects.filter(pk=self.old[0].pk).update(category=legacy)
+        rebuild_monthly_rollups()
+        archive_transactions(before=date(2024, 1, 1))
+        self.assertFalse(legacy.transactions.exists())
+
+        with self.assertRaises(ProtectedError):
+            legacy.delete()
+
+        self.assertEqual(MonthlyCategoryRollup.objects.get(category=legacy).total, Decimal('10.50'))
+
+    def test_restore_brings_rows_back_unchanged(self):
+        original = {
+            row['id']: row for row in Transaction.objects.filter(date__year=2023).values()
+        }
+        archive_transactions(before=date(2024, 1, 1))
+
+        restored = restore_archived(self.user, date_from=date(2023, 1, 1))
+
+        self.assertEqual(restored, 3)
+        self.assertFalse(TransactionArchive.objects.exists())
+        self.assertEqual(
+            {row['id']: row for row in Transaction.objects.filter(date__year=2023).values()},
+            original,
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('963.50'))
+        self.assertEqual(MonthlyCategoryRollup.objects.get(month=date(2023, 1, 1)).count, 2)
+
+    def test_list_and_export_read_archived_period_without_restoring(self):
+        archive_transactions(before=date(2024, 1, 1))
+        filters = {'date_from': '2023-01-01', 'date_to': '2026-12-31'}
+
+        response = self.client.get(reverse('transactions:list'), filters)
+        export = self.client.get(reverse('transactions:export'), filters)
+
+        self.assertEqual(TransactionArchive.objects.count(), 2)
+        self.assertEqual(list(Transaction.objects.all()), [self.recent])
+        rows = list(response.context['transactions'])
+        self.assertEqual(
+            [(row.date, getattr(row, 'is_archived', False)) for row in rows],
+            [
+                (date(2026, 6, 1), False),
+                (date(2023, 2, 5), True),
+                (date(2023, 1, 5), True),
+                (date(2023, 1, 5), True),
+            ],
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 4)
+        self.assertEqual(response.context['total_expense'], Decimal('36.50'))
+        self.assertContains(response, 'Compra antiga 2')
+        self.assertContains(response, 'Arquivada', count=3)
+
+        body = b''.join(export.streaming_content).decode()
+        records = [record for _, record in parse_csv(body.splitlines(keepends=True))]
+        self.assertEqual(
+            [record['date'] for record in records],
+            ['2026-06-01', '2023-02-05', '2023-01-05', '2023-01-05'],
+        )
+
+    def test_merged_rows_slices_match_the_full_ordering(self):
+        archive_transactions(before=date(2024, 1, 1))
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            transaction_type=Transaction.EXPENSE,
+            amount=Decimal('1.00'),
+            date=date(2023, 1, 20),
+            description='Lancamento retroativo',
+        )
+        merged = MergedRows(Transaction.objects.filter(user=self.user), archived_transactions(self.user))
+        expected = [date(2026, 6, 1), date(2023, 2, 5), date(2023, 1, 20), date(2023, 1, 5), date(2023, 1, 5)]
+
+        self.assertEqual(merged.count(), 5)
+        self.assertEqual([row.date for row in merged[0:5]], expected)
+        for start, stop in ((0, 1), (0, 2), (1, 3), (2, 5), (4, 5)):
+            with self.subTest(start=start, stop=stop):
+                self.assertEqual([row.date for row in merged[start:stop]], expected[start:stop])
+
+    def test_restore_command_refuses_rows_with_deleted_category(self):
+        archive_transactions(before=date(2024, 1, 1))
+        Transaction.objects.filter(category=self.category).delete()
+        # Rollups now protect the category; this is data from before that.
+        MonthlyCategoryRollup.objects.filter(category=self.category).delete()
+        self.category.delete()
+
+        with self.assertRaises(CommandError):
+            call_command('restore_archived_transactions', '--user', str(self.user.pk), stdout=StringIO())
+        self.assertEqual(TransactionArchive.objects.count(), 2)
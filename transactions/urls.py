@@ -7,6 +7,9 @@ app_name = 'transactions'
 urlpatterns = [
     path('', views.TransactionListView.as_view(), name='list'),
     path('nova/', views.TransactionCreateView.as_view(), name='create'),
+    path('importar/', views.TransactionImportView.as_view(), name='import'),
+    path('acoes-em-massa/', views.TransactionBulkActionView.as_view(), name='bulk'),
+    path('exportar/', views.TransactionExportView.as_view(), name='export'),
     path('<int:pk>/editar/', views.TransactionUpdateView.as_view(), name='update'),
     path('<int:pk>/excluir/', views.TransactionDeleteView.as_view(), name='delete'),
 ]
@@ -1,35 +1,73 @@
+import hashlib
+import json
 import logging
+from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Q, Sum
-from django.http import HttpResponseRedirect
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views import View
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView
 
 from accounts.models import Account
 from accounts.services import get_default_account
 from budgets.models import Budget
 from categories.models import Category
+from core.cache import get_or_build_user_cache
+from core.formatting import format_currency_fields
 
-from .forms import TransactionForm
+from . import bulk, exporters
+from .archive import archived_transactions
+from .forms import TransactionBulkActionForm, TransactionForm, TransactionImportForm
+from .importers import TransactionImportError, detect_format, import_statement
 from .models import Transaction
+from .pagination import MergedRows, paginate_by_cursor
 
 logger = logging.getLogger(__name__)
 
 
-class TransactionListView(LoginRequiredMixin, ListView):
-    """List transactions with filtering by date, category, type and account."""
+class TransactionFilterMixin:
+    """Apply the transaction list's GET filters (date range, category, type, account)."""
 
-    model = Transaction
-    template_name = 'transactions/transaction_list.html'
-    context_object_name = 'transactions'
-    paginate_by = 20
+    FILTER_PARAMS = ('date_from', 'date_to', 'category', 'transaction_type', 'account')
 
-    def get_queryset(self):
-        queryset = Transaction.objects.filter(
-            user=self.request.user
-        ).select_related('account', 'category')
+    def get_date_param(self, name):
+        try:
+            return parse_date(self.request.GET.get(name) or '')
+        except ValueError:
+            return None
+
+    def get_archived_transactions(self):
+        """
+        Archived transactions matching the filters, decoded read-only when
+        ``date_from`` reaches into an archived period (see transactions/archive.py).
+        """
+        if hasattr(self, '_archived_transactions'):
+            return self._archived_transactions
+        self._archived_transactions = []
+
+        date_from = self.get_date_param('date_from')
+        if date_from is None:
+            return self._archived_transactions
+        account = self.request.GET.get('account', '')
+        category = self.request.GET.get('category', '')
+        self._archived_transactions = archived_transactions(
+            self.request.user,
+            date_from=date_from,
+            date_to=self.get_date_param('date_to'),
+            account_id=int(account) if account.isdigit() else None,
+            category_id=int(category) if category.isdigit() else None,
+            transaction_type=self.request.GET.get('transaction_type') or None,
+        )
+        return self._archived_transactions
+
+    def get_filtered_queryset(self):
+        queryset = Transaction.objects.filter(user=self.request.user)
 
         date_from = self.request.GET.get('date_from')
         date_to = self.request.GET.get('date_to')
@@ -52,22 +90,123 @@ class TransactionListView(LoginRequiredMixin, ListView):
 
         return queryset
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    def get_filter_signature(self):
+        """Stable digest of the active filters, used to scope cache entries."""
+        filters = {name: self.request.GET.get(name, '') for name in self.FILTER_PARAMS}
+        raw = json.dumps(filters, sort_keys=True).encode()
+        return hashlib.md5(raw, usedforsecurity=False).hexdigest()
 
-        queryset = self.get_queryset()
 
-        total_income = queryset.filter(
-            transaction_type=Transaction.INCOME
-        ).aggregate(total=Sum('amount'))['total'] or 0
+class TransactionListView(LoginRequiredMixin, TransactionFilterMixin, ListView):
+    """
+    List transactions with filtering by date, category, type and account.
 
-        total_expense = queryset.filter(
-            transaction_type=Transaction.EXPENSE
-        ).aggregate(total=Sum('amount'))['total'] or 0
+    Pages are numbered by default. Passing ``cursor`` in the query string
+    switches to keyset pagination (see transactions/pagination.py), whose
+    cost does not grow with the page depth. The total row count used by both
+    modes is cached per filter combination and user data version.
+    """
 
-        context['total_income'] = total_income
-        context['total_expense'] = total_expense
-        context['balance'] = total_income - total_expense
+    model = Transaction
+    template_name = 'transactions/transaction_list.html'
+    context_object_name = 'transactions'
+    paginate_by = 20
+    CURSOR_PARAM = 'cursor'
+
+    def get_queryset(self):
+        return self.get_filtered_queryset().select_related('account', 'category')
+
+    def get_total_count(self):
+        hot_count = get_or_build_user_cache(
+            self.request.user.pk,
+            'transaction-count',
+            self.object_list.count,
+            parts=(self.get_filter_signature(),),
+        )
+        return hot_count + len(self.get_archived_transactions())
+
+    def get_filtered_totals(self):
+        """Income and expense sums for the active filters, in one cached query."""
+        def build():
+            return self.object_list.aggregate(
+                income=Coalesce(
+                    Sum('amount', filter=Q(transaction_type=Transaction.INCOME)),
+                    Decimal('0.00')
+                ),
+                expense=Coalesce(
+                    Sum('amount', filter=Q(transaction_type=Transaction.EXPENSE)),
+                    Decimal('0.00')
+                ),
+            )
+
+        totals = dict(get_or_build_user_cache(
+            self.request.user.pk,
+            'transaction-totals',
+            build,
+            parts=(self.get_filter_signature(),),
+        ))
+        for archived in self.get_archived_transactions():
+            key = 'income' if archived.transaction_type == Transaction.INCOME else 'expense'
+            totals[key] += archived.amount
+        return totals
+
+    def get_filter_choices(self):
+        """Account and category options for the filter form, cached per user."""
+        user = self.request.user
+
+        def build():
+            return {
+                'available_accounts': list(
+                    Account.objects.filter(
+                        user=user,
+                        is_active=True
+                    ).order_by('name').values('pk', 'name')
+                ),
+                'available_categories': list(
+                    Category.objects.filter(
+                        Q(user=user) | Q(is_default=True),
+                        is_active=True
+                    ).order_by('name').values('pk', 'name')
+                ),
+            }
+
+        return get_or_build_user_cache(user.pk, 'transaction-filter-choices', build)
+
+    def is_cursor_mode(self):
+        # Archived rows have no keyset in the database; their ranges use numbered pages.
+        return self.CURSOR_PARAM in self.request.GET and not self.get_archived_transactions()
+
+    def get_paginator(self, *args, **kwargs):
+        paginator = super().get_paginator(*args, **kwargs)
+        # Paginator.count is a cached_property; seeding it skips the COUNT(*).
+        paginator.count = self.get_total_count()
+        return paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.is_cursor_mode():
+            archived = self.get_archived_transactions()
+            if archived:
+                queryset = MergedRows(queryset, archived)
+            return super().paginate_queryset(queryset, page_size)
+
+        page = paginate_by_cursor(
+            queryset,
+            page_size,
+            self.request.GET.get(self.CURSOR_PARAM),
+        )
+        page.count = self.get_total_count()
+        return (None, page, page.object_list, page.has_other_pages)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_mode'] = self.is_cursor_mode()
+        # One pass over the page instead of a template filter call per row.
+        format_currency_fields(context['transactions'], 'amount')
+
+        totals = self.get_filtered_totals()
+        context['total_income'] = totals['income']
+        context['total_expense'] = totals['expense']
+        context['balance'] = totals['income'] - totals['expense']
 
         context['filter_date_from'] = self.request.GET.get('date_from', '')
         context['filter_date_to'] = self.request.GET.get('date_to', '')
@@ -75,19 +214,51 @@ class TransactionListView(LoginRequiredMixin, ListView):
         context['filter_transaction_type'] = self.request.GET.get('transaction_type', '')
         context['filter_account'] = self.request.GET.get('account', '')
 
-        context['available_accounts'] = Account.objects.filter(
-            user=self.request.user,
-            is_active=True
-        ).order_by('name')
-
-        context['available_categories'] = Category.objects.filter(
-            Q(user=self.request.user) | Q(is_default=True),
-            is_active=True
-        ).order_by('name')
+        context.update(self.get_filter_choices())
 
         return context
 
 
+class TransactionExportView(LoginRequiredMixin, TransactionFilterMixin, View):
+    """
+    Stream the filtered transactions as a CSV or JSON-lines download.
+
+    Query params: the list filters, ``format`` (``csv`` or ``jsonl``) and an
+    optional ``compression`` (``gzip``, or ``zstd`` when the ``zstandard``
+    package is installed; otherwise gzip is used).
+    """
+
+    http_method_names = ['get']
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', exporters.CSV)
+        if export_format not in exporters.FORMATS:
+            export_format = exporters.CSV
+        compression = request.GET.get('compression') or None
+        if compression == exporters.ZSTD and not exporters.zstd_available():
+            compression = exporters.GZIP
+        if compression not in exporters.COMPRESSIONS:
+            compression = None
+
+        content_type, extension = exporters.FORMATS[export_format]
+        filename = f'transacoes-{timezone.localdate():%Y%m%d}.{extension}'
+        if compression:
+            content_type, compressed_extension = exporters.COMPRESSIONS[compression]
+            filename = f'{filename}.{compressed_extension}'
+
+        response = StreamingHttpResponse(
+            exporters.stream_export(
+                self.get_filtered_queryset(),
+                export_format,
+                compression,
+                archived=self.get_archived_transactions(),
+            ),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 class TransactionCreateView(LoginRequiredMixin, CreateView):
     """Create a new transaction. Triggers balance update via signal."""
 
@@ -134,8 +305,7 @@ class TransactionCreateView(LoginRequiredMixin, CreateView):
             budget = Budget.objects.filter(
                 user=self.request.user,
                 category=self.object.category,
-                month=self.object.date.replace(day=1),
-            ).first()
+            ).with_usage(self.object.date).first()
             if budget and budget.spent_amount > budget.amount:
                 budget_amount = f'{budget.amount:.2f}'.replace('.', ',')
                 messages.warning(
@@ -204,3 +374,90 @@ class TransactionDeleteView(LoginRequiredMixin, DeleteView):
             return HttpResponseRedirect(reverse_lazy('transactions:list'))
         messages.success(self.request, 'Transação excluída com sucesso!')
         return response
+
+
+class TransactionImportView(LoginRequiredMixin, FormView):
+    """Import a CSV/OFX bank statement into one of the user's accounts."""
+
+    form_class = TransactionImportForm
+    template_name = 'transactions/transaction_import.html'
+    success_url = reverse_lazy('transactions:list')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        statement = form.cleaned_data['statement']
+        file_format = form.cleaned_data['file_format'] or detect_format(statement.name)
+
+        try:
+            result = import_statement(
+                self.request.user,
+                form.cleaned_data['account'],
+                statement,
+                file_format,
+            )
+        except TransactionImportError as exc:
+            for error in exc.errors:
+                form.add_error(None, error)
+            return self.form_invalid(form)
+        except Exception:
+            logger.exception('Erro ao importar extrato para o usuário %s', self.request.user.email)
+            messages.error(
+                self.request,
+                'Ocorreu um erro ao importar o extrato. Tente novamente.'
+            )
+            return HttpResponseRedirect(self.get_success_url())
+
+        messages.success(
+            self.request,
+            f'{result.created_count} transações importadas com sucesso!'
+        )
+        return super().form_valid(form)
+
+
+class TransactionBulkActionView(LoginRequiredMixin, FormView):
+    """Apply delete/recategorize/move to the transactions selected on the list page."""
+
+    form_class = TransactionBulkActionForm
+    http_method_names = ['post']
+    success_url = reverse_lazy('transactions:list')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        action = form.cleaned_data['action']
+        selected = form.cleaned_data['transactions']
+
+        try:
+            if action == bulk.DELETE:
+                count = bulk.bulk_delete(selected)
+                message = f'{count} transações excluídas com sucesso!'
+            elif action == bulk.RECATEGORIZE:
+                count = bulk.bulk_recategorize(selected, form.cleaned_data['category'])
+                message = f'{count} transações recategorizadas com sucesso!'
+            else:
+                count = bulk.bulk_move(selected, form.cleaned_data['account'])
+                message = f'{count} transações movidas com sucesso!'
+        except bulk.BulkActionError as exc:
+            messages.error(self.request, str(exc))
+        except Exception:
+            logger.exception('Erro na ação em massa "%s" do usuário %s', action, self.request.user.email)
+            messages.error(
+                self.request,
+                'Ocorreu um erro ao aplicar a ação. Tente novamente.'
+            )
+        else:
+            messages.success(self.request, message)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def form_invalid(self, form):
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(self.request, error)
+        return HttpResponseRedirect(self.get_success_url())
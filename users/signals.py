@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.cache import bump_user_data_version
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reset_user_cache_on_signup(sender, instance, created, **kwargs):
+    """
+    Start new users on a fresh data version.
+
+    Primary keys can be reused (e.g. SQLite after a rollback), so a new
+    account must never inherit cache entries left by a previous owner.
+    """
+    if created:
+        bump_user_data_version(instance.pk)